@@ -1,16 +1,23 @@
+import hashlib
 import json
 import logging
 import os
+import sys
+import tempfile
 from argparse import ArgumentParser, FileType
+from contextlib import nullcontext
 from pathlib import Path
 
-import jsonschema
-
 from bibhelper import __version__
+from bibhelper import cache
+from bibhelper import client
 from bibhelper import config
-from bibhelper.beautify import beautify
-from bibhelper.find import find
-from bibhelper.util import read_from_clipboard
+from bibhelper import http_client
+from bibhelper import profiling
+
+# The modules of the subcommands are imported by run_command, so a command only imports what it uses. In particular,
+# requests (Find, FindBatch), jsonschema (validating a changed configuration file) and pyperclip (clipboard) take
+# longer to import than most commands take to run.
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +26,9 @@ SCRIPT_DIRECTORY = os.path.dirname(os.path.realpath(__file__))
 CONFIG_FILE_ENV_NAME = "LATEX_BIB_HELPER_CONFIG"
 CONFIG_FILE_HOME_NAME = ".latex_bib_helper_config.json"
 CONFIG_FILE_DEFAULT_NAME = "latex_bib_helper_config.json"
+SCHEMA_FILE = os.path.join(SCRIPT_DIRECTORY, "resources", "config.schema.json")
+# Configuration files which passed the validation, see is_config_validated
+VALIDATED_CONFIGS_FILE_NAME = "validated_configs.json"
 
 
 def load_configuration(config_file_args: str) -> None:
@@ -58,28 +68,83 @@ def load_configuration(config_file_args: str) -> None:
         exit(1)
 
 
+def _get_validated_configs_path() -> str:
+    return os.path.join(cache.get_cache_directory(), VALIDATED_CONFIGS_FILE_NAME)
+
+
+def _get_validation_key(config_file: str, config_content: bytes, schema_content: bytes) -> dict:
+    # The hash covers the schema as well, a changed schema (e.g. a new version) validates all files again
+    return {"mtime": os.stat(config_file).st_mtime_ns,
+            "hash": hashlib.sha256(schema_content + b"\0" + config_content).hexdigest()}
+
+
+def _load_validated_configs() -> dict:
+    try:
+        with open(_get_validated_configs_path(), "r", encoding="UTF-8") as f:
+            validated_configs = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return validated_configs if isinstance(validated_configs, dict) else {}
+
+
+def is_config_validated(config_file: str, config_content: bytes, schema_content: bytes) -> bool:
+    """
+    Returns True if the configuration file passed the validation against the schema before and neither of them
+    changed since then (same path, modification time and hash of the contents).
+    """
+    key = _get_validation_key(config_file, config_content, schema_content)
+    return _load_validated_configs().get(os.path.abspath(config_file)) == key
+
+
+def set_config_validated(config_file: str, config_content: bytes, schema_content: bytes) -> None:
+    """
+    Remembers that the configuration file passed the validation. Failing to write the file (e.g. a read-only cache
+    directory) only costs validating again.
+    """
+    validated_configs = _load_validated_configs()
+    validated_configs[os.path.abspath(config_file)] = _get_validation_key(config_file, config_content,
+                                                                          schema_content)
+    path = _get_validated_configs_path()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temporary_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="UTF-8") as f:
+            json.dump(validated_configs, f)
+        os.replace(temporary_path, path)
+    except OSError as e:
+        logger.debug("Could not write {}: {}".format(path, e))
+
+
 def try_load_and_set_config(config_file: str) -> bool:
     logger.debug(f"Trying to load configuration file: {config_file}")
     if config_file is None or not os.path.isfile(config_file):
         return False
 
-    with open(config_file, "r") as f:
-        # Load config file
-        json_config = json.load(f)
-    with open(os.path.join(SCRIPT_DIRECTORY, "resources", "config.schema.json"), "r") as f:
-        # Load schema
-        json_schema = json.load(f)
+    with open(config_file, "rb") as f:
+        config_content = f.read()
+    # Load config file
+    json_config = json.loads(config_content)
+    with open(SCHEMA_FILE, "rb") as f:
+        schema_content = f.read()
 
-    # Validate
-    try:
-        jsonschema.validate(json_config, json_schema)
+    # Validate, unless the file was validated before
+    if is_config_validated(config_file, config_content, schema_content):
+        logger.debug(f"Configuration file {config_file} was validated before.")
+    else:
+        with profiling.span("config.validate"):
+            import jsonschema
+            try:
+                jsonschema.validate(json_config, json.loads(schema_content))
+            except jsonschema.exceptions.ValidationError as e:
+                logger.warning("Failed validating the configuration file.\n{}\n"
+                               "Using the default configuration.".format(e))
+                return False
+            set_config_validated(config_file, config_content, schema_content)
+
+    with profiling.span("config.set"):
         config.set_config(json_config)
-        logger.debug(f"Loaded configuratil file {config_file} successfully.")
-        return True
-    except jsonschema.exceptions.ValidationError as e:
-        logger.warning("Failed validating the configuration file.\n{}\n"
-                       "Using the default configuration.".format(e))
-        return False
+    logger.debug(f"Loaded configuratil file {config_file} successfully.")
+    return True
 
 
 def main():
@@ -100,6 +165,14 @@ def main():
                         dest="copy_to_clipboard",
                         action="store_true",
                         help="Copy the result into the clipboard.")
+    parser.add_argument("--no-cache",
+                        dest="no_cache",
+                        action="store_true",
+                        help="Do not use the response cache of Find, FindBatch, Enrich and Serve.")
+    parser.add_argument("--refresh",
+                        dest="refresh",
+                        action="store_true",
+                        help="Ignore cached responses of Find, FindBatch, Enrich and Serve and update the cache.")
     parser.add_argument("-v", "--verbose",
                         action="store_const",
                         dest="loglevel",
@@ -117,6 +190,27 @@ def main():
                         action='version',
                         version='%(prog)s {version}'.format(version=__version__),
                         help="Print the version.")
+    parser.add_argument("--profile",
+                        dest="profile",
+                        action="store_true",
+                        help="Print the time, number of calls and peak memory of each stage to stderr. The peak "
+                             "memory is the memory of the whole process, it is recorded for the stages of the main "
+                             "thread only.")
+    parser.add_argument("--profile-json",
+                        dest="profile_json",
+                        help="Write the statistics of each stage (see --profile) as JSON into this file.")
+    parser.add_argument("--profile-trace",
+                        dest="profile_trace",
+                        help="Write each call of a stage into this file in the Trace Event Format (chrome://tracing, "
+                             "Perfetto).")
+    parser.add_argument("--profile-no-memory",
+                        dest="profile_memory",
+                        action="store_false",
+                        help="Do not trace the peak memory while profiling. Tracing the memory slows down the "
+                             "command, the times are closer to an unprofiled run without.")
+    parser.add_argument("--cprofile",
+                        dest="cprofile_file",
+                        help="Profile the command with cProfile and write the statistics into this file (see pstats).")
 
     subparsers = parser.add_subparsers(dest='command',
                                        help="The functionality to use.",
@@ -126,6 +220,49 @@ def main():
     find_parser.add_argument(dest="title",
                              help="Title of publication.",
                              nargs="+")
+    find_parser.add_argument("--offline",
+                             dest="offline",
+                             action="store_true",
+                             help="Search the local index (see BuildIndex) instead of DBLP.")
+    find_parser.add_argument("--index",
+                             dest="index_directory",
+                             help="The directory of the local index. Default: {}".format(
+                                 cache.get_default_index_directory()))
+
+    build_index_parser = subparsers.add_parser("BuildIndex")
+    build_index_parser.add_argument(dest="dump",
+                                    help="The DBLP dump to index: dblp.xml, a .bib or a .jsonl file (optionally "
+                                         "gzipped).")
+    build_index_parser.add_argument("--index",
+                                    dest="index_directory",
+                                    help="The directory of the local index. Default: {}".format(
+                                        cache.get_default_index_directory()))
+
+    find_batch_parser = subparsers.add_parser("FindBatch")
+    find_batch_parser.add_argument("-i", "--input",
+                                   dest="input_file",
+                                   type=FileType('r', encoding='UTF-8'),
+                                   default="-",
+                                   help="File containing one title per line. Default: stdin")
+    find_batch_parser.add_argument("-o", "--output",
+                                   dest="output_file",
+                                   type=FileType('w', encoding='UTF-8'),
+                                   default="-",
+                                   help="The file to write the BibTeX entries to. Default: stdout")
+    find_batch_parser.add_argument("--report",
+                                   dest="report_file",
+                                   type=FileType('w', encoding='UTF-8'),
+                                   help="The file to write the ambiguous and not found titles to. Default: stderr")
+    find_batch_parser.add_argument("-w", "--workers",
+                                   dest="workers",
+                                   type=int,
+                                   default=8,
+                                   help="Number of titles resolved concurrently. Default: 8")
+    find_batch_parser.add_argument("--per-host",
+                                   dest="per_host",
+                                   type=int,
+                                   default=4,
+                                   help="Maximum number of concurrent requests per host. Default: 4")
 
     pretty_parser = subparsers.add_parser("Beautify")
     pretty_input_group = pretty_parser.add_mutually_exclusive_group(required=True)
@@ -137,23 +274,384 @@ def main():
                                     dest="input_clipboard",
                                     action="store_true",
                                     help="Use the clipboard")
+    # A path instead of a FileType, which would truncate the file before the input (maybe the same file) is read
+    pretty_parser.add_argument("-o", "--output",
+                               dest="output_path",
+                               help="Write the result into this file instead of printing it. The file is replaced "
+                                    "once the result is complete, so it may be the input file.")
+    pretty_parser.add_argument("--stream",
+                               dest="stream",
+                               action="store_true",
+                               help="Process the file (--file) entry by entry to keep the memory usage low. "
+                                    "Requires --output.")
+    pretty_parser.add_argument("--sort-run-size",
+                               dest="sort_run_size",
+                               type=int,
+                               help="Number of entries --stream sorts in memory if the entries are sorted (style -> "
+                                    "sortEntries). More entries are sorted in runs written to temporary files. "
+                                    "Default: {}".format(config.DEFAULT_SORT_RUN_SIZE))
+    pretty_parser.add_argument("--incremental",
+                               dest="incremental",
+                               action="store_true",
+                               help="Only format the entries of the file (--file) which changed since the last run. "
+                                    "The formatted entries are stored in a state file next to the file.")
+    pretty_parser.add_argument("--state",
+                               dest="state_file",
+                               help="The state file used by --incremental.")
+    pretty_parser.add_argument("--watch",
+                               dest="watch",
+                               action="store_true",
+                               help="Beautify the file (--file) in place and again after each change until "
+                                    "interrupted.")
+    pretty_parser.add_argument("--debounce",
+                               dest="debounce",
+                               type=float,
+                               default=config.DEFAULT_WATCH_DEBOUNCE,
+                               help="Seconds without further changes before --watch formats the file. "
+                                    "Default: {}".format(config.DEFAULT_WATCH_DEBOUNCE))
+    pretty_parser.add_argument("-j", "--jobs",
+                               dest="jobs",
+                               type=int,
+                               default=1,
+                               help="Number of processes used to parse, transform and write the entries. "
+                                    "Default: 1")
+
+    dedupe_parser = subparsers.add_parser("Dedupe")
+    dedupe_parser.add_argument("-f", "--file",
+                               dest="input_file",
+                               type=FileType('r', encoding='UTF-8'),
+                               required=True,
+                               help="The file to search for duplicate entries.")
+    dedupe_parser.add_argument("--merge",
+                               dest="merge",
+                               action="store_true",
+                               help="Merge the duplicates and print the resulting bibliography.")
+    dedupe_parser.add_argument("-o", "--output",
+                               dest="output_file",
+                               type=FileType('w', encoding='UTF-8'),
+                               help="Write the merged bibliography (--merge) into this file instead of printing it.")
+    dedupe_parser.add_argument("--report",
+                               dest="report_file",
+                               type=FileType('w', encoding='UTF-8'),
+                               help="The file to write the duplicates to. Default: stdout (stderr with --merge)")
+    dedupe_parser.add_argument("--threshold",
+                               dest="threshold",
+                               type=float,
+                               default=config.DEFAULT_DEDUPE_THRESHOLD,
+                               help="Minimum similarity of the titles of similar entries. Default: {}".format(
+                                   config.DEFAULT_DEDUPE_THRESHOLD))
+    dedupe_parser.add_argument("--window",
+                               dest="window",
+                               type=int,
+                               default=config.DEFAULT_DEDUPE_WINDOW,
+                               help="Number of neighbouring entries compared after sorting. Default: {}".format(
+                                   config.DEFAULT_DEDUPE_WINDOW))
+
+    prune_parser = subparsers.add_parser("Prune")
+    prune_parser.add_argument(dest="directory",
+                              nargs="?",
+                              default=".",
+                              help="The LaTeX project directory, all .tex files are scanned. Default: .")
+    prune_parser.add_argument("-f", "--file",
+                              dest="bib_files",
+                              action="append",
+                              help="The BibTeX file to prune (can be repeated). Default: the files of the "
+                                   "\\bibliography and \\addbibresource commands.")
+    prune_parser.add_argument("-o", "--output",
+                              dest="output_file",
+                              type=FileType('w', encoding='UTF-8'),
+                              help="Write the cited entries into this file instead of printing them.")
+    prune_parser.add_argument("--report",
+                              dest="report_file",
+                              type=FileType('w', encoding='UTF-8'),
+                              help="The file to write the undefined keys and unused entries to. Default: stderr")
+    prune_parser.add_argument("-j", "--jobs",
+                              dest="jobs",
+                              type=int,
+                              help="Number of processes scanning the .tex files. Default: number of CPUs")
+
+    merge_parser = subparsers.add_parser("Merge")
+    merge_parser.add_argument(dest="files",
+                              nargs="+",
+                              help="The BibTeX files to merge.")
+    merge_parser.add_argument("-o", "--output",
+                              dest="output_file",
+                              type=FileType('w', encoding='UTF-8'),
+                              help="Write the merged bibliography into this file instead of printing it.")
+    merge_parser.add_argument("--report",
+                              dest="report_file",
+                              type=FileType('w', encoding='UTF-8'),
+                              help="The file to write the keys with differing entries to. Default: stderr")
+    merge_parser.add_argument("--policy",
+                              dest="policy",
+                              choices=config.MERGE_POLICIES,
+                              default=config.DEFAULT_MERGE_POLICY,
+                              help="The entry kept if several files contain the key: the entry of the first file, "
+                                   "of the most recently modified file or the union of the fields (differing values "
+                                   "of other files are hidden). Default: {}".format(config.DEFAULT_MERGE_POLICY))
+
+    enrich_parser = subparsers.add_parser("Enrich")
+    enrich_parser.add_argument("-f", "--file",
+                               dest="input_file",
+                               type=FileType('r', encoding='UTF-8'),
+                               required=True,
+                               help="The file whose entries are enriched.")
+    enrich_parser.add_argument("-o", "--output",
+                               dest="output_file",
+                               type=FileType('w', encoding='UTF-8'),
+                               help="Write the enriched bibliography into this file instead of printing it.")
+    enrich_parser.add_argument("--report",
+                               dest="report_file",
+                               type=FileType('w', encoding='UTF-8'),
+                               help="The file to write the progress and the result of each entry to. Default: stderr")
+    enrich_parser.add_argument("--fields",
+                               dest="fields",
+                               nargs="+",
+                               help="The fields to add to entries lacking them. Default: settings -> enrich -> fields "
+                                    "of the configuration ({})".format(", ".join(config.DEFAULT_ENRICH_FIELDS)))
+    enrich_parser.add_argument("-w", "--workers",
+                               dest="workers",
+                               type=int,
+                               default=8,
+                               help="Number of entries resolved concurrently. Default: 8")
+    enrich_parser.add_argument("--per-host",
+                               dest="per_host",
+                               type=int,
+                               default=4,
+                               help="Maximum number of concurrent requests per host. Default: 4")
+
+    serve_parser = subparsers.add_parser("Serve")
+    serve_transport_group = serve_parser.add_mutually_exclusive_group()
+    serve_transport_group.add_argument("--socket",
+                                       dest="socket_path",
+                                       help="The Unix socket to listen on. Default: {}".format(
+                                           client.get_default_socket_path()))
+    serve_transport_group.add_argument("--stdio",
+                                       dest="stdio",
+                                       action="store_true",
+                                       help="Read the requests from stdin and write the responses to stdout.")
+    serve_parser.add_argument("-w", "--workers",
+                              dest="workers",
+                              type=int,
+                              default=8,
+                              help="Number of requests handled concurrently. Default: 8")
 
     args = parser.parse_args()
     logging.basicConfig(level=args.loglevel)
 
-    load_configuration(args.config_file)
+    profiler = None
+    if args.profile or args.profile_json is not None or args.profile_trace is not None:
+        profiler = profiling.Profiler(args.profile_memory)
+        profiling.set_profiler(profiler)
+        profiler.start()
+    try:
+        if args.cprofile_file is not None:
+            run_cprofiled(parser, args)
+        else:
+            run(parser, args)
+    finally:
+        if profiler is not None:
+            profiler.stop()
+            profiling.set_profiler(None)
+            write_profile(profiler, args)
+
+
+def run_cprofiled(parser, args):
+    # Imported on use like the modules of the subcommands
+    import cProfile
+    cprofile = cProfile.Profile()
+    try:
+        cprofile.runcall(run, parser, args)
+    finally:
+        cprofile.dump_stats(args.cprofile_file)
+
+
+def write_profile(profiler, args):
+    if args.profile:
+        print(profiler.format_table(), file=sys.stderr)
+    if args.profile_json is not None:
+        profiler.write_json(args.profile_json)
+    if args.profile_trace is not None:
+        profiler.write_trace(args.profile_trace)
+
 
-    if args.command == "Find":
+def run(parser, args):
+    with profiling.span("config.load"):
+        load_configuration(args.config_file)
+
+    if args.command in ("Find", "FindBatch", "Enrich", "Serve") and not args.no_cache \
+            and not getattr(args, "offline", False):
+        cache_file = os.path.join(cache.get_cache_directory(), cache.CACHE_FILE_NAME)
+        cache.set_cache(cache.ResponseCache(cache_file, config.get_cache_ttl(), config.get_cache_max_size()),
+                        args.refresh)
+
+    try:
+        with profiling.span("command." + args.command):
+            run_command(parser, args)
+    finally:
+        if cache.get_cache() is not None:
+            cache.get_cache().close()
+        http_client.close_client()
+
+
+def open_output(path):
+    """
+    Returns a context manager of the output file of the path: None without a path, stdout for "-", otherwise a
+    temporary file which replaces the file at the end (see util.open_atomically).
+    """
+    if path is None:
+        return nullcontext()
+    if path == "-":
+        return nullcontext(sys.stdout)
+    from bibhelper.util import open_atomically
+    return open_atomically(path)
+
+
+def check_beautify_arguments(parser, args):
+    """
+    Rejects options of Beautify which have no effect in the selected mode.
+    """
+    if args.jobs < 1:
+        parser.error("Beautify --jobs must be at least 1.")
+    if args.jobs > 1 and (args.stream or args.incremental or args.watch):
+        parser.error("Beautify --jobs can not be combined with --stream, --incremental or --watch.")
+    if args.sort_run_size is not None and not args.stream:
+        parser.error("Beautify --sort-run-size requires --stream.")
+
+
+def run_command(parser, args):
+    if args.command == "Beautify":
+        check_beautify_arguments(parser, args)
+
+    if args.command == "Find" and args.offline:
+        from bibhelper import index
+        from bibhelper.find import find
+        title = " ".join(args.title)
+        publication_index = index.PublicationIndex(args.index_directory or cache.get_default_index_directory())
+        try:
+            find(title, args.curlify, args.copy_to_clipboard, args.pretty, publication_index)
+        finally:
+            publication_index.close()
+    elif args.command == "Find":
+        from bibhelper.find import find
         title = " ".join(args.title)
         find(title, args.curlify, args.copy_to_clipboard, args.pretty)
+    elif args.command == "BuildIndex":
+        from bibhelper import index
+        count = index.build_index(args.dump, args.index_directory or cache.get_default_index_directory())
+        print("Indexed {} publications.".format(count))
+    elif args.command == "FindBatch":
+        if args.copy_to_clipboard:
+            parser.error("FindBatch can not be combined with --copy-to-clipboard.")
+        from bibhelper.find_batch import find_batch, read_titles
+        titles = read_titles(args.input_file)
+        find_batch(titles, args.output_file, args.report_file, args.curlify, args.pretty, args.workers,
+                   args.per_host)
+    elif args.command == "Beautify" and args.watch:
+        if args.input_file is None:
+            parser.error("Beautify --watch requires --file.")
+        if args.output_path is not None or args.copy_to_clipboard or args.stream or args.incremental:
+            parser.error("Beautify --watch rewrites the file and can not be combined with --output, "
+                         "--copy-to-clipboard, --stream or --incremental.")
+        args.input_file.close()
+        from bibhelper import watch
+        try:
+            watch.watch(args.input_file.name, args.curlify, args.pretty, args.debounce)
+        except KeyboardInterrupt:
+            pass
+    elif args.command == "Beautify" and args.stream:
+        if args.input_file is None or args.output_path is None:
+            parser.error("Beautify --stream requires --file and --output.")
+        if args.input_file is sys.stdin:
+            parser.error("Beautify --stream reads the file twice and can not read stdin.")
+        if os.path.exists(args.output_path) and os.path.samefile(args.input_file.name, args.output_path):
+            parser.error("Beautify --stream can not write the result into the input file.")
+        if args.copy_to_clipboard:
+            parser.error("Beautify --stream can not be combined with --copy-to-clipboard.")
+        sort_run_size = args.sort_run_size if args.sort_run_size is not None else config.DEFAULT_SORT_RUN_SIZE
+        if sort_run_size < 1:
+            parser.error("Beautify --sort-run-size must be at least 1.")
+        from bibhelper.beautify import beautify_stream
+        with open_output(args.output_path) as output_file:
+            beautify_stream(args.input_file, output_file, args.curlify, args.pretty, sort_run_size)
+        args.input_file.close()
+    elif args.command == "Beautify" and args.incremental:
+        if args.input_file is None:
+            parser.error("Beautify --incremental requires --file.")
+        from bibhelper.beautify import output
+        from bibhelper.incremental import beautify_incremental, get_default_state_path
+        beautify_content = args.input_file.read()
+        args.input_file.close()
+        state_file = args.state_file or get_default_state_path(args.input_file.name)
+        bib = beautify_incremental(beautify_content, state_file, args.curlify, args.pretty)
+        with open_output(args.output_path) as output_file:
+            output(bib, args.copy_to_clipboard, output_file)
     elif args.command == "Beautify":
+        from bibhelper.beautify import beautify
         if args.input_clipboard:
+            from bibhelper.util import read_from_clipboard
             beautify_content = read_from_clipboard()
         else:
             input_file = args.input_file
             beautify_content = input_file.read()
             input_file.close()
-        beautify(beautify_content, args.curlify, args.copy_to_clipboard, args.pretty)
+        with open_output(args.output_path) as output_file:
+            beautify(beautify_content, args.curlify, args.copy_to_clipboard, args.pretty, output_file, args.jobs)
+    elif args.command == "Dedupe":
+        if args.copy_to_clipboard:
+            parser.error("Dedupe can not be combined with --copy-to-clipboard.")
+        if args.output_file is not None and not args.merge:
+            parser.error("Dedupe --output requires --merge.")
+        from bibhelper import dedupe
+        dedupe_content = args.input_file.read()
+        args.input_file.close()
+        dedupe.dedupe(dedupe_content, args.output_file, args.report_file, args.merge, args.curlify, args.pretty,
+                      args.threshold, args.window)
+        for f in (args.output_file, args.report_file):
+            if f is not None:
+                f.close()
+    elif args.command == "Prune":
+        if args.copy_to_clipboard:
+            parser.error("Prune can not be combined with --copy-to-clipboard.")
+        from bibhelper import prune
+        prune.prune(args.directory, args.bib_files, args.output_file, args.report_file, args.curlify, args.pretty,
+                    args.jobs)
+        for f in (args.output_file, args.report_file):
+            if f is not None:
+                f.close()
+    elif args.command == "Merge":
+        if args.copy_to_clipboard:
+            parser.error("Merge can not be combined with --copy-to-clipboard.")
+        for path in args.files:
+            if not os.path.isfile(path):
+                parser.error("Merge: can't open '{}'.".format(path))
+        from bibhelper import merge
+        merge.merge(args.files, args.output_file, args.report_file, args.policy, args.curlify, args.pretty)
+        for f in (args.output_file, args.report_file):
+            if f is not None:
+                f.close()
+    elif args.command == "Enrich":
+        if args.copy_to_clipboard:
+            parser.error("Enrich can not be combined with --copy-to-clipboard.")
+        from bibhelper import enrich
+        enrich_content = args.input_file.read()
+        args.input_file.close()
+        enrich.enrich(enrich_content, args.output_file, args.report_file, args.fields, args.curlify, args.pretty,
+                      args.workers, args.per_host)
+        for f in (args.output_file, args.report_file):
+            if f is not None:
+                f.close()
+    elif args.command == "Serve":
+        if args.copy_to_clipboard:
+            parser.error("Serve can not be combined with --copy-to-clipboard.")
+        from bibhelper import server
+        try:
+            if args.stdio:
+                server.serve_stdio(args.workers)
+            else:
+                server.serve_socket(args.socket_path or client.get_default_socket_path(), args.workers)
+        except KeyboardInterrupt:
+            pass
     else:
         raise ValueError("Unknown ArgumentParser option: {}".format(args.command))
 
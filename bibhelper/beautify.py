@@ -1,51 +1,251 @@
 import logging
+import re
+from itertools import repeat
 
-import bibtexparser
+from bibhelper import bibtex_parser
+from bibhelper import bibtex_writer
 from bibhelper import config
-from bibhelper import handler_util
+from bibhelper import pipeline
+from bibhelper import profiling
+from bibhelper import sorting
 from bibhelper.handler import bibtex_handler
 from bibhelper.util import copy_to_clipboard
-from bibtexparser.bwriter import BibTexWriter
 
 logger = logging.getLogger(__name__)
 
+_STRING_PATTERN = re.compile(r"@\s*string\s*[{(]", re.IGNORECASE)
 
-def style(bib_database, curlify, pretty):
-    all_attributes = set()
 
-    for bib_entry in bib_database.entries:
-        if curlify:
-            handler_util.curlify_title(bib_entry)
-        if pretty:
-            handler_util.hide_attributes(bib_entry)
-            if config.is_rewrite_booktitle():
-                handler_util.rewrite_booktitle(bib_entry)
+def create_parser():
+    return bibtex_parser.create_parser()
+
+
+def transform_entries(entries, curlify, pretty):
+    with profiling.span("transform"):
+        return pipeline.create_pipeline(curlify, pretty).transform(entries)
 
-        # Collect all attributes
-        all_attributes.update(list(bib_entry.keys()))
 
-    writer = BibTexWriter()
-    bibtex_handler.apply_bibtex_writer_style(writer)
+def create_writer(all_attributes):
+    writer = bibtex_writer.FastWriter()
 
-    attributes_order = writer.display_order
     if config.is_sort_attributes():
         # Order attributes
-        attributes_order = bibtex_handler.create_attributes_order(all_attributes,
-                                                                  config.get_attribute_names(),
-                                                                  config.get_hide_prefix())
-    writer.display_order = attributes_order
+        with profiling.span("attributes_order"):
+            writer.display_order = config.get_style().attributes_order(all_attributes)
+    return writer
+
+
+def _style_writer(bib_database, curlify, pretty):
+    all_attributes = set()
+
+    bib_database.entries = transform_entries(bib_database.entries, curlify, pretty)
+    sort_key = config.get_style().entry_sort_key
+    if sort_key is not None:
+        with profiling.span("sort"):
+            bib_database.entries.sort(key=sort_key)
+    for bib_entry in bib_database.entries:
+        # Collect all attributes
+        all_attributes.update(bib_entry.keys())
 
-    bib = writer.write(bib_database)
+    return create_writer(all_attributes)
+
+
+def style(bib_database, curlify, pretty):
+    writer = _style_writer(bib_database, curlify, pretty)
+
+    with profiling.span("write"):
+        bib = writer.write(bib_database)
     return bib
 
 
-def beautify(content, curlify, is_copy_to_clipboard, pretty):
-    parser = bibtexparser.bparser.BibTexParser(ignore_nonstandard_types=False,
-                                               common_strings=True)
-    bib_database = bibtexparser.loads(content, parser=parser)
+def style_to_file(bib_database, curlify, pretty, output_file):
+    """
+    Like style, but writes the result directly to the output file (a text file or a file descriptor) instead of
+    returning it.
+    """
+    writer = _style_writer(bib_database, curlify, pretty)
+    with profiling.span("write"):
+        writer.dump(bib_database, output_file)
+
+
+def _format_chunks(chunks, strings, curlify, pretty):
+    """
+    Parses, transforms and writes a batch of chunks in a worker process of style_parallel. strings are the @string
+    definitions in front of the batch, which the entries may refer to. Returns the comments, preambles and strings of
+    the batch, the attributes of its entries and per entry the values it is sorted by (None if the entries are not
+    sorted) and the entry written without a field width.
+    """
+    parser = create_parser()
+    parser.expect_multiple_parse = True
+    if strings:
+        parser.parse(strings)
+    bib_database = parser.parse("".join(chunks))
+
+    entries = pipeline.create_pipeline(curlify, pretty).transform(bib_database.entries)
+    bib_database.entries = []
+    all_attributes = set()
+    for bib_entry in entries:
+        all_attributes.update(bib_entry.keys())
+
+    # The order of a subset of the attributes is the same as in the order of all attributes
+    writer = create_writer(all_attributes)
+    sort_key = config.get_style().entry_sort_key
+    formatted = [(sort_key.values(bib_entry) if sort_key is not None else None,
+                  writer.entry_to_bibtex(bib_entry, None)) for bib_entry in entries]
+    return bib_database, all_attributes, formatted
+
+
+def style_parallel(content, curlify, pretty, jobs):
+    """
+    Like parsing the content and style, but the content is split into batches of entries (see
+    bibtex_handler.split_entries) which are parsed, transformed and written by a pool of jobs processes. Only the
+    text of the batches and the formatted entries are passed between the processes. The entries are aligned and
+    sorted afterwards, so the result is identical to the result of a single process.
+    """
+    chunks = list(bibtex_handler.split_entries(content.splitlines(keepends=True)))
+    if jobs <= 1 or len(chunks) < 2 or bibtex_writer.ALIGN_MARKER in content:
+        with profiling.span("parse"):
+            bib_database = create_parser().parse(content)
+        return style(bib_database, curlify, pretty)
+
+    # Some batches per process balance the load if the entries differ in size.
+    batch_size = -(-len(chunks) // (jobs * 4))
+    batches = []
+    prefixes = []
+    strings = []
+    for i in range(0, len(chunks), batch_size):
+        batches.append(chunks[i:i + batch_size])
+        prefixes.append("".join(strings))
+        for chunk in batches[-1]:
+            block = chunk[chunk.find("@"):]
+            if _STRING_PATTERN.match(block):
+                strings.append(block)
+    logger.info("Formatting {} chunks in {} batches using {} processes.".format(len(chunks), len(batches), jobs))
 
+    # Imported on use, it takes longer than the startup of a single process run
+    from concurrent.futures import ProcessPoolExecutor
+    with profiling.span("format"), ProcessPoolExecutor(max_workers=jobs,
+                                                       initializer=config.set_config,
+                                                       initargs=(config.get_config(),)) as executor:
+        # map keeps the order of the batches
+        results = list(executor.map(_format_chunks, batches, prefixes, repeat(curlify), repeat(pretty)))
+
+    header_database = results[0][0]
+    all_attributes = set()
+    formatted = []
+    for bib_database, attributes, entries in results:
+        if bib_database is not header_database:
+            header_database.comments.extend(bib_database.comments)
+            header_database.preambles.extend(bib_database.preambles)
+            header_database.strings.update(bib_database.strings)
+        all_attributes.update(attributes)
+        formatted.extend(entries)
+
+    sort_key = config.get_style().entry_sort_key
+    if sort_key is not None:
+        with profiling.span("sort"):
+            formatted.sort(key=lambda values_text: sort_key.key(values_text[0]))
+
+    with profiling.span("write"):
+        writer = create_writer(all_attributes)
+        writer.contents = ["comments", "preambles", "strings"]
+        field_width = max([len(attribute) for attribute in all_attributes
+                           if attribute not in bibtex_writer.IGNORED_ATTRIBUTES], default=0)
+        entries = bibtex_writer.align(writer.entry_separator.join(text for _, text in formatted), field_width,
+                                      writer.indent)
+        return writer.write(header_database) + entries
+
+
+def beautify(content, curlify, is_copy_to_clipboard, pretty, output_file=None, jobs=1):
+    if jobs > 1:
+        output(style_parallel(content, curlify, pretty, jobs), is_copy_to_clipboard, output_file)
+        return
+
+    with profiling.span("parse"):
+        bib_database = create_parser().parse(content)
+
+    if output_file is not None and not is_copy_to_clipboard:
+        style_to_file(bib_database, curlify, pretty, output_file)
+        return
     content = style(bib_database, curlify, pretty)
+    output(content, is_copy_to_clipboard, output_file)
+
 
+def output(content, is_copy_to_clipboard, output_file=None):
     if is_copy_to_clipboard:
         copy_to_clipboard(content)
-    print(content)
+    if output_file is not None:
+        output_file.write(content)
+    else:
+        print(content)
+
+
+def iter_entries(input_file, parser):
+    """
+    Parses the input file chunk by chunk and yields each entry right after it was parsed. Comments, preambles and
+    strings are collected in the database of the parser.
+    """
+    parser.expect_multiple_parse = True
+    for chunk in bibtex_handler.split_entries(input_file):
+        parser.parse(chunk)
+
+        entries = parser.bib_database.entries
+        parser.bib_database.entries = []
+        yield from entries
+
+
+def _scan(input_file, curlify, pretty):
+    """
+    First pass of the streaming mode. Collects everything that is written in front of the entries (comments, preambles,
+    strings), all attribute names and the maximum width of an attribute name, which is used to align the values.
+    """
+    parser = create_parser()
+    transform = pipeline.create_pipeline(curlify, pretty)
+    all_attributes = set()
+    max_field_width = 0
+
+    for bib_entry in iter_entries(input_file, parser):
+        bib_entry = transform(bib_entry)
+
+        for attribute in bib_entry:
+            if attribute in all_attributes:
+                continue
+            all_attributes.add(attribute)
+            if attribute not in bibtex_writer.IGNORED_ATTRIBUTES:
+                max_field_width = max(max_field_width, len(attribute))
+
+    return parser.bib_database, all_attributes, max_field_width
+
+
+def beautify_stream(input_file, output_file, curlify, pretty, run_size=sorting.DEFAULT_RUN_SIZE):
+    """
+    Beautifies the input file entry by entry and writes each entry to the output file straight away, so memory usage
+    does not depend on the number of entries. The input file is read twice: the first pass determines the attribute
+    order and the alignment of the values, the second pass writes the entries. If the entries are sorted (style ->
+    sortEntries), at most run_size entries are held in memory (see sorting.sort_entries). The output is identical to
+    the output of beautify.
+    """
+    with profiling.span("scan"):
+        header_database, all_attributes, max_field_width = _scan(input_file, curlify, pretty)
+    input_file.seek(0)
+
+    # All entries are written separately, use the alignment of the whole file.
+    writer = create_writer(all_attributes)
+
+    writer.contents = ["comments", "preambles", "strings"]
+    writer.dump(header_database, output_file)
+
+    transform = pipeline.create_pipeline(curlify, pretty)
+    entries = (transform(bib_entry) for bib_entry in iter_entries(input_file, create_parser()))
+    sort_key = config.get_style().entry_sort_key
+    if sort_key is not None:
+        entries = sorting.sort_entries(entries, sort_key, run_size)
+    count = 0
+    with profiling.span("write"):
+        for bib_entry in entries:
+            if count > 0:
+                output_file.write(writer.entry_separator)
+            output_file.write(writer.entry_to_bibtex(bib_entry, max_field_width))
+            count += 1
+
+    logger.info("Wrote {} entries.".format(count))
@@ -0,0 +1,49 @@
+"""
+Measures the throughput of Beautify (parse, transform and write) for an increasing number of processes (--jobs).
+
+Usage: python -m bibhelper.benchmarks.bench_beautify_parallel --entries 100000 --max-jobs 8
+"""
+import json
+import os
+import time
+from argparse import ArgumentParser
+
+from bibhelper import beautify
+from bibhelper import config
+from bibhelper.benchmarks.generator import generate_bibtex
+
+CONFIG_FILE = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "resources",
+                           "latex_bib_helper_config.json")
+
+
+def main():
+    parser = ArgumentParser(description="Benchmark of Beautify --jobs.")
+    parser.add_argument("--entries", type=int, default=100000, help="Number of synthetic entries.")
+    parser.add_argument("--max-jobs", type=int, default=os.cpu_count(), help="Maximum number of processes.")
+    args = parser.parse_args()
+
+    with open(CONFIG_FILE, "r") as f:
+        config.set_config(json.load(f))
+
+    content = generate_bibtex(args.entries)
+    print("Beautifying {} entries ({:.1f} MB)...".format(args.entries, len(content) / 1024 ** 2))
+
+    print("{:>5} {:>10} {:>14} {:>8}".format("jobs", "seconds", "entries/s", "speedup"))
+    baseline = None
+    expected = None
+    for jobs in range(1, args.max_jobs + 1):
+        start = time.perf_counter()
+        result = beautify.style_parallel(content, True, True, jobs)
+        duration = time.perf_counter() - start
+
+        if expected is None:
+            baseline = duration
+            expected = result
+        elif result != expected:
+            raise AssertionError("Output of --jobs {} differs from --jobs 1.".format(jobs))
+        print("{:>5} {:>10.3f} {:>14.0f} {:>8.2f}".format(jobs, duration, args.entries / duration,
+                                                          baseline / duration))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Measures the calls per second of the booktitle shortname extraction over a corpus of DBLP booktitles: the previous
+implementation (compiling the patterns on every call), the compiled patterns without memoization and the memoized
+extraction. Each booktitle is repeated, as proceedings repeat within a bibliography.
+
+Usage: python -m bibhelper.benchmarks.bench_booktitle --repeat 200
+"""
+import re
+import time
+from argparse import ArgumentParser
+
+from bibhelper.benchmarks.generator import load_booktitles
+from bibhelper.handler import latex_handler
+
+
+def extract_by_compiling(booktitle):
+    # The extraction before the patterns were compiled once
+    patterns = [re.compile(r'{?\w+}?(?=(\n|\r|\s)+[0-9]{4})'),
+                re.compile(r'{[^{]*}$'),
+                re.compile(r'(^{?.*}?)(?:(\n|\r|\s)+\'[0-9]{2,4})'),
+                re.compile(r'(?:[0-9]{4})(?:\n|\r|\s)+({?\w+}?)')]
+    for shortname_pattern in patterns:
+        findings = re.search(shortname_pattern, booktitle)
+        if findings:
+            shortname_groups = findings.groups()
+            if len(shortname_groups) >= 1 and len(shortname_groups[0].strip()) > 0:
+                shortname = shortname_groups[0]
+            else:
+                shortname = findings.group(0)
+            if shortname.startswith("{"):
+                shortname = shortname[1:]
+            if shortname.endswith("}"):
+                shortname = shortname[:-1]
+            return shortname
+    return None
+
+
+def measure(function, booktitles):
+    start = time.perf_counter()
+    results = [function(booktitle) for booktitle in booktitles]
+    return time.perf_counter() - start, results
+
+
+def main():
+    parser = ArgumentParser(description="Benchmark of the booktitle shortname extraction.")
+    parser.add_argument("--repeat", type=int, default=200, help="Number of times each booktitle is repeated.")
+    args = parser.parse_args()
+
+    corpus = load_booktitles()
+    booktitles = corpus * args.repeat
+    print("{} calls ({} distinct booktitles)".format(len(booktitles), len(corpus)))
+
+    latex_handler.extract_booktitle_shortname.cache_clear()
+    implementations = [("compiling per call", extract_by_compiling),
+                       ("compiled", latex_handler.extract_booktitle_shortname.__wrapped__),
+                       ("compiled, memoized", latex_handler.extract_booktitle_shortname)]
+    expected = None
+    for name, function in implementations:
+        duration, results = measure(function, booktitles)
+        if expected is None:
+            expected = results
+        elif results != expected:
+            raise AssertionError("Shortnames of '{}' differ.".format(name))
+        print("  {:<20} {:>12.0f} calls/s".format(name, len(booktitles) / duration))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Measures the cost of reading the style configuration per entry: walking the configuration dictionary (as done before
+the style was compiled in config.set_config) compared to the compiled config.Style, and the resulting throughput of
+transforming entries (--pretty --curly).
+
+Usage: python -m bibhelper.benchmarks.bench_config --entries 100000
+"""
+import json
+import os
+import time
+from argparse import ArgumentParser
+
+from bibhelper import beautify
+from bibhelper import config
+from bibhelper.benchmarks.generator import generate_bibtex
+
+CONFIG_FILE = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "resources",
+                           "latex_bib_helper_config.json")
+
+
+def read_by_dict_walk():
+    # Configuration reads of one entry before the style was compiled (hide_attributes, is_rewrite_booktitle and
+    # rewrite_booktitle)
+    config.get_config_property("style", "hidePrefix")
+    attributes = config.get_config_property("style", "attributes")
+    [a["name"] for a in attributes if isinstance(a, dict) and a["hide"] is True]
+    config.get_config_property("style", "rewriteBooktitle", "rewrite")
+    config.get_config_property("style", "rewriteBooktitle", "nameWithPlaceholder")
+    config.get_config_property("style", "hidePrefix")
+
+
+def read_by_style():
+    style = config.get_style()
+    style.hide_prefix
+    style.hidden_attribute_names
+    config.get_style().rewrite_booktitle
+    style = config.get_style()
+    style.booktitle_template
+    style.hide_prefix
+
+
+def measure(function, count):
+    start = time.perf_counter()
+    for _ in range(count):
+        function()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = ArgumentParser(description="Benchmark of reading the style configuration.")
+    parser.add_argument("--entries", type=int, default=100000, help="Number of synthetic entries.")
+    args = parser.parse_args()
+
+    with open(CONFIG_FILE, "r") as f:
+        config.set_config(json.load(f))
+
+    print("Configuration reads per entry ({} entries):".format(args.entries))
+    for name, function in [("dict walk", read_by_dict_walk), ("compiled style", read_by_style)]:
+        duration = measure(function, args.entries)
+        print("  {:<16} {:>8.3f}s {:>10.2f} us/entry".format(name, duration, duration / args.entries * 1e6))
+
+    content = generate_bibtex(args.entries)
+    entries = beautify.create_parser().parse(content).entries
+    start = time.perf_counter()
+    beautify.transform_entries(entries, True, True)
+    duration = time.perf_counter() - start
+    print("Transforming {} entries: {:.3f}s ({:.0f} entries/s)".format(args.entries, duration,
+                                                                       args.entries / duration))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Measures the duplicate detection (see dedupe.find_duplicates) on a synthetic bibliography with injected duplicates
+(another key and a typo in the title). The time of comparing all pairs is extrapolated from a sample.
+
+Usage: python -m bibhelper.benchmarks.bench_dedupe --entries 100000 --duplicates 1000
+"""
+import random
+import time
+from argparse import ArgumentParser
+
+from bibhelper import bibtex_parser
+from bibhelper import dedupe
+from bibhelper.benchmarks.generator import generate_bibtex
+
+
+def main():
+    parser = ArgumentParser(description="Benchmark of the duplicate detection.")
+    parser.add_argument("--entries", type=int, default=100000, help="Number of synthetic entries.")
+    parser.add_argument("--duplicates", type=int, default=1000, help="Number of injected duplicates.")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    entries = bibtex_parser.create_parser(bibtex_parser.FAST).parse(generate_bibtex(args.entries)).entries
+    originals = rng.sample(range(len(entries)), args.duplicates)
+    for i in originals:
+        entries.append(dict(entries[i], ID="Duplicate:{}".format(i), title=entries[i]["title"] + "s"))
+    print("{} entries ({} injected duplicates)".format(len(entries), args.duplicates))
+
+    start = time.perf_counter()
+    clusters = dedupe.find_duplicates(entries, "_")
+    duration = time.perf_counter() - start
+    cluster_ids = {}
+    for cluster_id, cluster in enumerate(clusters):
+        cluster_ids.update((i, cluster_id) for i in cluster.indices)
+    found = sum(1 for duplicate, i in enumerate(originals, args.entries)
+                if i in cluster_ids and cluster_ids[i] == cluster_ids.get(duplicate))
+    # Titles of the generator consist of few words, so there are also duplicates by chance
+    print("  blocking   {:>10.3f}s {:>8} clusters, {} of {} injected duplicates found".format(
+        duration, len(clusters), found, args.duplicates))
+
+    records = [dedupe.Record(i, bib_entry, "_") for i, bib_entry in enumerate(entries[:1000])]
+    start = time.perf_counter()
+    for a in records:
+        for b in records:
+            dedupe.is_similar(a, b, dedupe.DEFAULT_THRESHOLD)
+    pair_duration = (time.perf_counter() - start) / len(records) ** 2
+    print("  all pairs  {:>10.0f}s (extrapolated)".format(pair_duration * len(entries) * (len(entries) - 1) / 2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Measures the throughput (MB/s) of the parser backends (settings -> parser) on a synthetic bibliography and checks that
+both backends yield the same database.
+
+Usage: python -m bibhelper.benchmarks.bench_parser --entries 20000
+"""
+import time
+from argparse import ArgumentParser
+
+from bibhelper import bibtex_parser
+from bibhelper.benchmarks.generator import generate_bibtex
+
+
+def parse(backend, content):
+    start = time.perf_counter()
+    bib_database = bibtex_parser.create_parser(backend).parse(content)
+    return time.perf_counter() - start, bib_database
+
+
+def main():
+    parser = ArgumentParser(description="Benchmark of the BibTeX parser backends.")
+    parser.add_argument("--entries", type=int, default=20000, help="Number of synthetic entries.")
+    args = parser.parse_args()
+
+    content = generate_bibtex(args.entries)
+    size = len(content.encode("UTF-8")) / 1e6
+    print("Parsing {} entries ({:.1f} MB):".format(args.entries, size))
+
+    expected = None
+    for backend in [bibtex_parser.BIBTEXPARSER, bibtex_parser.FAST]:
+        duration, bib_database = parse(backend, content)
+        result = (bib_database.entries, bib_database.comments, bib_database.strings)
+        if expected is None:
+            expected = result
+        elif result != expected:
+            raise AssertionError("Database of parser '{}' differs.".format(backend))
+        print("  {:<14} {:>8.3f}s {:>8.2f} MB/s".format(backend, duration, size / duration))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Measures the scanning of a synthetic LaTeX project tree for citations (see prune.scan_files) with one process and with
+a pool of processes.
+
+Usage: python -m bibhelper.benchmarks.bench_prune --files 5000 --jobs 4
+"""
+import os
+import random
+import tempfile
+import time
+from argparse import ArgumentParser
+
+from bibhelper import prune
+from bibhelper.benchmarks.generator import WORDS
+
+CITE_COMMANDS = ["cite", "citep", "citet", "parencite", "textcite", "autocite"]
+
+
+def generate_tex(rng, lines):
+    content = []
+    for _ in range(lines):
+        words = " ".join(rng.choice(WORDS) for _ in range(12))
+        if rng.random() < 0.2:
+            keys = ",".join("key{}".format(rng.randint(0, 5000)) for _ in range(rng.randint(1, 3)))
+            words += " \\{}[p.~{}]{{{}}}".format(rng.choice(CITE_COMMANDS), rng.randint(1, 100), keys)
+        if rng.random() < 0.05:
+            words = "% " + words
+        content.append(words)
+    return "\n".join(content) + "\n"
+
+
+def main():
+    parser = ArgumentParser(description="Benchmark of scanning .tex files for citations.")
+    parser.add_argument("--files", type=int, default=5000, help="Number of .tex files.")
+    parser.add_argument("--lines", type=int, default=200, help="Number of lines per file.")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(), help="Number of processes.")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    with tempfile.TemporaryDirectory() as directory:
+        size = 0
+        for i in range(args.files):
+            path = os.path.join(directory, "chapter{}".format(i % 50), "section{}.tex".format(i))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="UTF-8") as f:
+                size += f.write(generate_tex(rng, args.lines))
+        print("Scanning {} files ({:.1f} MB):".format(args.files, size / 1e6))
+
+        expected = None
+        for jobs in sorted({1, args.jobs}):
+            start = time.perf_counter()
+            citations, _ = prune.scan_files(prune.find_tex_files(directory), jobs)
+            duration = time.perf_counter() - start
+            if expected is None:
+                expected = citations
+            elif citations != expected:
+                raise AssertionError("Citations of {} processes differ.".format(jobs))
+            print("  {:>2} processes {:>8.3f}s {:>8} keys".format(jobs, duration, len(citations)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Measures the memory used by 100k publications (find.Publication) compared to the former plain classes with a
+per-instance __dict__.
+
+Usage: python -m bibhelper.benchmarks.bench_publications --count 100000
+"""
+import random
+import time
+import tracemalloc
+from argparse import ArgumentParser
+
+from bibhelper.benchmarks.generator import FIRST_NAMES, LAST_NAMES, VENUES, WORDS
+from bibhelper.find import Publication
+
+
+class LegacyAuthor:
+    def __init__(self, author):
+        self.pid = author["@pid"]
+        self.name = author["text"]
+
+
+class LegacyPublication:
+    """
+    Publication as implemented before (plain class, attributes in __dict__, authors in a list).
+    """
+
+    def __init__(self, hit):
+        info = hit["info"]
+        self.url = info["url"]
+        self.key = info["key"]
+        self.ee = info.get("ee")
+        self.doi = info.get("doi")
+        authors = info["authors"]["author"]
+        if not isinstance(authors, list):
+            authors = [authors]
+        self.authors = [LegacyAuthor(author) for author in authors]
+        self.title = info["title"]
+        self.venue = info.get("venue")
+        self.volume = info.get("volume")
+        self.number = info.get("number")
+        self.pages = info.get("pages")
+        self.chapter = info.get("chapter")
+        self.isbn = info.get("isbn")
+        self.publisher = info.get("publisher")
+        self.series = info.get("series")
+        self.year = info.get("year")
+        self.type = info.get("type")
+        self.sub_type = info.get("sub_type")
+
+
+def generate_hits(count):
+    """
+    Generates DBLP search hits. Each value is a new string object, as if it was decoded from a JSON response.
+    """
+    rng = random.Random(42)
+    for i in range(count):
+        key = "conf/{}/Gen{}".format(rng.choice(VENUES).lower(), i)
+        authors = [{"@pid": "{}/{}".format(rng.randint(1, 999), rng.randint(1000, 9999)),
+                    "text": "{} {}".format(rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES))}
+                   for _ in range(rng.randint(1, 5))]
+        yield {"info": {"authors": {"author": authors},
+                        "title": " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 9))) + ".",
+                        "venue": "".join(rng.choice(VENUES)),
+                        "pages": "{}-{}".format(rng.randint(1, 500), rng.randint(501, 1000)),
+                        "year": str(rng.randint(1990, 2023)),
+                        "type": " ".join(["Conference", "and", "Workshop", "Papers"]),
+                        "key": key,
+                        "doi": "10.1109/{}".format(i),
+                        "ee": "https://doi.org/10.1109/{}".format(i),
+                        "url": "https://dblp.org/rec/" + key}}
+
+
+def measure(create, count):
+    tracemalloc.start()
+    start = time.perf_counter()
+    publications = [create(hit) for hit in generate_hits(count)]
+    duration = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del publications
+    return size, duration
+
+
+def main():
+    parser = ArgumentParser(description="Memory benchmark of find.Publication.")
+    parser.add_argument("--count", type=int, default=100000, help="Number of publications.")
+    args = parser.parse_args()
+
+    print("{:>8} {:>12} {:>18} {:>10}".format("", "MiB", "bytes/publication", "seconds"))
+    for name, create in [("before", LegacyPublication), ("after", Publication.from_hit)]:
+        size, duration = measure(create, args.count)
+        print("{:>8} {:>12.1f} {:>18.0f} {:>10.2f}".format(name, size / 1024 ** 2, size / args.count, duration))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Measures the time to score candidate titles against a query, with cold (first query) and memoized (repeated
+candidates) title features.
+
+Usage: python -m bibhelper.benchmarks.bench_ranking --candidates 5000 --queries 20
+"""
+import random
+import time
+from argparse import ArgumentParser
+
+from bibhelper import ranking
+from bibhelper.benchmarks.generator import WORDS
+
+
+def main():
+    parser = ArgumentParser(description="Benchmark of the ranking of Find results.")
+    parser.add_argument("--candidates", type=int, default=5000, help="Number of candidate titles per query.")
+    parser.add_argument("--queries", type=int, default=20, help="Number of queries.")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    titles = [" ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 12))) + "." for _ in range(args.candidates)]
+    queries = [" ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 6))) for _ in range(args.queries)]
+
+    ranking.get_features.cache_clear()
+    start = time.perf_counter()
+    ranking.score_titles(queries[0], titles)
+    cold = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for query in queries:
+        ranking.score_titles(query, titles)
+    warm = (time.perf_counter() - start) / len(queries)
+
+    print("{:>10} {:>14} {:>16}".format("", "ms per query", "us per candidate"))
+    print("{:>10} {:>14.2f} {:>16.2f}".format("cold", cold * 1000, cold * 1e6 / args.candidates))
+    print("{:>10} {:>14.2f} {:>16.2f}".format("memoized", warm * 1000, warm * 1e6 / args.candidates))
+
+
+if __name__ == "__main__":
+    main()
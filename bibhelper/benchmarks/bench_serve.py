@@ -0,0 +1,90 @@
+"""
+Compares the latency of editor actions (beautifying a small file, finding a title) run by a new process of the command
+line tool per action and by a running server (Serve): a request on an open connection and the client shim, which is
+started per action like the command line tool. Find is answered by a local stand-in for DBLP.
+
+Usage: python -m bibhelper.benchmarks.bench_serve --entries 20 --repeat 20
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from argparse import ArgumentParser
+
+from bibhelper import cache
+from bibhelper import client
+from bibhelper import config
+from bibhelper import server
+from bibhelper.benchmarks.dblp_server import DBLPServer
+from bibhelper.benchmarks.generator import generate_bibtex
+
+CONFIG_FILE = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "resources",
+                           "latex_bib_helper_config.json")
+
+
+def measure(action, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        action()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def run(command, env):
+    subprocess.run([sys.executable, "-m"] + command, env=env, check=True, stdout=subprocess.DEVNULL)
+
+
+def main():
+    parser = ArgumentParser(description="Benchmark of the latency of requests to the server.")
+    parser.add_argument("--entries", type=int, default=20, help="Number of synthetic entries of the file.")
+    parser.add_argument("--repeat", type=int, default=20, help="Number of runs of each action.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory, DBLPServer() as dblp_server:
+        dblp_server.add_publication("conf/icde/FruthDS21", "Josch: Managing Schemas for NoSQL Document Stores.")
+        with open(CONFIG_FILE, "r") as f:
+            json_config = json.load(f)
+        json_config["settings"]["search"]["publicationUrl"] = dblp_server.publication_url
+        config_file = os.path.join(directory, "config.json")
+        with open(config_file, "w") as f:
+            json.dump(json_config, f)
+        config.set_config(json_config)
+        # Responses are not cached, every Find requests the stand-in
+        cache.set_cache(None)
+
+        path = os.path.join(directory, "references.bib")
+        with open(path, "w", encoding="UTF-8") as f:
+            f.write(generate_bibtex(args.entries))
+        with open(path, "r", encoding="UTF-8") as f:
+            content = f.read()
+        socket_path = os.path.join(directory, "bibhelper.sock")
+        env = dict(os.environ, XDG_CACHE_HOME=directory)
+
+        unix_server = server.UnixServer(socket_path, server.Service())
+        thread = threading.Thread(target=unix_server.serve_until_stopped)
+        thread.start()
+        try:
+            beautify = ["--pretty", "Beautify", "-f", path]
+            find = ["Find", "Josch", "Managing", "Schemas"]
+            with client.Client(socket_path) as connection:
+                print("Latency per action ({} runs, {} entries):".format(args.repeat, args.entries))
+                print("{:<22} {:>14} {:>14} {:>14}".format("", "command line", "client shim", "request"))
+                for name, cli_args, method, params in (
+                        ("Beautify", beautify, "beautify", {"content": content, "pretty": True, "document": path}),
+                        ("Find", find, "find", {"title": "Josch Managing Schemas"})):
+                    cold = measure(lambda: run(["bibhelper", "--config", config_file, "--no-cache"] + cli_args, env),
+                                   args.repeat)
+                    shim = measure(lambda: run(["bibhelper.client", "--socket", socket_path] + cli_args, env),
+                                   args.repeat)
+                    warm = measure(lambda: connection.call(method, **params), args.repeat)
+                    print("{:<22} {:>11.1f} ms {:>11.1f} ms {:>11.2f} ms".format(name, cold, shim, warm))
+        finally:
+            unix_server.service.shutdown()
+            thread.join()
+            unix_server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Measures the startup of the command line tool: the wall time of commands which do little work (--version, Beautify of
+a small file) with the configuration validated on every run (empty cache directory) and with the validated
+configuration cached, and the slowest imports reported by python -X importtime.
+
+Usage: python -m bibhelper.benchmarks.bench_startup --repeat 10
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+
+from bibhelper.benchmarks.generator import generate_bibtex
+from bibhelper.tests.test_main import import_time
+
+CONFIG_FILE = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "resources",
+                           "latex_bib_helper_config.json")
+
+
+def python_startup(repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def run(args, env, repeat, clear_directory=None):
+    duration = 0
+    for _ in range(repeat):
+        if clear_directory is not None:
+            for name in os.listdir(clear_directory):
+                os.unlink(os.path.join(clear_directory, name))
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-m", "bibhelper"] + args, env=env, check=True, stdout=subprocess.DEVNULL)
+        duration += time.perf_counter() - start
+    return duration / repeat * 1000
+
+
+def main():
+    parser = ArgumentParser(description="Benchmark of the startup of the command line tool.")
+    parser.add_argument("--repeat", type=int, default=10, help="Number of runs of each command.")
+    parser.add_argument("--entries", type=int, default=10, help="Number of synthetic entries beautified.")
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest imports printed.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        env = dict(os.environ, XDG_CACHE_HOME=directory)
+        cache_directory = os.path.join(directory, "bibhelper")
+        path = os.path.join(directory, "references.bib")
+        with open(path, "w", encoding="UTF-8") as f:
+            f.write(generate_bibtex(args.entries))
+        beautify = ["--config", CONFIG_FILE, "--curly", "--pretty", "Beautify", "-f", path]
+
+        print("Startup ({} runs):".format(args.repeat))
+        print("  python -c pass            {:>8.1f} ms".format(python_startup(args.repeat)))
+        print("  --version                 {:>8.1f} ms".format(run(["--version"], env, args.repeat)))
+        run(beautify, env, 1)
+        print("  Beautify, validating      {:>8.1f} ms".format(run(beautify, env, args.repeat, cache_directory)))
+        print("  Beautify, cached config   {:>8.1f} ms".format(run(beautify, env, args.repeat)))
+
+        # Modules imported by the interpreter itself (e.g. site) are not imported by the tool
+        interpreter_modules = import_time("-c", "pass", env=env)
+        modules = import_time("-m", "bibhelper", *beautify, env=env)
+        modules = {name: microseconds for name, microseconds in modules.items() if name not in interpreter_modules}
+        print("Slowest imports of Beautify (cumulative):")
+        for name, microseconds in sorted(modules.items(), key=lambda item: -item[1])[:args.top]:
+            print("  {:<40} {:>8.1f} ms".format(name, microseconds / 1000))
+
+
+if __name__ == "__main__":
+    main()
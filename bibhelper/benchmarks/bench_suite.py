@@ -0,0 +1,208 @@
+"""
+Runs the benchmark suite on a synthetic bibliography (see generator.py): parsing (fast parser and bibtexparser),
+transforming the entries, writing, beautify.style end to end, ordering the attributes, extracting booktitle
+shortnames and Find end to end against a local stand-in for DBLP with a simulated latency. The results are printed and
+can be written as JSON (--output) to compare commits (--compare).
+
+Usage: python -m bibhelper.benchmarks.bench_suite --entries 2000 --output results.json [--compare baseline.json]
+"""
+import copy
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from argparse import ArgumentParser
+
+from bibhelper import __version__
+from bibhelper import beautify
+from bibhelper import bibtex_parser
+from bibhelper import cache
+from bibhelper import config
+from bibhelper import find
+from bibhelper import find_batch
+from bibhelper import http_client
+from bibhelper import ranking
+from bibhelper.benchmarks.dblp_server import DBLPServer
+from bibhelper.benchmarks.generator import generate_bibtex, generate_titles, load_booktitles
+from bibhelper.handler import bibtex_handler
+from bibhelper.handler import latex_handler
+
+CONFIG_FILE = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "resources",
+                           "latex_bib_helper_config.json")
+
+# Version of the JSON format of the results
+RESULTS_VERSION = 1
+
+
+class Case:
+    """
+    A benchmark: setup prepares the input of one run (not measured), run processes it. items is the number of items
+    (e.g. entries) processed per run.
+    """
+
+    def __init__(self, name, setup, run, items, unit):
+        self.name = name
+        self.setup = setup
+        self.run = run
+        self.items = items
+        self.unit = unit
+
+
+def _find_title(title):
+    # Find without asking the user: search, rank, select and load the BibTeX entry
+    publications = find.load_publications(find.create_publications_url(title))
+    ranked = ranking.rank_publications(title, publications)
+    publication = find_batch.select_ranked(ranked) or ranked[0][1]
+    return find.load_bibitem(publication, True, True)
+
+
+def create_cases(content, titles, dblp_server):
+    entries = bibtex_parser.create_parser(bibtex_parser.FAST).parse(content).entries
+    style = config.get_style()
+    attribute_sets = [list(bib_entry.keys()) for bib_entry in entries]
+    booktitles = load_booktitles()
+
+    def parse():
+        return bibtex_parser.create_parser(bibtex_parser.FAST).parse(content)
+
+    def transformed():
+        bib_database = parse()
+        bib_database.entries = beautify.transform_entries(bib_database.entries, True, True)
+        return bib_database
+
+    def order_attributes(_):
+        for attributes in attribute_sets:
+            bibtex_handler.create_attributes_order(attributes, style.attribute_names, style.hide_prefix)
+
+    def extract_shortnames(_):
+        for booktitle in booktitles:
+            latex_handler.extract_booktitle_shortname(booktitle)
+
+    def find_titles(_):
+        for title in titles:
+            _find_title(title)
+
+    return [
+        Case("parse", lambda: content, bibtex_parser.create_parser(bibtex_parser.FAST).parse, len(entries), "entries"),
+        Case("parse_bibtexparser", lambda: content,
+             lambda c: bibtex_parser.create_parser(bibtex_parser.BIBTEXPARSER).parse(c), len(entries), "entries"),
+        Case("transform", lambda: copy.deepcopy(entries),
+             lambda e: beautify.transform_entries(e, True, True), len(entries), "entries"),
+        Case("write", transformed, lambda d: beautify.create_writer(
+            {attribute for bib_entry in d.entries for attribute in bib_entry}).write(d), len(entries), "entries"),
+        Case("style", parse, lambda d: beautify.style(d, True, True), len(entries), "entries"),
+        Case("create_attributes_order", lambda: None, order_attributes, len(attribute_sets), "entries"),
+        Case("extract_booktitle_shortname", latex_handler.extract_booktitle_shortname.cache_clear,
+             extract_shortnames, len(booktitles), "booktitles"),
+        Case("find", lambda: dblp_server.requests.clear(), find_titles, len(titles), "titles"),
+    ]
+
+
+def measure(case, repeat):
+    durations = []
+    for _ in range(repeat):
+        data = case.setup()
+        start = time.perf_counter()
+        case.run(data)
+        durations.append(time.perf_counter() - start)
+    median = statistics.median(durations)
+    return {"unit": case.unit,
+            "items": case.items,
+            "median": median,
+            "min": min(durations),
+            "durations": durations,
+            "items_per_second": case.items / median if median > 0 else None}
+
+
+def get_commit():
+    try:
+        process = subprocess.run(["git", "rev-parse", "HEAD"], cwd=os.path.dirname(os.path.realpath(__file__)),
+                                 capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return process.stdout.strip() or None
+
+
+def run_suite(entries=2000, repeat=5, titles=20, latency=0.02, seed=42, names=None):
+    """
+    Runs the benchmarks (all or the given names) and returns the results (see --output).
+    """
+    with open(CONFIG_FILE, "r") as f:
+        json_config = json.load(f)
+    content = generate_bibtex(entries, seed)
+    find_titles = generate_titles(titles, seed)
+
+    with DBLPServer(latency) as dblp_server:
+        for i, title in enumerate(find_titles):
+            dblp_server.add_publication("conf/gen/{}".format(i), title + ".")
+        json_config["settings"]["search"]["publicationUrl"] = dblp_server.publication_url
+        config.set_config(json_config)
+        # Every Find requests the stand-in, the connections are reused (as in one run of FindBatch)
+        previous_cache = cache.get_cache()
+        cache.set_cache(None)
+        http_client.close_client()
+        try:
+            results = {}
+            for case in create_cases(content, find_titles, dblp_server):
+                if names is None or case.name in names:
+                    results[case.name] = measure(case, repeat)
+        finally:
+            http_client.close_client()
+            cache.set_cache(previous_cache)
+
+    return {"version": RESULTS_VERSION,
+            "bibhelper": __version__,
+            "commit": get_commit(),
+            "date": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "parameters": {"entries": entries, "repeat": repeat, "titles": titles, "latency": latency, "seed": seed},
+            "results": results}
+
+
+def print_results(results, baseline=None, file=sys.stdout):
+    print("{:<30} {:>12} {:>18}{}".format("benchmark", "median", "throughput", "  vs. baseline" if baseline else ""),
+          file=file)
+    for name, result in results["results"].items():
+        line = "{:<30} {:>10.2f}ms {:>11.0f} {:<6}".format(name, result["median"] * 1000,
+                                                          result["items_per_second"] or 0, result["unit"] + "/s")
+        if baseline is not None and name in baseline["results"]:
+            # > 0: slower than the baseline
+            change = result["median"] / baseline["results"][name]["median"] - 1
+            line += " {:>+12.1%}".format(change)
+        print(line, file=file)
+
+
+def main():
+    parser = ArgumentParser(description="Benchmark suite of bibhelper.")
+    parser.add_argument("--entries", type=int, default=2000, help="Number of synthetic entries.")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of runs of each benchmark.")
+    parser.add_argument("--titles", type=int, default=20, help="Number of titles searched by the Find benchmark.")
+    parser.add_argument("--latency", type=float, default=0.02,
+                        help="Latency (seconds) of each response of the stand-in for DBLP.")
+    parser.add_argument("--seed", type=int, default=42, help="Seed of the synthetic bibliography.")
+    parser.add_argument("--only", nargs="+", help="Run only these benchmarks.")
+    parser.add_argument("-o", "--output", help="Write the results as JSON into this file.")
+    parser.add_argument("--compare", help="Results (JSON) of a previous run to compare with.")
+    args = parser.parse_args()
+
+    results = run_suite(args.entries, args.repeat, args.titles, args.latency, args.seed, args.only)
+    baseline = None
+    if args.compare is not None:
+        with open(args.compare, "r") as f:
+            baseline = json.load(f)
+        if baseline.get("parameters") != results["parameters"]:
+            print("Warning: the baseline was measured with other parameters: {}".format(baseline.get("parameters")),
+                  file=sys.stderr)
+    print_results(results, baseline)
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
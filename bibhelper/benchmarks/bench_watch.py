@@ -0,0 +1,65 @@
+"""
+Compares the latency of formatting a bibliography after changing one entry: a cold run of the command line tool
+(Python startup, loading and validating the configuration, parsing and formatting all entries) and a warm run of
+Beautify --watch (see watch.Reformatter), which only formats the changed entry.
+
+Usage: python -m bibhelper.benchmarks.bench_watch --entries 2000
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+
+from bibhelper import config
+from bibhelper import watch
+from bibhelper.benchmarks.generator import generate_bibtex
+
+CONFIG_FILE = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "resources",
+                           "latex_bib_helper_config.json")
+
+
+def change_entry(path, i):
+    with open(path, "r", encoding="UTF-8") as f:
+        content = f.read()
+    position = content.index("title", len(content) // 2)
+    with open(path, "w", encoding="UTF-8") as f:
+        f.write(content[:position] + "title = {{Changed {}}},\n    ".format(i) + content[position:])
+
+
+def main():
+    parser = ArgumentParser(description="Benchmark of the latency of Beautify --watch.")
+    parser.add_argument("--entries", type=int, default=2000, help="Number of synthetic entries.")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of changes.")
+    args = parser.parse_args()
+
+    with open(CONFIG_FILE, "r") as f:
+        config.set_config(json.load(f))
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "references.bib")
+        with open(path, "w", encoding="UTF-8") as f:
+            f.write(generate_bibtex(args.entries))
+        print("Formatting {} entries after changing one entry:".format(args.entries))
+
+        command = [sys.executable, "-m", "bibhelper", "--config", CONFIG_FILE, "--curly", "--pretty", "Beautify",
+                   "-f", path, "-o", os.path.join(directory, "output.bib")]
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            subprocess.run(command, check=True)
+        print("  cold command line {:>10.1f} ms".format((time.perf_counter() - start) / args.repeat * 1000))
+
+        reformat = watch.Reformatter(path, True, True)
+        reformat()
+        duration = 0
+        for i in range(args.repeat):
+            change_entry(path, i)
+            start = time.perf_counter()
+            reformat()
+            duration += time.perf_counter() - start
+        print("  warm --watch      {:>10.1f} ms".format(duration / args.repeat * 1000))
+
+
+if __name__ == "__main__":
+    main()
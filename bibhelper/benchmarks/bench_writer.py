@@ -0,0 +1,54 @@
+"""
+Measures the throughput (MB/s) of writing a styled bibliography with bibtexparser's BibTexWriter and with the
+FastWriter of bibhelper, and checks that both outputs are identical.
+
+Usage: python -m bibhelper.benchmarks.bench_writer --entries 50000
+"""
+import json
+import os
+import time
+from argparse import ArgumentParser
+
+from bibhelper import bibtex_parser
+from bibhelper import bibtex_writer
+from bibhelper import config
+from bibhelper.benchmarks.generator import generate_bibtex
+from bibhelper.handler import bibtex_handler
+from bibtexparser.bwriter import BibTexWriter
+
+CONFIG_FILE = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "resources",
+                           "latex_bib_helper_config.json")
+
+
+def main():
+    parser = ArgumentParser(description="Benchmark of the BibTeX writers.")
+    parser.add_argument("--entries", type=int, default=50000, help="Number of synthetic entries.")
+    args = parser.parse_args()
+
+    with open(CONFIG_FILE, "r") as f:
+        config.set_config(json.load(f))
+    bib_database = bibtex_parser.create_parser().parse(generate_bibtex(args.entries))
+    all_attributes = {attribute for bib_entry in bib_database.entries for attribute in bib_entry}
+    display_order = config.get_style().attributes_order(all_attributes)
+
+    reference_writer = BibTexWriter()
+    bibtex_handler.apply_bibtex_writer_style(reference_writer)
+    reference_writer.display_order = display_order
+    writers = [("BibTexWriter", reference_writer), ("FastWriter", bibtex_writer.FastWriter(display_order))]
+
+    print("Writing {} entries:".format(args.entries))
+    expected = None
+    for name, writer in writers:
+        start = time.perf_counter()
+        bib = writer.write(bib_database)
+        duration = time.perf_counter() - start
+        if expected is None:
+            expected = bib
+        elif bib != expected:
+            raise AssertionError("Output of '{}' differs.".format(name))
+        size = len(bib.encode("UTF-8")) / 1e6
+        print("  {:<14} {:>8.3f}s {:>8.2f} MB/s".format(name, duration, size / duration))
+
+
+if __name__ == "__main__":
+    main()
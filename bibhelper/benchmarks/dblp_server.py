@@ -0,0 +1,165 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs, unquote
+
+
+class DBLPServer:
+    """
+    Local stand-in for the DBLP API. Serves canned search results (JSON) and BibTeX entries of the added publications.
+
+    Usage:
+        with DBLPServer() as server:
+            server.add_publication("conf/icde/FruthDS21", "Josch: Managing Schemas for NoSQL Document Stores.")
+            config["settings"]["search"]["publicationUrl"] = server.publication_url
+
+    Each response is delayed by latency seconds, e.g. to simulate the round trip to DBLP in benchmarks.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.publications = {}
+        self.failures = []
+        self.requests = []
+        self.max_concurrent_requests = 0
+        self._concurrent_requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._create_handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True)
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return "http://{}:{}".format(host, port)
+
+    @property
+    def publication_url(self):
+        return self.url + "/search/publ/api?q={}&format=json"
+
+    def add_publication(self, key, title, authors=("Max Mustermann",), venue="ICDE", year="2021",
+                        booktitle="37th {IEEE} International Conference on Data Engineering, {ICDE} 2021", pages=None):
+        self.publications[key] = {"key": key,
+                                  "title": title,
+                                  "authors": list(authors),
+                                  "venue": venue,
+                                  "year": year,
+                                  "booktitle": booktitle,
+                                  "pages": pages}
+
+    def add_failures(self, status, count=1, retry_after=None):
+        """
+        The next count requests are answered with the status code (and the Retry-After header, if set).
+        """
+        headers = {"Retry-After": str(retry_after)} if retry_after is not None else {}
+        self.failures.extend([(status, headers)] * count)
+
+    def search(self, query):
+        words = query.casefold().split()
+        return [p for p in self.publications.values() if all(w in p["title"].casefold() for w in words)]
+
+    def create_hit(self, publication):
+        authors = [{"@pid": str(i), "text": name} for i, name in enumerate(publication["authors"])]
+        hit = {"info": {"authors": {"author": authors if len(authors) > 1 else authors[0]},
+                        "title": publication["title"],
+                        "venue": publication["venue"],
+                        "year": publication["year"],
+                        "type": "Conference and Workshop Papers",
+                        "key": publication["key"],
+                        "url": self.url + "/rec/" + publication["key"]}}
+        if publication["pages"] is not None:
+            hit["info"]["pages"] = publication["pages"]
+        return hit
+
+    def create_search_response(self, query):
+        hits = [self.create_hit(p) for p in self.search(query)]
+        result = {"hits": {"@total": str(len(hits)), "hit": hits}}
+        if not hits:
+            del result["hits"]["hit"]
+        return json.dumps({"result": result})
+
+    def create_bib_response(self, key):
+        publication = self.publications[key]
+        pages = "  pages     = {{{}}},\n".format(publication["pages"].replace("-", "--")) \
+            if publication["pages"] is not None else ""
+        return ("@inproceedings{{DBLP:{key},\n"
+                "  author    = {{{authors}}},\n"
+                "  title     = {{{title}}},\n"
+                "  booktitle = {{{booktitle}}},\n"
+                "{pages}"
+                "  publisher = {{{{IEEE}}}},\n"
+                "  year      = {{{year}}},\n"
+                "  url       = {{https://doi.org/10.0000/{key}}},\n"
+                "  doi       = {{10.0000/{key}}},\n"
+                "  biburl    = {{{url}/rec/{key}.bib}},\n"
+                "  bibsource = {{dblp computer science bibliography, https://dblp.org}}\n"
+                "}}\n").format(key=key,
+                               authors=" and\n               ".join(publication["authors"]),
+                               title=publication["title"].rstrip("."),
+                               booktitle=publication["booktitle"],
+                               pages=pages,
+                               year=publication["year"],
+                               url=self.url)
+
+    def _create_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def do_GET(self):
+                with server._lock:
+                    server.requests.append(self.path)
+                    server._concurrent_requests += 1
+                    server.max_concurrent_requests = max(server.max_concurrent_requests,
+                                                         server._concurrent_requests)
+                try:
+                    if server.latency > 0:
+                        time.sleep(server.latency)
+                    self._respond()
+                finally:
+                    with server._lock:
+                        server._concurrent_requests -= 1
+
+            def _respond(self):
+                with server._lock:
+                    failure = server.failures.pop(0) if server.failures else None
+                if failure is not None:
+                    status, headers = failure
+                    self._send(status, "text/plain", "Failure", headers)
+                    return
+
+                url = urlparse(self.path)
+                if url.path == "/search/publ/api":
+                    query = parse_qs(url.query).get("q", [""])[0]
+                    self._send(200, "application/json", server.create_search_response(query))
+                elif url.path.startswith("/rec/") and url.path.endswith(".bib"):
+                    key = unquote(url.path[len("/rec/"):-len(".bib")])
+                    if key in server.publications:
+                        self._send(200, "text/plain", server.create_bib_response(key))
+                    else:
+                        self._send(404, "text/plain", "Not found")
+                else:
+                    self._send(404, "text/plain", "Not found")
+
+            def _send(self, status, content_type, body, headers=None):
+                body = body.encode("UTF-8")
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._server.shutdown()
+        self._server.server_close()
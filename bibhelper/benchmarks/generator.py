@@ -0,0 +1,161 @@
+import os
+import random
+from argparse import ArgumentParser
+from dataclasses import dataclass, replace
+from typing import List, Optional, Tuple
+
+ENTRY_TYPES = ["inproceedings", "article", "book", "misc", "phdthesis"]
+
+FIRST_NAMES = ["Michael", "Stefanie", "Kai", "Erika", "Max", "Franz", "Anna", "Jens", "Maria", "Wolfgang"]
+LAST_NAMES = ["Fruth", "Scherzinger", "Dauberschmidt", "Mustermann", "Schmidt", "Meier", "Huber", "Wagner"]
+WORDS = ["Managing", "Schemas", "NoSQL", "Document", "Stores", "Tail", "Latencies", "Database", "Benchmarking",
+         "Query", "Processing", "Hardware", "Cloud", "Transactions", "Evolution", "Pitfalls", "Perils", "Scalable"]
+VENUES = ["ICDE", "SIGMOD", "VLDB", "CIDR", "EDBT", "DaMoN", "SoCC", "EuroSys", "ISCA", "PACT", "OOPSLA"]
+BOOKTITLE_PATTERNS = [
+    "{year_ordinal} {{IEEE}} International Conference on Data Engineering, {{{venue}}} {year}, Dallas, TX, USA",
+    "Proceedings of the {year_ordinal} International Workshop, {venue} {year}, San Francisco, CA, USA",
+    "{year} {{{venue}}} Annual Technical Conference, San Diego, CA, USA",
+    "{year} IEEE International Symposium on Workload Characterization {{{venue}}}",
+    "{{{venue}}} '{short_year}: International Conference on Parallel Architectures",
+    "Encyclopedia of Big Data Technologies",
+]
+JOURNALS = ["Datenbank-Spektrum", "{VLDB} J.", "Proc. {VLDB} Endow.", "{ACM} Trans. Database Syst."]
+
+BOOKTITLES_FILE = os.path.join(os.path.dirname(os.path.realpath(__file__)), "resources", "booktitles.txt")
+
+
+@dataclass(frozen=True)
+class CorpusOptions:
+    """
+    The mix of the generated entries. The probabilities are per entry.
+    """
+    entry_types: Tuple[str, ...] = tuple(ENTRY_TYPES)
+    # Relative frequencies of the entry types, all types are equally frequent if not set
+    entry_type_weights: Optional[Tuple[float, ...]] = None
+    pages: float = 0.7
+    publisher: float = 0.5
+    doi: float = 0.6
+    # An already hidden attribute (e.g. _doi), which collides with the attribute hidden by Beautify --pretty
+    hidden_collisions: float = 0.1
+    custom_attributes: float = 0.05
+    # Booktitle patterns (str.format with year, short_year, year_ordinal and venue) or literal booktitles
+    booktitle_patterns: Tuple[str, ...] = tuple(BOOKTITLE_PATTERNS)
+    booktitles: Optional[Tuple[str, ...]] = None
+
+
+DEFAULT_OPTIONS = CorpusOptions()
+
+
+def load_booktitles() -> List[str]:
+    """
+    Returns the booktitles of DBLP proceedings in resources/booktitles.txt.
+    """
+    with open(BOOKTITLES_FILE, "r", encoding="UTF-8") as f:
+        return [line.rstrip("\n") for line in f if line.strip() and not line.startswith("#")]
+
+
+def _title(rng):
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 9)))
+
+
+def _authors(rng):
+    authors = ["{} {}".format(rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)) for _ in range(rng.randint(1, 5))]
+    return " and\n               ".join(authors)
+
+
+def _booktitle(rng, year, options):
+    if options.booktitles is not None:
+        return rng.choice(options.booktitles)
+    return rng.choice(options.booktitle_patterns).format(year=year,
+                                                 short_year=str(year)[2:],
+                                                 year_ordinal="{}th".format(year - 1984),
+                                                 venue=rng.choice(VENUES))
+
+
+def generate_entry(rng, index, hide_prefix="_", options=DEFAULT_OPTIONS):
+    if options.entry_type_weights is None:
+        entry_type = rng.choice(options.entry_types)
+    else:
+        entry_type = rng.choices(options.entry_types, options.entry_type_weights)[0]
+    year = rng.randint(1990, 2023)
+
+    fields = [("author", _authors(rng)),
+              ("title", _title(rng))]
+    if entry_type == "inproceedings":
+        fields.append(("booktitle", _booktitle(rng, year, options)))
+    elif entry_type == "article":
+        fields.append(("journal", rng.choice(JOURNALS)))
+        fields.append(("volume", str(rng.randint(1, 50))))
+        fields.append(("number", str(rng.randint(1, 12))))
+    fields.append(("year", str(year)))
+    if rng.random() < options.pages:
+        fields.append(("pages", "{}--{}".format(rng.randint(1, 500), rng.randint(501, 1000))))
+    if rng.random() < options.publisher:
+        fields.append(("publisher", "{ACM}"))
+    if rng.random() < options.doi:
+        doi = "10.{}/{}.{}".format(rng.randint(1000, 9999), rng.randint(1000, 9999), index)
+        fields.append(("url", "https://doi.org/" + doi))
+        fields.append(("doi", doi))
+    if rng.random() < options.hidden_collisions:
+        # Collisions with already hidden attributes
+        fields.append((hide_prefix + "doi", "10.0000/hidden.{}".format(index)))
+    if rng.random() < options.custom_attributes:
+        fields.append(("custom{}".format(rng.randint(0, 20)), "custom value"))
+    rng.shuffle(fields)
+
+    key = "Gen:{}/{}".format(entry_type, index)
+    body = ",\n".join("  {:<9} = {{{}}}".format(name, value) for name, value in fields)
+    return "@{}{{{},\n{}\n}}\n".format(entry_type, key, body)
+
+
+def generate_bibtex(count, seed=42, hide_prefix="_", options=DEFAULT_OPTIONS):
+    """
+    Generates a deterministic synthetic BibTeX file content with count entries: the same arguments always generate the
+    same content.
+    """
+    rng = random.Random(seed)
+    return "\n".join(generate_entry(rng, i, hide_prefix, options) for i in range(count))
+
+
+def generate_titles(count, seed=42):
+    """
+    Generates count deterministic synthetic publication titles.
+    """
+    rng = random.Random(seed)
+    return [_title(rng) for _ in range(count)]
+
+
+def _parse_weights(value):
+    types, weights = zip(*(item.split("=") for item in value.split(",")))
+    return tuple(types), tuple(float(weight) for weight in weights)
+
+
+def main():
+    parser = ArgumentParser(description="Generates a synthetic BibTeX file.")
+    parser.add_argument("--entries", type=int, default=1000, help="Number of entries.")
+    parser.add_argument("--seed", type=int, default=42, help="Seed of the random generator.")
+    parser.add_argument("--hide-prefix", default="_", help="Prefix of the hidden attributes.")
+    parser.add_argument("--types", type=_parse_weights,
+                        help="Entry types and their relative frequencies, e.g. article=1,inproceedings=3.")
+    parser.add_argument("--hidden-collisions", type=float, default=DEFAULT_OPTIONS.hidden_collisions,
+                        help="Probability of an entry with an already hidden attribute.")
+    parser.add_argument("--dblp-booktitles", action="store_true",
+                        help="Use the booktitles of DBLP proceedings instead of the booktitle patterns.")
+    parser.add_argument("-o", "--output", help="The file to write to. Default: stdout")
+    args = parser.parse_args()
+
+    options = replace(DEFAULT_OPTIONS, hidden_collisions=args.hidden_collisions)
+    if args.types is not None:
+        options = replace(options, entry_types=args.types[0], entry_type_weights=args.types[1])
+    if args.dblp_booktitles:
+        options = replace(options, booktitles=tuple(load_booktitles()))
+    content = generate_bibtex(args.entries, args.seed, args.hide_prefix, options)
+    if args.output is None:
+        print(content)
+    else:
+        with open(args.output, "w", encoding="UTF-8") as f:
+            f.write(content)
+
+
+if __name__ == "__main__":
+    main()
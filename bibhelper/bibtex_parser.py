@@ -0,0 +1,352 @@
+import logging
+import re
+from typing import List, Tuple, Union
+
+import bibtexparser
+from bibhelper import config
+from bibtexparser.bibdatabase import BibDatabase, BibDataString, BibDataStringExpression
+
+logger = logging.getLogger(__name__)
+
+FAST = "fast"
+BIBTEXPARSER = "bibtexparser"
+BACKENDS = (FAST, BIBTEXPARSER)
+
+# Whitespace skipped between tokens (the default whitespace of pyparsing)
+_WHITESPACE = " \t\n\r"
+# Characters which must not precede or follow the keywords @string, @preamble and @comment
+_KEYWORD_CHARS = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_$")
+
+_ENTRY_TYPE_PATTERN = re.compile(r"[A-Za-z]+")
+_FIELD_NAME_PATTERN = re.compile(r"[A-Za-z0-9_\-().+]+")
+_STRING_NAME_PATTERN = re.compile(r"[A-Za-z0-9_\-:]+")
+_INTEGER_PATTERN = re.compile(r"[0-9]+")
+_BRACE_PATTERN = re.compile(r"[{}]")
+_QUOTED_PATTERN = re.compile(r'["{}]')
+# A comment ends in front of a line starting with @ or in front of trailing whitespace
+_COMMENT_END_PATTERN = re.compile(r"[ \t\r]*\n[ \t\n\r]*@|[ \t\n\r]*\Z")
+
+# A value is a list of parts: strings and names of @string definitions
+Value = List[Union[str, BibDataString]]
+
+
+def _strip_after_new_lines(value: str) -> str:
+    """
+    Removes leading whitespace of all but the first line (as bibtexparser does for the values of fields).
+    """
+    lines = value.splitlines()
+    if len(lines) > 1:
+        lines = [lines[0]] + [line.lstrip() for line in lines[1:]]
+    return "\n".join(lines)
+
+
+def _skip_whitespace(content: str, position: int) -> int:
+    length = len(content)
+    while position < length and content[position] in _WHITESPACE:
+        position += 1
+    return position
+
+
+def _skip_braces(content: str, position: int) -> int:
+    """
+    Returns the position after the curly brace closing the brace at position, -1 if it is not closed.
+    """
+    depth = 0
+    for match in _BRACE_PATTERN.finditer(content, position):
+        if match.group() == "{":
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return match.end()
+    return -1
+
+
+def _is_keyword(content: str, position: int, keyword: str) -> bool:
+    """
+    Checks for the (caseless) keyword at position, which must not be preceded or followed by a keyword character.
+    """
+    end = position + len(keyword)
+    if content[position:end].upper() != keyword:
+        return False
+    if position > 0 and content[position - 1].upper() in _KEYWORD_CHARS:
+        return False
+    return end >= len(content) or content[end].upper() not in _KEYWORD_CHARS
+
+
+def _remove_braces(content: str) -> str:
+    if content.startswith("{"):
+        content = content[1:]
+    if content.endswith("}"):
+        content = content[:-1]
+    return content
+
+
+class FastParser:
+    """
+    Hand-written single-pass BibTeX parser. The resulting database (entries, comments, preambles and strings) is
+    identical to the database of bibtexparser's BibTexParser(ignore_nonstandard_types=False, common_strings=True),
+    which remains the reference implementation: the grammar of bibtexparser is followed including its quirks, e.g.
+    tabs are expanded, malformed entries are kept as comments and the first of duplicate fields wins.
+
+    Like BibTexParser, multiple calls of parse add to the same database.
+    """
+
+    def __init__(self, common_strings: bool = True):
+        self.bib_database = BibDatabase()
+        if common_strings:
+            self.bib_database.load_common_strings()
+        # For compatibility with BibTexParser, the parser can always be called multiple times
+        self.expect_multiple_parse = False
+
+    def parse_file(self, file) -> BibDatabase:
+        return self.parse(file.read())
+
+    def parse(self, bibtex_str: str) -> BibDatabase:
+        content = bibtex_str
+        if content.startswith("\ufeff"):
+            # Byte-order mark
+            content = content[1:]
+        if "\t" in content:
+            content = content.expandtabs()
+
+        position = 0
+        length = len(content)
+        while True:
+            position = _skip_whitespace(content, position)
+            if position >= length:
+                break
+            if content[position] == "@":
+                end = self._parse_block(content, position)
+                if end >= 0:
+                    position = end
+                    continue
+            position = self._parse_implicit_comment(content, position)
+        return self.bib_database
+
+    def _parse_block(self, content: str, position: int) -> int:
+        """
+        Parses the block (string definition, preamble, comment or entry) starting with the @ at position. Returns the
+        position after the block or -1 if the block is malformed.
+        """
+        if _is_keyword(content, position, "@STRING"):
+            end = self._parse_string(content, position + 7)
+            if end >= 0:
+                return end
+        elif _is_keyword(content, position, "@PREAMBLE"):
+            end = self._parse_preamble(content, position + 9)
+            if end >= 0:
+                return end
+        elif _is_keyword(content, position, "@COMMENT"):
+            return self._parse_explicit_comment(content, position + 8)
+        return self._parse_entry(content, position)
+
+    def _parse_explicit_comment(self, content: str, position: int) -> int:
+        position = _skip_whitespace(content, position)
+        end = _COMMENT_END_PATTERN.search(content, position).start()
+        self.bib_database.comments.append(_remove_braces(content[position:end].rstrip("\n")))
+        return end
+
+    def _parse_implicit_comment(self, content: str, position: int) -> int:
+        end = _COMMENT_END_PATTERN.search(content, position).start()
+        self.bib_database.comments.append(content[position:end].rstrip("\n"))
+        return end
+
+    @staticmethod
+    def _parse_opener(content: str, position: int) -> Tuple[str, int]:
+        """
+        Returns the closing delimiter of the block opened at position and the position after the opening delimiter.
+        """
+        position = _skip_whitespace(content, position)
+        if content.startswith("{", position):
+            return "}", position + 1
+        if content.startswith("(", position):
+            return ")", position + 1
+        return "", -1
+
+    @staticmethod
+    def _parse_closer(content: str, position: int, closer: str) -> int:
+        position = _skip_whitespace(content, position)
+        if content.startswith(closer, position):
+            return position + 1
+        return -1
+
+    def _parse_string(self, content: str, position: int) -> int:
+        closer, position = self._parse_opener(content, position)
+        if position < 0:
+            return -1
+        position = _skip_whitespace(content, position)
+        match = _STRING_NAME_PATTERN.match(content, position)
+        if match is None:
+            return -1
+        position = _skip_whitespace(content, match.end())
+        if not content.startswith("=", position):
+            return -1
+        value, position = self._parse_string_expression(content, position + 1)
+        if position < 0:
+            return -1
+        position = self._parse_closer(content, position, closer)
+        if position < 0:
+            return -1
+
+        name = match.group().lower()
+        if name in self.bib_database.strings:
+            logger.warning("Overwriting existing string for key: %s.", name)
+        self.bib_database.strings[name] = self._expand(value, False)
+        return position
+
+    def _parse_preamble(self, content: str, position: int) -> int:
+        closer, position = self._parse_opener(content, position)
+        if position < 0:
+            return -1
+        value, position = self._parse_value(content, position)
+        if position < 0:
+            return -1
+        position = self._parse_closer(content, position, closer)
+        if position < 0:
+            return -1
+
+        if len(value) == 1 and isinstance(value[0], str):
+            self.bib_database.preambles.append(value[0])
+        else:
+            self.bib_database.preambles.append(BibDataStringExpression(value))
+        return position
+
+    def _parse_entry(self, content: str, position: int) -> int:
+        position = _skip_whitespace(content, position + 1)
+        match = _ENTRY_TYPE_PATTERN.match(content, position)
+        if match is None:
+            return -1
+        entry_type = match.group()
+        closer, position = self._parse_opener(content, match.end())
+        if position < 0:
+            return -1
+
+        # The key is everything up to the next comma
+        position = _skip_whitespace(content, position)
+        comma = content.find(",", position)
+        if comma < 0:
+            return -1
+        key = content[position:comma].strip()
+        if not key or any(c.isspace() for c in key):
+            return -1
+
+        name, value, position = self._parse_field(content, comma + 1)
+        if position < 0:
+            return -1
+        fields = [(name, value)]
+        while True:
+            comma = _skip_whitespace(content, position)
+            if not content.startswith(",", comma):
+                break
+            name, value, field_end = self._parse_field(content, comma + 1)
+            if field_end < 0:
+                # Trailing comma
+                position = comma + 1
+                break
+            fields.append((name, value))
+            position = field_end
+        position = self._parse_closer(content, position, closer)
+        if position < 0:
+            return -1
+
+        # The first of duplicate fields wins, the fields are in reverse order (as in bibtexparser)
+        unique_fields = {}
+        for name, value in reversed(fields):
+            unique_fields[name] = value
+        bib_entry = {}
+        for name, value in unique_fields.items():
+            bib_entry[name.lower()] = self._expand(value, True)
+        bib_entry["ENTRYTYPE"] = entry_type.lower()
+        bib_entry["ID"] = key
+        self.bib_database.entries.append(bib_entry)
+        return position
+
+    def _parse_field(self, content: str, position: int) -> Tuple[str, Value, int]:
+        position = _skip_whitespace(content, position)
+        match = _FIELD_NAME_PATTERN.match(content, position)
+        if match is None:
+            return "", [], -1
+        position = _skip_whitespace(content, match.end())
+        if not content.startswith("=", position):
+            return "", [], -1
+        value, position = self._parse_value(content, position + 1)
+        return match.group(), value, position
+
+    def _parse_value(self, content: str, position: int) -> Tuple[Value, int]:
+        position = _skip_whitespace(content, position)
+        match = _INTEGER_PATTERN.match(content, position)
+        if match is not None:
+            return [match.group()], match.end()
+        return self._parse_string_expression(content, position)
+
+    def _parse_string_expression(self, content: str, position: int) -> Tuple[Value, int]:
+        """
+        Parses parts (quoted or braced strings and names of strings) concatenated by #.
+        """
+        part, position = self._parse_part(content, position)
+        if position < 0:
+            return [], -1
+        value = [part]
+        while True:
+            concatenation = _skip_whitespace(content, position)
+            if not content.startswith("#", concatenation):
+                return value, position
+            part, part_end = self._parse_part(content, concatenation + 1)
+            if part_end < 0:
+                return value, position
+            value.append(part)
+            position = part_end
+
+    def _parse_part(self, content: str, position: int) -> Tuple[Union[str, BibDataString, None], int]:
+        position = _skip_whitespace(content, position)
+        if content.startswith("{", position):
+            end = _skip_braces(content, position)
+            if end < 0:
+                return None, -1
+            return content[position + 1:end - 1], end
+        if content.startswith('"', position):
+            # Quotes may only occur within curly braces
+            search_position = position + 1
+            while True:
+                match = _QUOTED_PATTERN.search(content, search_position)
+                if match is None or match.group() == "}":
+                    return None, -1
+                if match.group() == '"':
+                    return content[position + 1:match.start()], match.end()
+                search_position = _skip_braces(content, match.start())
+                if search_position < 0:
+                    return None, -1
+        match = _STRING_NAME_PATTERN.match(content, position)
+        if match is None:
+            return None, -1
+        return BibDataString(self.bib_database, match.group()), match.end()
+
+    def _expand(self, value: Value, is_field: bool) -> str:
+        """
+        Expands the names of strings and concatenates all parts. The lines of strings in values of fields are stripped.
+        """
+        if len(value) == 1 and isinstance(value[0], str):
+            text = _strip_after_new_lines(value[0]) if is_field else value[0]
+            return "" if text == "{}" else text
+        return "".join(self.bib_database.expand_string(part.name) if isinstance(part, BibDataString)
+                       else (_strip_after_new_lines(part) if is_field else part)
+                       for part in value)
+
+
+def create_reference_parser() -> bibtexparser.bparser.BibTexParser:
+    return bibtexparser.bparser.BibTexParser(ignore_nonstandard_types=False,
+                                             common_strings=True)
+
+
+def create_parser(backend: str = None):
+    """
+    Creates a parser of the backend (default: configured by settings -> parser). Both backends yield the same database,
+    the parser of bibtexparser is the (slower) reference implementation.
+    """
+    backend = backend or config.get_parser_backend()
+    if backend == FAST:
+        return FastParser()
+    if backend == BIBTEXPARSER:
+        return create_reference_parser()
+    raise ValueError("Unknown parser '{}'. Available parsers: {}".format(backend, ", ".join(BACKENDS)))
@@ -0,0 +1,156 @@
+import io
+from typing import Dict, Iterable, List, TextIO, Union
+
+from bibtexparser.bibdatabase import COMMON_STRINGS, BibDatabase, BibDataString, BibDataStringExpression
+
+# Attributes of an entry which are not written as fields
+IGNORED_ATTRIBUTES = frozenset(["ENTRYTYPE", "ID"])
+
+CONTENTS = ("comments", "preambles", "strings", "entries")
+
+# Written after the field names instead of the padding if the entries are written without a field width, which is
+# known later (see align)
+ALIGN_MARKER = "\x00"
+
+
+def _value_to_bibtex(value) -> str:
+    if isinstance(value, BibDataStringExpression):
+        return " # ".join([_value_to_bibtex(part) for part in value.expr])
+    if isinstance(value, BibDataString):
+        return value.name
+    return "{" + value + "}"
+
+
+def get_field_width(entries: Iterable[dict]) -> int:
+    """
+    Returns the length of the longest field name of all entries (the width the values are aligned to).
+    """
+    return max([len(attribute) for bib_entry in entries for attribute in bib_entry
+                if attribute not in IGNORED_ATTRIBUTES], default=0)
+
+
+def align(text: str, field_width: int, indent: str = " " * 4) -> str:
+    """
+    Aligns the values of entries written without a field width (see FastWriter.entry_to_bibtex) to the field width.
+    The text must not contain ALIGN_MARKER elsewhere.
+    """
+    parts = text.split(ALIGN_MARKER)
+    result = []
+    for part in parts[:-1]:
+        # Each part ends with a line containing the indent and the field name
+        field_length = len(part) - part.rindex("\n") - 1 - len(indent)
+        result.append(part)
+        result.append(" " * (field_width - field_length))
+    result.append(parts[-1])
+    return "".join(result)
+
+
+class FastWriter:
+    """
+    Writes a database in the style of bibtexparser's BibTexWriter configured by
+    bibtex_handler.apply_bibtex_writer_style (indent of 4 spaces, aligned values, entries in their original order).
+    The output is identical, but the alignment width is computed once per database, the layout of the fields is
+    cached per display order and set of fields and the output is written piece by piece to a file instead of building
+    the document.
+
+    Like BibTexWriter, align_values is either True (align to the longest field name of the entries) or the width.
+    """
+    MAX_LAYOUTS = 4096
+
+    def __init__(self, display_order: Iterable[str] = (), align_values: Union[bool, int] = True):
+        self.contents = list(CONTENTS)
+        self.indent = " " * 4
+        self.entry_separator = "\n"
+        self.align_values = align_values
+        # (display order, field width, fields of an entry) -> list of (field, text in front of the value)
+        self._layouts: Dict[tuple, list] = {}
+        self.display_order = display_order
+
+    @property
+    def display_order(self) -> List[str]:
+        return self._display_order
+
+    @display_order.setter
+    def display_order(self, display_order: Iterable[str]) -> None:
+        self._display_order = list(display_order)
+        self._display_order_set = frozenset(self._display_order)
+        # Part of the layout key, so layouts are reused if the order changes per entry (see incremental)
+        self._display_order_key = tuple(self._display_order)
+
+    def write(self, bib_database: BibDatabase) -> str:
+        output_file = io.StringIO()
+        self.dump(bib_database, output_file)
+        return output_file.getvalue()
+
+    def dump(self, bib_database: BibDatabase, output_file: Union[TextIO, int]) -> None:
+        """
+        Writes the database to the output file, which is either a text file or a file descriptor (which is not
+        closed).
+        """
+        if isinstance(output_file, int):
+            with open(output_file, "w", encoding="UTF-8", closefd=False) as f:
+                self.dump(bib_database, f)
+            return
+
+        for content in self.contents:
+            if content not in CONTENTS:
+                raise ValueError("Unknown content '{}'. Valid contents are {}.".format(content, ", ".join(CONTENTS)))
+            getattr(self, "_dump_" + content)(bib_database, output_file)
+
+    def _dump_comments(self, bib_database: BibDatabase, output_file: TextIO) -> None:
+        for comment in bib_database.comments:
+            output_file.write("@comment{{{0}}}\n{1}".format(comment, self.entry_separator))
+
+    def _dump_preambles(self, bib_database: BibDatabase, output_file: TextIO) -> None:
+        for preamble in bib_database.preambles:
+            output_file.write('@preamble{{"{0}"}}\n{1}'.format(preamble, self.entry_separator))
+
+    def _dump_strings(self, bib_database: BibDatabase, output_file: TextIO) -> None:
+        for name, value in bib_database.strings.items():
+            if name in COMMON_STRINGS and value == COMMON_STRINGS[name]:
+                # Predefined strings are only written if they were redefined
+                continue
+            output_file.write("@string{{{0} = {1}}}\n{2}".format(name, _value_to_bibtex(value),
+                                                                self.entry_separator))
+
+    def _dump_entries(self, bib_database: BibDatabase, output_file: TextIO) -> None:
+        if self.align_values is True:
+            field_width = get_field_width(bib_database.entries)
+        else:
+            field_width = int(self.align_values)
+
+        for index, bib_entry in enumerate(bib_database.entries):
+            if index > 0:
+                output_file.write(self.entry_separator)
+            output_file.write(self.entry_to_bibtex(bib_entry, field_width))
+
+    def _get_layout(self, bib_entry: dict, field_width: Union[int, None]) -> list:
+        key = (self._display_order_key, field_width, frozenset(bib_entry))
+        layout = self._layouts.get(key)
+        if layout is None:
+            # Fields of the display order first, then all other fields in alphabetical order
+            fields = [field for field in self._display_order if field in bib_entry]
+            fields += [field for field in sorted(bib_entry) if field not in self._display_order_set]
+            layout = [(field, ",\n" + self.indent + (field + ALIGN_MARKER if field_width is None
+                                                      else field.ljust(field_width)) + " = ")
+                      for field in fields if field not in IGNORED_ATTRIBUTES]
+            if len(self._layouts) >= self.MAX_LAYOUTS:
+                self._layouts.clear()
+            self._layouts[key] = layout
+        return layout
+
+    def entry_to_bibtex(self, bib_entry: dict, field_width: Union[int, None]) -> str:
+        """
+        Returns the entry with its values aligned to the field width. Without a field width (None), the field names are
+        followed by ALIGN_MARKER, which is replaced by align.
+        """
+        parts = ["@", bib_entry["ENTRYTYPE"], "{", bib_entry["ID"]]
+        for field, prefix in self._get_layout(bib_entry, field_width):
+            try:
+                value = _value_to_bibtex(bib_entry[field])
+            except TypeError:
+                raise TypeError("The field %s in entry %s must be a string" % (field, bib_entry["ID"]))
+            parts.append(prefix)
+            parts.append(value)
+        parts.append("\n}\n")
+        return "".join(parts)
@@ -0,0 +1,155 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Union
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+logger = logging.getLogger(__name__)
+
+CACHE_FILE_NAME = "responses.sqlite"
+# Seconds a hit does not update the access time of an entry which was accessed more recently, so repeated hits do not
+# write to the database. The least recently used entries are evicted with this resolution.
+ACCESS_TIME_RESOLUTION = 60
+
+_cache = None
+_refresh = False
+
+
+def get_cache_directory() -> str:
+    """
+    Returns the user cache directory of bibhelper, e.g. ~/.cache/bibhelper.
+    """
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(Path.home(), ".cache")
+    return os.path.join(cache_home, "bibhelper")
+
+
+def get_default_index_directory() -> str:
+    """
+    Returns the directory of the local index of Find --offline (see index.PublicationIndex).
+    """
+    return os.path.join(get_cache_directory(), "index")
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normalizes the URL used as key of the cache: scheme and host are lower-cased, query parameters are sorted and
+    whitespace within their values is collapsed.
+
+    Example:
+        "HTTP://DBLP.org/search/publ/api?q=Tail%20%20Latencies&format=json"
+
+    Result will be:
+        "http://dblp.org/search/publ/api?format=json&q=Tail+Latencies"
+    """
+    parts = urlsplit(url.strip())
+    query = sorted((name, " ".join(value.split())) for name, value in parse_qsl(parts.query, keep_blank_values=True))
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, urlencode(query), ""))
+
+
+class ResponseCache:
+    """
+    Persistent cache of HTTP response contents, stored in a SQLite database. Entries expire after ttl seconds. If the
+    size of all cached contents exceeds max_size bytes, the least recently used entries are evicted. The access time of
+    an entry is only updated if it is older than access_resolution seconds.
+    """
+
+    def __init__(self, path: str, ttl: float, max_size: int, access_resolution: float = ACCESS_TIME_RESOLUTION):
+        self.path = path
+        self.ttl = ttl
+        self.max_size = max_size
+        self.access_resolution = access_resolution
+        self.hits = 0
+        self.misses = 0
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # The cache is shared by the threads of FindBatch.
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("CREATE TABLE IF NOT EXISTS responses ("
+                                 "url TEXT PRIMARY KEY, "
+                                 "content BLOB NOT NULL, "
+                                 "size INTEGER NOT NULL, "
+                                 "created REAL NOT NULL, "
+                                 "accessed REAL NOT NULL)")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        self._connection.commit()
+
+    def get(self, url: str) -> Union[bytes, None]:
+        key = normalize_url(url)
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute("SELECT content, created, accessed FROM responses WHERE url = ?",
+                                           (key,)).fetchone()
+            if row is not None and now - row[1] > self.ttl:
+                # Expired
+                self._connection.execute("DELETE FROM responses WHERE url = ?", (key,))
+                self._connection.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                logger.info("Cache miss: {}".format(key))
+                return None
+
+            if now - row[2] >= self.access_resolution:
+                self._connection.execute("UPDATE responses SET accessed = ? WHERE url = ?", (now, key))
+                self._connection.commit()
+            self.hits += 1
+            logger.info("Cache hit: {}".format(key))
+            return row[0]
+
+    def put(self, url: str, content: bytes) -> None:
+        key = normalize_url(url)
+        now = time.time()
+        with self._lock:
+            self._connection.execute("INSERT OR REPLACE INTO responses (url, content, size, created, accessed) "
+                                     "VALUES (?, ?, ?, ?, ?)", (key, content, len(content), now, now))
+            self._evict()
+            self._connection.commit()
+
+    def _evict(self) -> None:
+        total_size = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total_size <= self.max_size:
+            return
+
+        # Delete least recently used entries until the cache fits into max_size
+        evicted = 0
+        rows = self._connection.execute("SELECT url, size FROM responses ORDER BY accessed ASC").fetchall()
+        for url, size in rows:
+            if total_size <= self.max_size:
+                break
+            self._connection.execute("DELETE FROM responses WHERE url = ?", (url,))
+            total_size -= size
+            evicted += 1
+        logger.debug("Evicted {} entries from the cache.".format(evicted))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM responses")
+            self._connection.commit()
+
+    def close(self) -> None:
+        logger.info("Cache statistics: {} hits, {} misses.".format(self.hits, self.misses))
+        with self._lock:
+            self._connection.close()
+
+
+def get_cache() -> Union[ResponseCache, None]:
+    return _cache
+
+
+def is_refresh() -> bool:
+    return _refresh
+
+
+def set_cache(response_cache: Union[ResponseCache, None], refresh: bool = False) -> None:
+    """
+    Sets the cache used for HTTP responses. If refresh is set to true, cached responses are not read, but new responses
+    are still written into the cache.
+    """
+    global _cache, _refresh
+    _cache = response_cache
+    _refresh = refresh
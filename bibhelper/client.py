@@ -0,0 +1,181 @@
+import itertools
+import json
+import os
+import socket
+import sys
+from argparse import ArgumentParser
+
+SOCKET_FILE_NAME = "bibhelper.sock"
+
+
+def get_default_socket_path() -> str:
+    """
+    Returns the default path of the server socket: in $XDG_RUNTIME_DIR if set, otherwise in the temporary directory.
+    """
+    runtime_directory = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_directory:
+        return os.path.join(runtime_directory, SOCKET_FILE_NAME)
+    return os.path.join(os.environ.get("TMPDIR") or "/tmp", "bibhelper-{}.sock".format(os.getuid()))
+
+
+def check_owner(path: str) -> None:
+    """
+    Raises PermissionError if the socket belongs to another user, who could read and alter the requests (e.g. by
+    creating the socket in the shared temporary directory before the server is started).
+    """
+    if os.stat(path).st_uid != os.getuid():
+        raise PermissionError("The socket {} belongs to another user.".format(path))
+
+
+class ServerError(Exception):
+    """
+    Error response of the server.
+    """
+
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class Client:
+    """
+    JSON-RPC 2.0 client of the server (see server.py). Requests and responses are sent as one JSON object per line.
+    The client only imports the standard library, so it starts as fast as the interpreter.
+    """
+
+    def __init__(self, path: str = None, timeout: float = None):
+        path = path or get_default_socket_path()
+        check_owner(path)
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.settimeout(timeout)
+        try:
+            self._socket.connect(path)
+        except OSError:
+            self._socket.close()
+            raise
+        self._file = self._socket.makefile("rb")
+        self._ids = itertools.count(1)
+
+    def call(self, method: str, **params):
+        """
+        Calls the method and returns its result. Raises ServerError if the server responds with an error.
+        """
+        request_id = next(self._ids)
+        request = {"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}
+        self._socket.sendall(json.dumps(request).encode("UTF-8") + b"\n")
+        while True:
+            line = self._file.readline()
+            if not line:
+                raise ConnectionError("The server closed the connection.")
+            response = json.loads(line)
+            if response.get("id") == request_id:
+                break
+        if "error" in response:
+            raise ServerError(response["error"]["code"], response["error"]["message"])
+        return response["result"]
+
+    def close(self) -> None:
+        self._file.close()
+        self._socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class _Unsupported(Exception):
+    pass
+
+
+class _ArgumentParser(ArgumentParser):
+
+    def error(self, message):
+        # Invalid arguments (e.g. a missing --file) are reported by the command line tool
+        raise _Unsupported(message)
+
+
+def _create_argument_parser() -> ArgumentParser:
+    # The options of the command line tool which are forwarded to the server. Anything else is run by the tool.
+    parser = _ArgumentParser(add_help=False)
+    parser.add_argument("--socket", dest="socket_path")
+    parser.add_argument("--curly", dest="curlify", action="store_true")
+    parser.add_argument("--pretty", dest="pretty", action="store_true")
+    subparsers = parser.add_subparsers(dest="command")
+    find_parser = subparsers.add_parser("Find", add_help=False)
+    find_parser.add_argument(dest="title", nargs="+")
+    beautify_parser = subparsers.add_parser("Beautify", add_help=False)
+    beautify_parser.add_argument("-f", "--file", dest="input_file", required=True)
+    beautify_parser.add_argument("-o", "--output", dest="output_file")
+    return parser
+
+
+def _parse_args(argv):
+    args, unknown = _create_argument_parser().parse_known_args(argv)
+    if unknown or args.command is None:
+        raise _Unsupported("Arguments are not supported by the server: {}".format(" ".join(unknown)))
+    return args
+
+
+def forward(argv, socket_path: str = None, output=None) -> int:
+    """
+    Runs Find or Beautify (given as arguments of the command line tool) by the server. Raises OSError if the server is
+    not running or the socket belongs to another user (see check_owner). Returns the exit code.
+    """
+    args = _parse_args(argv)
+    output = output or sys.stdout
+    with Client(socket_path or args.socket_path) as client:
+        if args.command == "Find":
+            title = " ".join(args.title)
+            result = client.call("find", title=title, curly=args.curlify, pretty=args.pretty)
+            if result["status"] == "AMBIGUOUS":
+                # The user chooses the publication interactively in the command line tool
+                raise _Unsupported("Several publications match the title.")
+            if result["status"] == "NOT_FOUND":
+                print("No publications found for title: {}".format(title), file=output)
+            else:
+                print(result["bib"], file=output)
+            return 0
+
+        with open(args.input_file, "r", encoding="UTF-8") as f:
+            content = f.read()
+        # The server keeps the formatted entries of the file, so only changed entries are formatted again
+        result = client.call("beautify", content=content, curly=args.curlify, pretty=args.pretty,
+                             document=os.path.abspath(args.input_file))
+        if args.output_file is not None:
+            with open(args.output_file, "w", encoding="UTF-8") as f:
+                f.write(result["bib"])
+        else:
+            print(result["bib"], file=output)
+        return 0
+
+
+def run_locally(argv) -> None:
+    """
+    Replaces the process by the command line tool.
+    """
+    arguments = []
+    skip = False
+    for arg in argv:
+        if not skip and not arg.startswith("--socket"):
+            arguments.append(arg)
+        skip = arg == "--socket"
+    os.execv(sys.executable, [sys.executable, "-m", "bibhelper"] + arguments)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    try:
+        exit_code = forward(argv)
+    except (_Unsupported, OSError):
+        run_locally(argv)
+    except ServerError as e:
+        print("Error: {}".format(e.message), file=sys.stderr)
+        exit_code = 1
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
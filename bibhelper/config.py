@@ -1,16 +1,124 @@
+from dataclasses import dataclass, field
+from typing import Optional, Tuple
+
+from bibhelper.handler.bibtex_handler import AttributesOrder
+from bibhelper.handler.latex_handler import ShortnameExtractor
+from bibhelper.sorting import DEFAULT_RUN_SIZE, EntrySortKey
+
 _config = None
+_style = None
+
+DEFAULT_AUTO_SELECT_THRESHOLD = 0.9
+DEFAULT_PARSER = "fast"
+DEFAULT_CACHE_TTL = 7 * 24 * 60 * 60  # One week
+DEFAULT_CACHE_MAX_SIZE = 100 * 1024 * 1024  # 100 MiB
+DEFAULT_HTTP_SETTINGS = {
+    "connectTimeout": 5,
+    "readTimeout": 30,
+    "retries": 3,
+    "backoffFactor": 0.5,
+    "maxBackoff": 60,
+    "poolSize": 10
+}
+# Fields which Enrich adds to entries lacking them
+DEFAULT_ENRICH_FIELDS = ["doi", "pages", "biburl"]
+
+# Defaults of command line options. They are defined here, so the command line tool builds its argument parser
+# without importing the modules of all subcommands.
+DEFAULT_DEDUPE_THRESHOLD = 0.9
+DEFAULT_DEDUPE_WINDOW = 10
+DEFAULT_WATCH_DEBOUNCE = 0.3
+MERGE_POLICIES = ("first", "newest", "union")
+DEFAULT_MERGE_POLICY = "first"
+# Entries sorted in memory by Beautify --stream, see sorting.sort_entries
+DEFAULT_SORT_RUN_SIZE = DEFAULT_RUN_SIZE
+
+
+@dataclass(frozen=True)
+class Style:
+    """
+    The style configuration (style -> ...) compiled once when the configuration is set, so handlers applied to every
+    entry do not walk the configuration.
+    """
+    attribute_names: Tuple[str, ...]
+    hidden_attribute_names: Tuple[str, ...]
+    hide_prefix: str
+    sort: bool
+    rewrite_booktitle: bool
+    booktitle_template: str
+    stages: Tuple[str, ...]
+    sort_entries: Tuple[str, ...]
+    attributes_order: AttributesOrder = field(compare=False, repr=False)
+    booktitle_shortname: ShortnameExtractor = field(compare=False, repr=False)
+    # None if the entries keep their order
+    entry_sort_key: Optional[EntrySortKey] = field(compare=False, repr=False)
+
+    @staticmethod
+    def from_config(config: dict) -> "Style":
+        style = config["style"]
+        attributes = style["attributes"]
+
+        # "attributes" : [
+        #   "author",
+        #   { "name": "author", "hide": True/False, ...}
+        # ]
+        attribute_names = tuple(a["name"] if isinstance(a, dict) else a for a in attributes)
+        sort_entries = tuple(style.get("sortEntries", []))
+        return Style(attribute_names=attribute_names,
+                     hidden_attribute_names=tuple(a["name"] for a in attributes
+                                                  if isinstance(a, dict) and a["hide"] is True),
+                     hide_prefix=style["hidePrefix"],
+                     sort=style["sort"],
+                     rewrite_booktitle=style["rewriteBooktitle"]["rewrite"],
+                     booktitle_template=style["rewriteBooktitle"]["nameWithPlaceholder"],
+                     stages=tuple(style.get("stages", [])),
+                     sort_entries=sort_entries,
+                     attributes_order=AttributesOrder(attribute_names, style["hidePrefix"]),
+                     booktitle_shortname=ShortnameExtractor(style["rewriteBooktitle"].get("venues")),
+                     entry_sort_key=EntrySortKey(sort_entries, style["hidePrefix"]) if sort_entries else None)
+
+
+def get_style() -> Style:
+    return _style
 
 
 def get_hide_prefix() -> str:
-    return get_config_property("style", "hidePrefix")
+    return _style.hide_prefix
 
 
 def is_sort_attributes() -> bool:
-    return get_config_property("style", "sort")
+    return _style.sort
 
 
 def is_rewrite_booktitle() -> bool:
-    return get_config_property("style", "rewriteBooktitle", "rewrite")
+    return _style.rewrite_booktitle
+
+
+def get_auto_select_threshold() -> float:
+    return get_optional_config_property(DEFAULT_AUTO_SELECT_THRESHOLD, "settings", "search", "autoSelectThreshold")
+
+
+def get_parser_backend() -> str:
+    return get_optional_config_property(DEFAULT_PARSER, "settings", "parser")
+
+
+def get_cache_ttl() -> float:
+    return get_optional_config_property(DEFAULT_CACHE_TTL, "settings", "cache", "ttl")
+
+
+def get_cache_max_size() -> int:
+    return get_optional_config_property(DEFAULT_CACHE_MAX_SIZE, "settings", "cache", "maxSize")
+
+
+def get_enrich_fields() -> [str]:
+    return get_optional_config_property(DEFAULT_ENRICH_FIELDS, "settings", "enrich", "fields")
+
+
+def get_http_setting(name: str):
+    """
+    Returns the setting of the HTTP client (settings -> http), e.g. 'readTimeout'.
+    """
+    return get_optional_config_property(DEFAULT_HTTP_SETTINGS[name], "settings", "http", name)
 
 
 def get_attribute_names(hidden_only: bool = False) -> [str]:
@@ -18,24 +126,9 @@ def get_attribute_names(hidden_only: bool = False) -> [str]:
     Returns the names of all attributes. If 'only_hide' is set to true, only the attribute names for which the hide
     property is set to true will be returned.
     """
-
-    # "attributes" : [
-    #   "author",
-    #   { "name": "author", "hide": True/False, ...}
-    # ]
-    attributes = get_config_property("style", "attributes")
-
     if hidden_only:
-        # Keep only hidden attributes
-        attributes = [a for a in attributes if isinstance(a, dict) and a["hide"] is True]
-
-    names = []
-    for attribute in attributes:
-        if isinstance(attribute, dict):
-            names.append(attribute["name"])
-        else:
-            names.append(attribute)
-    return names
+        return list(_style.hidden_attribute_names)
+    return list(_style.attribute_names)
 
 
 def get_config_property(*args):
@@ -54,6 +147,25 @@ def get_config_property(*args):
     return current_element
 
 
+def get_optional_config_property(default, *args):
+    """
+    Returns the configuration property or the default if the property (or one of its parents) does not exist.
+    """
+    try:
+        return get_config_property(*args)
+    except ValueError:
+        return default
+
+
+def get_config() -> dict:
+    return _config
+
+
 def set_config(config: dict):
-    global _config
+    """
+    Sets the (validated) configuration and compiles its style. The configuration must not be modified afterwards,
+    set a modified copy instead.
+    """
+    global _config, _style
     _config = config
+    _style = Style.from_config(config)
@@ -0,0 +1,231 @@
+import logging
+import re
+import sys
+from dataclasses import dataclass
+from typing import Dict, Iterable, List
+
+from bibhelper import beautify
+from bibhelper import config
+from bibhelper import ranking
+from bibhelper.handler import bibtex_handler
+
+logger = logging.getLogger(__name__)
+
+# Reasons why entries are considered duplicates
+KEY = "key"
+DOI = "doi"
+TITLE = "title"
+SIMILAR = "similar"
+
+# Minimum title similarity (see ranking.trigram_similarity) of similar entries
+DEFAULT_THRESHOLD = config.DEFAULT_DEDUPE_THRESHOLD
+# Number of neighbouring entries compared in each sorted order
+DEFAULT_WINDOW = config.DEFAULT_DEDUPE_WINDOW
+
+_DOI_PREFIX_PATTERN = re.compile(r"^\s*(https?://(dx\.)?doi\.org/|doi:\s*)", re.IGNORECASE)
+_YEAR_PATTERN = re.compile(r"[0-9]{4}")
+
+
+def normalize_doi(doi: str) -> str:
+    """
+    Normalizes a DOI for comparison: the resolver prefix (https://doi.org/, doi:) is removed and the DOI is
+    lower-cased (DOIs are case-insensitive).
+    """
+    return _DOI_PREFIX_PATTERN.sub("", doi).strip().lower()
+
+
+class Record:
+    """
+    The features of an entry which are compared to find duplicates.
+    """
+    __slots__ = ("index", "key", "doi", "title", "authors", "author_set", "year")
+
+    def __init__(self, index: int, bib_entry: dict, hide_prefix: str):
+        self.index = index
+        self.key = bib_entry.get("ID")
+        doi = bibtex_handler.get_field(bib_entry, "doi", hide_prefix)
+        self.doi = normalize_doi(doi) if doi else None
+        self.title = ranking.TitleFeatures(bibtex_handler.get_field(bib_entry, "title", hide_prefix) or "")
+        self.authors = ranking.get_last_names(bibtex_handler.get_field(bib_entry, "author", hide_prefix) or "")
+        self.author_set = frozenset(self.authors)
+        year = _YEAR_PATTERN.search(bibtex_handler.get_field(bib_entry, "year", hide_prefix) or "")
+        self.year = int(year.group()) if year else None
+
+
+def is_compatible(a: Record, b: Record) -> bool:
+    """
+    Two entries may be the same publication if they share an author (if both have authors) and were published at most
+    one year apart (e.g. a preprint and the paper).
+    """
+    if a.year is not None and b.year is not None and abs(a.year - b.year) > 1:
+        return False
+    return not (a.author_set and b.author_set and a.author_set.isdisjoint(b.author_set))
+
+
+def is_similar(a: Record, b: Record, threshold: float) -> bool:
+    """
+    Two entries are similar if their titles are similar and they are compatible (see is_compatible).
+    """
+    if not a.title.normalized or not b.title.normalized:
+        return False
+    if not is_compatible(a, b):
+        return False
+    size_a = len(a.title.trigrams)
+    size_b = len(b.title.trigrams)
+    if 2.0 * min(size_a, size_b) / (size_a + size_b) < threshold:
+        # Upper bound of the similarity
+        return False
+    return ranking.trigram_similarity(a.title, b.title) >= threshold
+
+
+class _DisjointSets:
+
+    def __init__(self, size: int):
+        self.parents = list(range(size))
+
+    def find(self, i: int) -> int:
+        parents = self.parents
+        while parents[i] != i:
+            parents[i] = parents[parents[i]]
+            i = parents[i]
+        return i
+
+    def union(self, i: int, j: int) -> bool:
+        """
+        Joins the sets of i and j, the smallest index is the root. Returns False if both are already in the same set.
+        """
+        root_i = self.find(i)
+        root_j = self.find(j)
+        if root_i == root_j:
+            return False
+        if root_j < root_i:
+            root_i, root_j = root_j, root_i
+        self.parents[root_j] = root_i
+        return True
+
+
+@dataclass
+class Cluster:
+    """
+    Indices of duplicate entries (in the order of the bibliography) and the reasons why they were matched.
+    """
+    indices: List[int]
+    reasons: List[str]
+
+
+def find_duplicates(entries: List[dict], hide_prefix: str, threshold: float = DEFAULT_THRESHOLD,
+                    window: int = DEFAULT_WINDOW) -> List[Cluster]:
+    """
+    Finds clusters of duplicate entries without comparing all pairs of entries: entries with the same key, DOI or
+    normalized title are found by hashing, entries with the same title must be compatible, too (see is_compatible),
+    e.g. articles titled "Editorial" are not duplicates. Similar entries are found by sorted neighbourhood blocking:
+    the entries are sorted by the normalized title and by first author, year and title, and each entry is only
+    compared to the next window - 1 entries of both orders.
+    """
+    records = [Record(i, bib_entry, hide_prefix) for i, bib_entry in enumerate(entries)]
+    sets = _DisjointSets(len(records))
+    matches = []  # (index, reason)
+
+    # The same key is a duplicate regardless of the entries (the keys must be unique), so is the same DOI
+    exact_features = [(KEY, lambda record: record.key),
+                      (DOI, lambda record: record.doi)]
+    for reason, get_feature in exact_features:
+        first_indices = {}
+        for record in records:
+            feature = get_feature(record)
+            if not feature:
+                continue
+            first_index = first_indices.setdefault(feature, record.index)
+            if first_index != record.index:
+                sets.union(first_index, record.index)
+                matches.append((record.index, reason))
+
+    same_titles: Dict[str, List[Record]] = {}
+    for record in records:
+        if not record.title.normalized:
+            continue
+        same_title = same_titles.setdefault(record.title.normalized, [])
+        compatible = [other for other in same_title if is_compatible(other, record)]
+        for other in compatible:
+            sets.union(other.index, record.index)
+        if compatible:
+            matches.append((record.index, TITLE))
+        same_title.append(record)
+
+    sort_keys = [lambda record: record.title.normalized,
+                 lambda record: (record.authors[:1], record.year or 0, record.title.normalized)]
+    comparisons = 0
+    for sort_key in sort_keys:
+        ordered = sorted(records, key=sort_key)
+        for i, record in enumerate(ordered):
+            for other in ordered[i + 1:i + window]:
+                if sets.find(record.index) == sets.find(other.index):
+                    continue
+                comparisons += 1
+                if is_similar(record, other, threshold):
+                    sets.union(record.index, other.index)
+                    matches.append((max(record.index, other.index), SIMILAR))
+    logger.info("Compared {} pairs of {} entries.".format(comparisons, len(records)))
+
+    indices: Dict[int, List[int]] = {}
+    for record in records:
+        indices.setdefault(sets.find(record.index), []).append(record.index)
+    reasons: Dict[int, set] = {}
+    for index, reason in matches:
+        reasons.setdefault(sets.find(index), set()).add(reason)
+    return [Cluster(cluster_indices, sorted(reasons[root]))
+            for root, cluster_indices in sorted(indices.items()) if len(cluster_indices) > 1]
+
+
+def merge_entries(entries: List[dict], hide_prefix: str) -> dict:
+    """
+    Merges duplicate entries into the first entry, which keeps its key, type and values. Values of the other entries
+    are added (see bibtex_handler.add_attribute).
+    """
+    merged = dict(entries[0])
+    for bib_entry in entries[1:]:
+        for attribute, value in bib_entry.items():
+            if attribute in ("ENTRYTYPE", "ID"):
+                continue
+            bibtex_handler.add_attribute(merged, attribute, value, hide_prefix)
+    return merged
+
+
+def merge_clusters(entries: List[dict], clusters: Iterable[Cluster], hide_prefix: str) -> List[dict]:
+    """
+    Returns the entries with each cluster replaced by its merged entry (at the position of the first entry).
+    """
+    merged_entries = {}
+    removed = set()
+    for cluster in clusters:
+        merged_entries[cluster.indices[0]] = merge_entries([entries[i] for i in cluster.indices], hide_prefix)
+        removed.update(cluster.indices[1:])
+    return [merged_entries.get(i, bib_entry) for i, bib_entry in enumerate(entries) if i not in removed]
+
+
+def format_cluster(entries: List[dict], cluster: Cluster) -> str:
+    keys = "; ".join(entries[i].get("ID", "") for i in cluster.indices)
+    title = entries[cluster.indices[0]].get("title", "")
+    return "{}\t{}\t{}".format(",".join(cluster.reasons), keys, title)
+
+
+def dedupe(content, output_file, report_file, merge, curlify, pretty, threshold=DEFAULT_THRESHOLD,
+           window=DEFAULT_WINDOW):
+    """
+    Reports the clusters of duplicate entries (one line per cluster: reasons, keys and title of the first entry). If
+    merge is set, the bibliography with merged duplicates is written to the output file and the report to the report
+    file (default: stderr).
+    """
+    bib_database = beautify.create_parser().parse(content)
+    hide_prefix = config.get_hide_prefix()
+    clusters = find_duplicates(bib_database.entries, hide_prefix, threshold, window)
+
+    report_file = report_file or (sys.stderr if merge else sys.stdout)
+    for cluster in clusters:
+        report_file.write(format_cluster(bib_database.entries, cluster) + "\n")
+    logger.info("Found {} clusters of duplicates in {} entries.".format(len(clusters), len(bib_database.entries)))
+
+    if merge:
+        bib_database.entries = merge_clusters(bib_database.entries, clusters, hide_prefix)
+        beautify.output(beautify.style(bib_database, curlify, pretty), False, output_file)
+    return clusters
@@ -0,0 +1,149 @@
+import logging
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional
+
+from bibhelper import beautify
+from bibhelper import config
+from bibhelper import find
+from bibhelper import find_batch
+from bibhelper import ranking
+from bibhelper.handler.bibtex_handler import add_attribute, get_field
+
+logger = logging.getLogger(__name__)
+
+ENRICHED = "ENRICHED"
+# The matching publication has none of the missing fields
+UNCHANGED = "UNCHANGED"
+NOT_FOUND = find_batch.NOT_FOUND
+FAILED = find_batch.FAILED
+
+_YEAR_PATTERN = re.compile(r"[0-9]{4}")
+
+
+class EnrichResult:
+
+    def __init__(self, index, key, status, values=None, publication=None, message=None):
+        self.index = index
+        self.key = key
+        self.status = status
+        self.values = values or {}
+        self.publication = publication
+        self.message = message
+
+    def __str__(self):
+        if self.status == ENRICHED:
+            detail = "{} ({})".format(", ".join(self.values), self.publication.key)
+        elif self.status == UNCHANGED:
+            detail = self.publication.key
+        elif self.status == FAILED:
+            detail = self.message
+        else:
+            detail = ""
+        return "{}\t{}\t{}".format(self.status, self.key, detail)
+
+
+def get_missing_fields(bib_entry: dict, fields: List[str], hide_prefix: str) -> List[str]:
+    """
+    Returns the fields the entry has neither visible nor hidden (e.g. "_doi" counts as "doi").
+    """
+    return [field for field in fields if get_field(bib_entry, field, hide_prefix) is None]
+
+
+def get_year(bib_entry: dict, hide_prefix: str) -> Optional[str]:
+    year = _YEAR_PATTERN.search(get_field(bib_entry, "year", hide_prefix) or "")
+    return year.group() if year else None
+
+
+def match_publication(title: str, year: Optional[str], publications: List[find.Publication]) \
+        -> Optional[find.Publication]:
+    """
+    Returns the first publication with the same normalized title (see ranking.normalize_title) and, if both are known,
+    the same year. Unlike Find, similar titles do not match: the fields of another publication (e.g. the preprint)
+    would be added to the entry.
+    """
+    normalized_title = ranking.normalize_title(title)
+    for publication in publications:
+        if ranking.normalize_title(publication.title) != normalized_title:
+            continue
+        if year is not None and publication.year is not None and publication.year != year:
+            continue
+        return publication
+    return None
+
+
+def resolve_entry(index: int, bib_entry: dict, missing_fields: List[str], hide_prefix: str,
+                  limiter: find_batch.HostLimiter) -> EnrichResult:
+    """
+    Searches the publication of the entry and returns the values of the missing fields found in its BibTeX entry. The
+    entry is not modified.
+    """
+    key = bib_entry.get("ID")
+    try:
+        title = get_field(bib_entry, "title", hide_prefix)
+        # The normalized title has no characters which would need escaping in the URL
+        publications_url = find.create_publications_url(ranking.normalize_title(title))
+        with limiter.limit(publications_url):
+            publications = find.load_publications(publications_url)
+
+        publication = match_publication(title, get_year(bib_entry, hide_prefix), publications)
+        if publication is None:
+            return EnrichResult(index, key, NOT_FOUND)
+
+        with limiter.limit(publication.url):
+            bib = find.load_bibitem(publication, False, False)
+        entries = beautify.create_parser().parse(bib).entries
+        found_entry = entries[0] if entries else {}
+        values = {field: found_entry[field] for field in missing_fields if field in found_entry}
+        return EnrichResult(index, key, ENRICHED if values else UNCHANGED, values, publication)
+    except Exception as e:
+        logger.warning("Enriching entry '{}' failed: {}".format(key, e))
+        return EnrichResult(index, key, FAILED, message=str(e))
+
+
+def enrich_entries(entries: List[dict], fields: List[str], report_file, workers: int = 8,
+                   per_host: int = 4) -> List[EnrichResult]:
+    """
+    Adds the missing fields to the entries (in place). The entries lacking a field are resolved concurrently, each
+    result is written to the report file as soon as it arrives. The results are returned in the order of the entries.
+    """
+    hide_prefix = config.get_hide_prefix()
+    candidates: Dict[int, List[str]] = {}
+    for i, bib_entry in enumerate(entries):
+        missing_fields = get_missing_fields(bib_entry, fields, hide_prefix)
+        if missing_fields and get_field(bib_entry, "title", hide_prefix):
+            candidates[i] = missing_fields
+    logger.info("{} of {} entries lack one of the fields {}.".format(len(candidates), len(entries),
+                                                                      ", ".join(fields)))
+
+    limiter = find_batch.HostLimiter(per_host)
+    results = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(resolve_entry, i, entries[i], missing_fields, hide_prefix, limiter)
+                   for i, missing_fields in candidates.items()]
+        for done, future in enumerate(as_completed(futures), 1):
+            result = future.result()
+            # Merged by this thread only, the workers just read the entries
+            for field, value in result.values.items():
+                add_attribute(entries[result.index], field, value, hide_prefix)
+            report_file.write("[{}/{}]\t{}\n".format(done, len(futures), result))
+            report_file.flush()
+            results.append(result)
+
+    results.sort(key=lambda result: result.index)
+    logger.info("Enriched {} of {} entries.".format(sum(result.status == ENRICHED for result in results),
+                                                    len(results)))
+    return results
+
+
+def enrich(content, output_file, report_file, fields, curlify, pretty, workers=8, per_host=4):
+    """
+    Adds the missing fields (default: settings -> enrich -> fields) to the entries of the bibliography and writes it
+    to the output file. The progress (one line per searched entry) is written to the report file (default: stderr).
+    """
+    bib_database = beautify.create_parser().parse(content)
+    results = enrich_entries(bib_database.entries, fields or config.get_enrich_fields(), report_file or sys.stderr,
+                             workers, per_host)
+    beautify.output(beautify.style(bib_database, curlify, pretty), False, output_file)
+    return results
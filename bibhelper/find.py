@@ -1,46 +1,132 @@
 import json
 import logging
+import sys
+from dataclasses import dataclass, fields
+from typing import Optional, Tuple
 
-import requests
-
-import bibtexparser
+from bibhelper import bibtex_parser
+from bibhelper import bibtex_writer
+from bibhelper import cache
 from bibhelper import config
-from bibhelper import handler_util
-from bibhelper.handler import bibtex_handler
+from bibhelper import http_client
+from bibhelper import pipeline
+from bibhelper import profiling
+from bibhelper import ranking
 from bibhelper.util import copy_to_clipboard
-from bibtexparser.bwriter import BibTexWriter
 
 logger = logging.getLogger(__name__)
 
 
-class Publication:
+def _interned(value):
+    """
+    Interns strings repeated across many publications (e.g. venue, type). Lists (DBLP returns a list if there are
+    multiple values) are converted to tuples, so publications stay immutable.
+    """
+    if isinstance(value, str):
+        return sys.intern(value)
+    if isinstance(value, list):
+        return tuple(_interned(v) for v in value)
+    return value
 
-    def __init__(self, hit):
-        info = hit["info"]
-        self.url = info["url"]
-        self.key = info["key"]
 
-        self.ee = info.get("ee")
-        self.doi = info.get("doi")
+def _immutable(value):
+    if isinstance(value, list):
+        return tuple(value)
+    return value
+
 
-        authors = info["authors"]["author"]
+@dataclass(slots=True, frozen=True)
+class Author:
+    pid: str
+    name: str
+
+    @classmethod
+    def from_hit(cls, author):
+        return cls(author.get("@pid", ""), sys.intern(author["text"]))
+
+    def __str__(self):
+        return self.name
+
+
+@dataclass(slots=True, frozen=True)
+class Publication:
+    # DBLP returns a list for attributes with multiple values (e.g. several ee links), these are stored as tuples.
+    key: str
+    url: str
+    title: str
+    authors: Tuple[Author, ...] = ()
+    ee: Optional[str] = None
+    doi: Optional[str] = None
+    venue: Optional[str] = None
+    volume: Optional[str] = None
+    number: Optional[str] = None
+    pages: Optional[str] = None
+    chapter: Optional[str] = None
+    isbn: Optional[str] = None
+    publisher: Optional[str] = None
+    series: Optional[str] = None
+    year: Optional[str] = None
+    type: Optional[str] = None
+    sub_type: Optional[str] = None
+    # BibTeX entry of the publication, if known upfront (e.g. from the offline index)
+    bib: Optional[str] = None
+
+    @classmethod
+    def from_hit(cls, hit):
+        """
+        Creates the publication from a hit of the DBLP search API.
+        """
+        info = hit["info"]
+
+        # Proceedings (editorships) have no authors
+        authors = info.get("authors", {}).get("author", [])
         if not isinstance(authors, list):
             authors = [authors]
-        self.authors = [Author(author) for author in authors]
-
-        self.title = info["title"]
-        self.venue = info.get("venue")
-        self.volume = info.get("volume")
-        self.number = info.get("number")
-        self.pages = info.get("pages")
-        self.chapter = info.get("chapter")
-        self.isbn = info.get("isbn")
-        self.publisher = info.get("publisher")
-        self.series = info.get("series")
-        self.year = info.get("year")
-        self.type = info.get("type")
-        self.sub_type = info.get("sub_type")
-        self.isbn = info.get("isbn")
+
+        return cls(key=info["key"],
+                   url=info["url"],
+                   title=info["title"],
+                   authors=tuple(Author.from_hit(author) for author in authors),
+                   ee=_immutable(info.get("ee")),
+                   doi=_immutable(info.get("doi")),
+                   venue=_interned(info.get("venue")),
+                   volume=info.get("volume"),
+                   number=info.get("number"),
+                   pages=info.get("pages"),
+                   chapter=info.get("chapter"),
+                   isbn=_immutable(info.get("isbn")),
+                   publisher=_interned(info.get("publisher")),
+                   series=_interned(info.get("series")),
+                   year=_interned(info.get("year")),
+                   type=_interned(info.get("type")),
+                   sub_type=_interned(info.get("sub_type")),
+                   bib=hit.get("bib"))
+
+    def to_dict(self) -> dict:
+        """
+        Returns a compact, JSON serializable representation (attributes which are not set are omitted).
+        """
+        result = {}
+        for field in fields(self):
+            value = getattr(self, field.name)
+            if value is None:
+                continue
+            if field.name == "authors":
+                value = [[author.pid, author.name] for author in value]
+            elif isinstance(value, tuple):
+                value = list(value)
+            result[field.name] = value
+        return result
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        """
+        Creates the publication from the representation returned by to_dict.
+        """
+        values = {name: _interned(value) if name in _INTERNED_FIELDS else _immutable(value)
+                  for name, value in data.items() if name != "authors"}
+        authors = tuple(Author(pid, sys.intern(name)) for pid, name in data.get("authors", []))
+        return cls(authors=authors, **values)
 
     def __str__(self):
         return "Title: {}\nAuthors: {}\n{} ({})".format(self.title,
@@ -49,29 +135,43 @@ class Publication:
                                                         self.year)
 
 
-class Author:
-    def __init__(self, author):
-        self.pid = author["@pid"]
-        self.name = author["text"]
+_INTERNED_FIELDS = {"venue", "publisher", "series", "year", "type", "sub_type"}
 
-    def __str__(self):
-        return self.name
+
+def fetch(url):
+    """
+    Returns the content of the URL. Successful responses are stored in the response cache (if set) and served from
+    there on subsequent calls.
+    """
+    response_cache = cache.get_cache()
+    if response_cache is not None and not cache.is_refresh():
+        with profiling.span("cache.get"):
+            content = response_cache.get(url)
+        if content is not None:
+            return content
+
+    with profiling.span("http.get"):
+        response = http_client.get_client().get(url)
+    if response.status_code != 200:
+        raise ValueError("Fetching was not successful. Website returned error code '{}'.\n"
+                         "URL: {}".format(response.status_code, url))
+
+    if response_cache is not None:
+        response_cache.put(url, response.content)
+    return response.content
 
 
 def load_publications(url):
     logger.info("Fetching publication from: {}".format(url))
 
-    response = requests.get(url)
-    if response.status_code != 200:
-        raise ValueError("Fetching publications was not successful. Website returned error code '{}'.\n"
-                         "URL: ".format(response.status_code, url))
-
-    content = json.loads(response.content)["result"]
-    hits = content["hits"]
-    logger.debug("Hits from response: {}".format(hits))
-    if int(hits["@total"]) == 0:
-        return []
-    return [Publication(hit) for hit in hits["hit"]]
+    content = fetch(url)
+    with profiling.span("search.decode"):
+        content = json.loads(content)["result"]
+        hits = content["hits"]
+        logger.debug("Hits from response: {}".format(hits))
+        if int(hits["@total"]) == 0:
+            return []
+        return [Publication.from_hit(hit) for hit in hits["hit"]]
 
 
 def ask_user_for_publication(publications):
@@ -104,56 +204,69 @@ def ask_user_for_publication(publications):
 
 
 def load_bibitem(publication, curlify, pretty):
-    bib_url = publication.url + ".bib"
+    with profiling.span("load_bibitem"):
+        return _load_bibitem(publication, curlify, pretty)
+
+
+def _load_bibitem(publication, curlify, pretty):
+    if publication.bib is not None:
+        bib = publication.bib
+    else:
+        bib_url = publication.url + ".bib"
 
-    logger.info("URL: {}".format(publication.url))
-    logger.info("BIB-URL: {}".format(bib_url))
+        logger.info("URL: {}".format(publication.url))
+        logger.info("BIB-URL: {}".format(bib_url))
 
-    response = requests.get(bib_url)
-    bib = response.content.decode("UTF-8")
+        bib = fetch(bib_url).decode("UTF-8")
 
     if not curlify and not pretty:
         # Return result of URL immediately. No processing by BIBTeX-Parser needed.
         return bib
 
-    bib_database = bibtexparser.loads(bib)
+    with profiling.span("parse"):
+        bib_database = bibtex_parser.create_parser().parse(bib)
 
+    with profiling.span("transform"):
+        bib_database.entries = pipeline.create_pipeline(curlify, pretty).transform(bib_database.entries)
     # We only have one single entry -> [0]
     bib_entry = bib_database.entries[0]
 
-    if curlify:
-        handler_util.curlify_title(bib_entry)
-    if pretty:
-        handler_util.hide_attributes(bib_entry)
-        if config.is_rewrite_booktitle():
-            handler_util.rewrite_booktitle(bib_entry)
-
-    writer = BibTexWriter()
-    bibtex_handler.apply_bibtex_writer_style(writer)
-
-    attributes_order = writer.display_order
+    writer = bibtex_writer.FastWriter()
     if config.is_sort_attributes():
         # Order attributes
-        attributes_order = bibtex_handler.create_attributes_order(bib_entry.keys(),
-                                                                  config.get_attribute_names(),
-                                                                  config.get_hide_prefix())
-    writer.display_order = attributes_order
+        with profiling.span("attributes_order"):
+            writer.display_order = config.get_style().attributes_order(bib_entry.keys())
 
-    bib = writer.write(bib_database)
+    with profiling.span("write"):
+        bib = writer.write(bib_database)
     return bib
 
 
-def find(title, curlify, is_copy_to_clipboard, pretty):
+def create_publications_url(title):
     publications_url = config.get_config_property("settings", "search", "publicationUrl")
-    publications_url = publications_url.format(title)  # Set title as query in  URL
+    return publications_url.format(title)  # Set title as query in  URL
+
 
-    publications = load_publications(publications_url)
+def find(title, curlify, is_copy_to_clipboard, pretty, offline_index=None):
+    with profiling.span("search"):
+        if offline_index is not None:
+            publications = offline_index.search(title)
+        else:
+            publications = load_publications(create_publications_url(title))
 
     if len(publications) == 0:
         print("No publications found for title: {}".format(title))
         return
 
-    publication = ask_user_for_publication(publications)
+    # Show the best matching publications first
+    with profiling.span("rank"):
+        ranked = ranking.rank_publications(title, publications)
+        publications = [publication for _, publication in ranked]
+        publication = ranking.select_ranked(ranked, config.get_auto_select_threshold())
+    if publication is not None:
+        logger.info("Selected publication automatically: {}".format(publication.key))
+    else:
+        publication = ask_user_for_publication(publications)
 
     if publication:
         item = load_bibitem(publication, curlify, pretty)
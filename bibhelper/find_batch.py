@@ -0,0 +1,148 @@
+import logging
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+from bibhelper import beautify
+from bibhelper import config
+from bibhelper import find
+from bibhelper import ranking
+
+logger = logging.getLogger(__name__)
+
+FOUND = "FOUND"
+AMBIGUOUS = "AMBIGUOUS"
+NOT_FOUND = "NOT_FOUND"
+FAILED = "FAILED"
+
+
+class HostLimiter:
+    """
+    Limits the number of concurrent requests per host.
+    """
+
+    def __init__(self, per_host):
+        self._per_host = per_host
+        self._lock = threading.Lock()
+        self._semaphores = {}
+
+    @contextmanager
+    def limit(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = threading.BoundedSemaphore(self._per_host)
+            semaphore = self._semaphores[host]
+        with semaphore:
+            yield
+
+
+class BatchResult:
+
+    def __init__(self, title, status, publications=None, bib=None, message=None):
+        self.title = title
+        self.status = status
+        self.publications = publications or []
+        self.bib = bib
+        self.message = message
+
+    def __str__(self):
+        if self.status == AMBIGUOUS:
+            detail = "; ".join("{} ({})".format(p.title, p.key) for p in self.publications)
+        elif self.status == FAILED:
+            detail = self.message
+        elif self.status == FOUND:
+            detail = self.publications[0].key
+        else:
+            detail = ""
+        return "{}\t{}\t{}".format(self.status, self.title, detail)
+
+
+def read_titles(input_file):
+    """
+    Reads one title per line. Empty lines and lines starting with '#' are skipped.
+    """
+    titles = []
+    for line in input_file:
+        title = line.strip()
+        if title and not title.startswith("#"):
+            titles.append(title)
+    return titles
+
+
+def select_ranked(ranked):
+    """
+    Selects the publication without asking the user. Returns the only publication or the best matching publication if
+    its score reaches the configured threshold (see ranking.select_ranked), None otherwise. The publications are
+    (score, publication) pairs as returned by ranking.rank_publications.
+    """
+    if len(ranked) == 1:
+        return ranked[0][1]
+    return ranking.select_ranked(ranked, config.get_auto_select_threshold())
+
+
+def resolve_title(title, limiter):
+    try:
+        publications_url = find.create_publications_url(title)
+        with limiter.limit(publications_url):
+            publications = find.load_publications(publications_url)
+
+        if len(publications) == 0:
+            return BatchResult(title, NOT_FOUND)
+
+        ranked = ranking.rank_publications(title, publications)
+        publication = select_ranked(ranked)
+        if publication is None:
+            return BatchResult(title, AMBIGUOUS, [publication for _, publication in ranked])
+
+        with limiter.limit(publication.url):
+            bib = find.load_bibitem(publication, False, False)
+        return BatchResult(title, FOUND, [publication], bib)
+    except Exception as e:
+        logger.warning("Resolving title '{}' failed: {}".format(title, e))
+        return BatchResult(title, FAILED, message=str(e))
+
+
+def resolve_titles(titles, workers, per_host):
+    """
+    Resolves all titles concurrently. The results are returned in the order of the titles.
+    """
+    limiter = HostLimiter(per_host)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = []
+        for result in executor.map(lambda title: resolve_title(title, limiter), titles):
+            logger.info(str(result))
+            results.append(result)
+        return results
+
+
+def find_batch(titles, output_file, report_file, curlify, pretty, workers=8, per_host=4):
+    results = resolve_titles(titles, workers, per_host)
+
+    bibs = []
+    keys = set()
+    for result in results:
+        if result.status != FOUND:
+            continue
+        key = result.publications[0].key
+        if key in keys:
+            logger.info("Skipping duplicate publication {} of title '{}'.".format(key, result.title))
+            continue
+        keys.add(key)
+        bibs.append(result.bib)
+
+    content = "\n".join(bibs)
+    if bibs and (curlify or pretty):
+        bib_database = beautify.create_parser().parse(content)
+        content = beautify.style(bib_database, curlify, pretty)
+    output_file.write(content)
+
+    unresolved = [result for result in results if result.status != FOUND]
+    report_file = report_file or sys.stderr
+    for result in unresolved:
+        report_file.write(str(result) + "\n")
+
+    logger.info("Resolved {} of {} titles.".format(len(results) - len(unresolved), len(results)))
+    return results
@@ -1,6 +1,91 @@
 import re
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional
 
-from bibtexparser.bwriter import BibTexWriter
+if TYPE_CHECKING:
+    from bibtexparser.bwriter import BibTexWriter
+
+_BLOCK_DELIMITER_PATTERN = re.compile(r'[@{}()]')
+
+
+def strip_hide_prefix(attribute: str, hide_prefix: str) -> (str, int):
+    """
+    Removes all leading (literal) hide prefixes from the attribute. Returns the plain attribute and the number of
+    removed prefixes, e.g. ("author", 2) for "__author" and hide prefix "_".
+    """
+    if not hide_prefix:
+        return attribute, 0
+    start = 0
+    while attribute.startswith(hide_prefix, start):
+        start += len(hide_prefix)
+    return attribute[start:], start // len(hide_prefix)
+
+
+def get_field(bib_entry: dict, name: str, hide_prefix: str) -> Optional[str]:
+    """
+    Returns the value of the field. If the field is hidden, the value of the hidden field with the fewest prefixes is
+    returned, e.g. the value of "_doi" if there is no "doi".
+    """
+    if name in bib_entry:
+        return bib_entry[name]
+    value = None
+    min_depth = None
+    for attribute in bib_entry:
+        plain_attribute, depth = strip_hide_prefix(attribute, hide_prefix)
+        if plain_attribute == name and (min_depth is None or depth < min_depth):
+            value = bib_entry[attribute]
+            min_depth = depth
+    return value
+
+
+class AttributesOrder:
+    """
+    Orders attributes based on the plain attributes considering the hide prefix (see create_attributes_order). The
+    rank of each plain attribute is computed once and the order is cached per distinct set of attributes, as most
+    entries of a file share the same attributes.
+    """
+    MAX_CACHE_SIZE = 4096
+
+    def __init__(self, plain_attributes_order: Iterable[str], hide_prefix: str):
+        self.hide_prefix = hide_prefix
+        self._plain_attributes = []
+        self._ranks = {}
+        for plain_attribute in plain_attributes_order:
+            if plain_attribute not in self._ranks:
+                self._ranks[plain_attribute] = len(self._plain_attributes)
+                self._plain_attributes.append(plain_attribute)
+        # Reverse sorting a group (e.g. "author", "_author", "__author") orders it by ascending number of prefixes if
+        # the plain attribute is greater than the attribute with one prefix, otherwise by descending number.
+        self._ascending = [plain_attribute > hide_prefix + plain_attribute
+                           for plain_attribute in self._plain_attributes]
+        self._cache = {}
+
+    def create(self, current_attributes: Iterable[str]) -> [str]:
+        groups = {}
+        for current_attribute in current_attributes:
+            plain_attribute, depth = strip_hide_prefix(current_attribute, self.hide_prefix)
+            rank = self._ranks.get(plain_attribute)
+            if rank is not None:
+                groups.setdefault(rank, []).append((depth, current_attribute))
+
+        final_order = []
+        for rank in sorted(groups):
+            group = groups[rank]
+            group.sort(reverse=not self._ascending[rank])
+            final_order.extend(current_attribute for _, current_attribute in group)
+        return final_order
+
+    def __call__(self, current_attributes: Iterable[str]) -> [str]:
+        """
+        Returns the (cached) order of the distinct current attributes, e.g. the keys of an entry.
+        """
+        key = frozenset(current_attributes)
+        order = self._cache.get(key)
+        if order is None:
+            if len(self._cache) >= self.MAX_CACHE_SIZE:
+                self._cache.clear()
+            order = self.create(key)
+            self._cache[key] = order
+        return list(order)
 
 
 def create_attributes_order(current_attributes: [str], plain_attributes_order: [str], hide_prefix: str) -> [str]:
@@ -17,25 +102,7 @@ def create_attributes_order(current_attributes: [str], plain_attributes_order: [
 
     Hidden attributes will be considered for the order.
     """
-    existing_attributes_to_order = {}
-    for current_attribute in current_attributes:
-        plain_attribute = re.sub(f"^{hide_prefix}*", "", current_attribute)
-        if plain_attribute in plain_attributes_order:
-            # Plain attribute exists in the attributes to order.
-            # Get Index and Insert hidden attribute into list containing the order
-            if plain_attribute not in existing_attributes_to_order:
-                existing_attributes_to_order[plain_attribute] = []
-            existing_attributes_to_order[plain_attribute].append(current_attribute)
-
-    final_order = []
-    for plain_attribute_order in plain_attributes_order:
-        if plain_attribute_order in existing_attributes_to_order:
-            existing_attributes = existing_attributes_to_order[plain_attribute_order]
-            # Sort and reverse, otherwise hide prefix might be before the plain attribute name
-            existing_attributes = reversed(sorted(existing_attributes))
-            final_order.extend(existing_attributes)
-
-    return final_order
+    return AttributesOrder(plain_attributes_order, hide_prefix).create(current_attributes)
 
 
 def hide_attributes(bib_entry: dict, attributes_to_hide: [str], hide_prefix: str) -> None:
@@ -73,11 +140,99 @@ def hide_attributes(bib_entry: dict, attributes_to_hide: [str], hide_prefix: str
         del bib_entry[attribute_name]
 
 
-def apply_bibtex_writer_style(writer: BibTexWriter) -> None:
+def add_attribute(bib_entry: dict, attribute: str, value: str, hide_prefix: str) -> None:
+    """
+    Adds the attribute to the entry unless the entry already has the value (visible or hidden). If the attribute
+    exists with another value, the value is added as hidden attribute. As in hide_attributes, existing attributes are
+    not overwritten: the hide prefix is prepended until the attribute does not exist.
+    """
+    plain_attribute, _ = strip_hide_prefix(attribute, hide_prefix)
+    for existing_attribute, existing_value in bib_entry.items():
+        if existing_value == value and strip_hide_prefix(existing_attribute, hide_prefix)[0] == plain_attribute:
+            return
+    if attribute in bib_entry and not hide_prefix:
+        return
+    while attribute in bib_entry:
+        attribute = hide_prefix + attribute
+    bib_entry[attribute] = value
+
+
+def apply_bibtex_writer_style(writer: "BibTexWriter") -> None:
     """
     Applies the common BibTeX style properties to the writer.
     """
     writer.indent = " " * 4
+    # The entries are written in their order, they are sorted before if configured (see style -> sortEntries)
     writer.order_entries_by = None
     writer.align_values = True
     writer.align_multiline_values = False
+
+
+def split_entries(lines: Iterable[str]) -> Iterator[str]:
+    """
+    Splits BibTeX content into chunks, each containing at most one @-block (entry, string, comment, preamble) together
+    with the text preceding it. The content is consumed line by line, so only the current block is held in memory.
+
+    Example:
+        lines = ["% comment\n", "@article{a,\n", "  title = {{T}}\n", "}\n", "@misc{b}\n"]
+
+    Result will be:
+        ["% comment\n@article{a,\n  title = {{T}}\n}", "\n@misc{b}", "\n"]
+
+    Concatenating all chunks returns the original content.
+    """
+    buffer = []
+    in_block = False
+    opener = None
+    depth = 0
+
+    for line in lines:
+        # Fast paths: lines which can not open or close a block
+        if not in_block and "@" not in line:
+            buffer.append(line)
+            continue
+        if in_block and opener == "{" and depth > line.count("}"):
+            depth += line.count("{") - line.count("}")
+            buffer.append(line)
+            continue
+        if in_block and opener == "(" and ")" not in line:
+            depth += line.count("{") - line.count("}")
+            buffer.append(line)
+            continue
+
+        start = 0
+        for match in _BLOCK_DELIMITER_PATTERN.finditer(line):
+            char = match.group()
+            if not in_block:
+                in_block = char == "@"
+                continue
+            if opener is None:
+                # Wait for the delimiter which opens the block: @article{ or @article(
+                if char in "{(":
+                    opener = char
+                    # Braces are counted within the block. A block opened by "(" is closed by ")" on brace level 0.
+                    depth = 1 if char == "{" else 0
+                continue
+
+            closed = False
+            if char == "{":
+                depth += 1
+            elif char == "}":
+                depth -= 1
+                closed = opener == "{" and depth == 0
+            elif char == ")":
+                closed = opener == "(" and depth == 0
+
+            if closed:
+                buffer.append(line[start:match.end()])
+                yield "".join(buffer)
+                buffer = []
+                start = match.end()
+                in_block = False
+                opener = None
+                depth = 0
+        buffer.append(line[start:])
+
+    remainder = "".join(buffer)
+    if remainder:
+        yield remainder
@@ -1,7 +1,18 @@
 import re
-from typing import Union
+from functools import lru_cache
+from typing import Dict, Union
 
 
+# Patterns of extract_booktitle_shortname, the first matching pattern is applied
+_SHORTNAME_PATTERNS = (
+    re.compile(r'{?\w+}?(?=(\n|\r|\s)+[0-9]{4})'),  # Shortname followed by year
+    re.compile(r'{[^{]*}$'),  # Shortname at the end
+    re.compile(r'(^{?.*}?)(?:(\n|\r|\s)+\'[0-9]{2,4})'),  # Shortname at the beginning
+    re.compile(r'(?:[0-9]{4})(?:\n|\r|\s)+({?\w+}?)'),  # Shortname after the year
+)
+
+
+@lru_cache(maxsize=4096)
 def extract_booktitle_shortname(booktitle: str) -> Union[str, None]:
     """
     Tries to extract the shortname of the booktitle of a publication. Curly brackets around the title are ignored and
@@ -20,23 +31,11 @@ def extract_booktitle_shortname(booktitle: str) -> Union[str, None]:
     - Shortname at the beginning: {SHORTNAME} 'YEAR...
     - Example: {PACT} '20: International Conference on Parallel Architectures and Compilation Techniques
 
-    Returns the extracted shortname if found, None otherwise.
+    Returns the extracted shortname if found, None otherwise. Results are memoized, as booktitles repeat within a
+    bibliography.
     """
-    patterns = []
-
-    shortname_year_pattern = re.compile(r'{?\w+}?(?=(\n|\r|\s)+[0-9]{4})')
-    year_shortname_pattern = re.compile(r'(?:[0-9]{4})(?:\n|\r|\s)+({?\w+}?)')
-    shortname_end_pattern = re.compile(r'{[^{]*}$')
-    shortname_start_pattern = re.compile(r'(^{?.*}?)(?:(\n|\r|\s)+\'[0-9]{2,4})')
-    
-    # The first matching pattern is applied
-    patterns.append(shortname_year_pattern)
-    patterns.append(shortname_end_pattern)
-    patterns.append(shortname_start_pattern)
-    patterns.append(year_shortname_pattern)
-
-    for shortname_pattern in patterns:
-        findings = re.search(shortname_pattern, booktitle)
+    for shortname_pattern in _SHORTNAME_PATTERNS:
+        findings = shortname_pattern.search(booktitle)
         if findings:
             # TODO: What if multiple groups were found?
             shortname_groups = findings.groups()
@@ -56,6 +55,40 @@ def extract_booktitle_shortname(booktitle: str) -> Union[str, None]:
     return None
 
 
+class ShortnameExtractor:
+    """
+    Extracts the shortname of a booktitle (see extract_booktitle_shortname). If the heuristics do not find a shortname,
+    the venues are looked up: the shortname of the first venue contained in the booktitle (ignoring case) is returned.
+
+    Example:
+        venues = {"Very Large Data Bases": "VLDB"}
+        "Proceedings of the 25th International Conference on Very Large Data Bases" returns "VLDB"
+    """
+    MAX_CACHE_SIZE = 4096
+
+    def __init__(self, venues: Dict[str, str] = None):
+        self._venues = tuple((venue.casefold(), shortname) for venue, shortname in (venues or {}).items())
+        self._cache = {}
+
+    def _lookup_venue(self, booktitle: str) -> Union[str, None]:
+        folded_booktitle = booktitle.casefold()
+        for venue, shortname in self._venues:
+            if venue in folded_booktitle:
+                return shortname
+        return None
+
+    def __call__(self, booktitle: str) -> Union[str, None]:
+        shortname = extract_booktitle_shortname(booktitle)
+        if shortname is not None or not self._venues:
+            return shortname
+
+        if booktitle not in self._cache:
+            if len(self._cache) >= self.MAX_CACHE_SIZE:
+                self._cache.clear()
+            self._cache[booktitle] = self._lookup_venue(booktitle)
+        return self._cache[booktitle]
+
+
 def curlify(content: str) -> str:
     """
     Adds a pair of curly braces to the content. If the content already contains curly brackets, nothing will happen.
@@ -64,9 +97,8 @@ def curlify(content: str) -> str:
     - curlify("Hello") returns "{Hello}".
     - curlify("{Hello}") returns "{Hello}".
     """
-    curlify_pattern = re.compile(r'^{.*}$', re.DOTALL)
     # Check if curly brackets are already set
-    if not re.fullmatch(curlify_pattern, content):
+    if not (content.startswith("{") and content.endswith("}")):
         # Add extra curly brackets to title. Preserves lowercase/uppercase in BIBTeX
         content = "{{{}}}".format(content)
     return content
@@ -1,27 +1,26 @@
 from bibhelper import config
-from bibhelper.handler import bibtex_handler
 from bibhelper.handler import latex_handler
 
 
-def rewrite_booktitle(bib_entry: dict) -> None:
+def rewrite_booktitle(bib_entry: dict, style: config.Style = None) -> None:
     key = "booktitle"
     if key not in bib_entry:
         return
 
     # Get existing booktitle and extract shortname (e.g. ICDE, SIGMOD, ...)
+    style = style or config.get_style()
     booktitle = bib_entry[key]
-    booktitle_shortname = latex_handler.extract_booktitle_shortname(booktitle)
+    booktitle_shortname = style.booktitle_shortname(booktitle)
 
     if booktitle_shortname is None:
         return
 
     # Create new booktitle based on configuration. E.g. Configuration is: "Proc.\ {}" and new title will be:
     # E.g. "Proc.\ ICDE"
-    new_booktitle_placeholder = config.get_config_property("style", "rewriteBooktitle", "nameWithPlaceholder")
-    new_booktitle = new_booktitle_placeholder.format(booktitle_shortname)
+    new_booktitle = style.booktitle_template.format(booktitle_shortname)
 
     # Now we have to hide the old booktitle and create a new entry
-    hide_prefix = config.get_hide_prefix()
+    hide_prefix = style.hide_prefix
 
     # Search for a new name of the original entry:
     # E.g. booktitle = "In Proceedings of ICDE...."
@@ -41,12 +40,6 @@ def rewrite_booktitle(bib_entry: dict) -> None:
     bib_entry[key] = new_booktitle
 
 
-def hide_attributes(bib_entry: dict):
-    hide_prefix = config.get_hide_prefix()
-    attributes_to_hide = config.get_attribute_names(hidden_only=True)
-    bibtex_handler.hide_attributes(bib_entry, attributes_to_hide, hide_prefix)
-
-
 def curlify_title(bib_entry: dict) -> None:
     key = "title"
     if key in bib_entry:
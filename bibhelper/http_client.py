@@ -0,0 +1,126 @@
+import logging
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING, Union
+
+from bibhelper import config
+
+if TYPE_CHECKING:
+    import requests
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def parse_retry_after(value: Union[str, None]) -> Union[float, None]:
+    """
+    Parses the value of a Retry-After header, which is either a number of seconds or a HTTP date. Returns the number of
+    seconds to wait or None if the value can not be parsed.
+    """
+    if value is None:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_date.timestamp() - time.time())
+
+
+class Client:
+    """
+    HTTP client sharing one pooled session (keep-alive) between all requests. Requests time out after connect_timeout
+    and read_timeout seconds. Responses with status 429 or 5xx, connection errors and timeouts are retried up to
+    retries times with exponential backoff, a Retry-After header of the response is honored.
+    """
+
+    def __init__(self, connect_timeout=5.0, read_timeout=30.0, retries=3, backoff_factor=0.5, max_backoff=60.0,
+                 pool_size=10):
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.sleep = time.sleep
+
+        # requests is imported on first use, it takes longer than all other imports of the command line tool
+        import requests
+        from requests.adapters import HTTPAdapter
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+    def _backoff(self, attempt: int, response: Union["requests.Response", None]) -> float:
+        delay = self.backoff_factor * (2 ** attempt)
+        if response is not None:
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if retry_after is not None:
+                delay = retry_after
+        return min(delay, self.max_backoff)
+
+    def get(self, url: str) -> "requests.Response":
+        import requests
+        attempt = 0
+        while True:
+            response = None
+            try:
+                response = self._session.get(url, timeout=self.timeout)
+                if response.status_code not in RETRY_STATUS_CODES or attempt >= self.retries:
+                    return response
+                reason = "status code {}".format(response.status_code)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self.retries:
+                    raise
+                reason = str(e)
+
+            delay = self._backoff(attempt, response)
+            attempt += 1
+            logger.info("Request to {} failed ({}). Retry {}/{} in {:.1f}s.".format(url, reason, attempt,
+                                                                                    self.retries, delay))
+            self.sleep(delay)
+
+    def close(self) -> None:
+        self._session.close()
+
+
+def create_client() -> Client:
+    return Client(connect_timeout=config.get_http_setting("connectTimeout"),
+                  read_timeout=config.get_http_setting("readTimeout"),
+                  retries=config.get_http_setting("retries"),
+                  backoff_factor=config.get_http_setting("backoffFactor"),
+                  max_backoff=config.get_http_setting("maxBackoff"),
+                  pool_size=config.get_http_setting("poolSize"))
+
+
+def get_client() -> Client:
+    """
+    Returns the shared client. The client is created from the configuration on first use.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = create_client()
+        return _client
+
+
+def set_client(client: Union[Client, None]) -> None:
+    global _client
+    _client = client
+
+
+def close_client() -> None:
+    """
+    Closes the shared client, if it was created.
+    """
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
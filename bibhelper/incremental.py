@@ -0,0 +1,183 @@
+import hashlib
+import json
+import logging
+import os
+import re
+
+from bibhelper import __version__
+from bibhelper import beautify
+from bibhelper import bibtex_writer
+from bibhelper import config
+from bibhelper import pipeline
+from bibhelper.handler import bibtex_handler
+
+logger = logging.getLogger(__name__)
+
+STATE_VERSION = 2
+
+_BLOCK_PATTERN = re.compile(r"@\s*(\w+)\s*[{(]\s*([^,\s})=]*)")
+_WORD_PATTERN = re.compile(r"\w+")
+_NON_ENTRY_TYPES = {"comment", "preamble", "string"}
+
+
+def get_default_state_path(input_path: str) -> str:
+    """
+    Returns the path of the sidecar state file, e.g. .references.bib.bibhelper-state.json for references.bib.
+    """
+    directory, name = os.path.split(os.path.abspath(input_path))
+    return os.path.join(directory, ".{}.bibhelper-state.json".format(name))
+
+
+def _fingerprint(curlify, pretty) -> str:
+    """
+    Everything besides the entry itself which changes the formatted output of an entry. If it changes, all entries are
+    formatted again.
+    """
+    content = json.dumps([__version__, curlify, pretty, config.get_config()], sort_keys=True)
+    return hashlib.sha256(content.encode("UTF-8")).hexdigest()
+
+
+def load_state(state_path: str, fingerprint: str) -> dict:
+    if not os.path.isfile(state_path):
+        return {}
+    try:
+        with open(state_path, "r", encoding="UTF-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning("Could not read state file {}, formatting all entries: {}".format(state_path, e))
+        return {}
+    if state.get("version") != STATE_VERSION or state.get("fingerprint") != fingerprint:
+        logger.info("Configuration changed, formatting all entries.")
+        return {}
+    return state
+
+
+def save_state(state_path: str, state: dict) -> None:
+    temporary_path = state_path + ".tmp"
+    with open(temporary_path, "w", encoding="UTF-8") as f:
+        json.dump(state, f)
+    os.replace(temporary_path, state_path)
+
+
+def _format_entry(writer, bib_entry, width) -> str:
+    if config.is_sort_attributes():
+        # Ordering by the attributes of the entry only yields the same order as ordering by all attributes of the file
+        writer.display_order = config.get_style().attributes_order(bib_entry.keys())
+    return writer.entry_to_bibtex(bib_entry, width)
+
+
+def _run(chunks, curlify, pretty, cached_entries, width=None):
+    """
+    Formats all entries whose hash is not in cached_entries. If width is None, the width of the previous run is assumed
+    and the run fails (returns None) if the width of the file differs, because then all cached outputs are outdated.
+    """
+    parser = beautify.create_parser()
+    parser.expect_multiple_parse = True
+    transform = pipeline.create_pipeline(curlify, pretty)
+    sort_key = config.get_style().entry_sort_key
+    string_hashes = {}  # name of string -> hash of its definition
+
+    entries = []  # (key, hash, width, output or entry, values sorted by)
+    changed = 0
+    for chunk in chunks:
+        block_start = chunk.find("@")
+        match = _BLOCK_PATTERN.match(chunk, block_start) if block_start >= 0 else None
+        if match is None or match.group(1).lower() in _NON_ENTRY_TYPES:
+            # Comments, preambles and strings are always parsed
+            if match is not None and match.group(1).lower() == "string":
+                string_hashes[match.group(2).lower()] = hashlib.sha256(chunk.encode("UTF-8")).digest()
+            parser.parse(chunk)
+            continue
+
+        key = match.group(2)
+        block = chunk[block_start:]
+        entry_hash = hashlib.sha256(block.encode("UTF-8"))
+        if string_hashes:
+            # Strings are expanded into the entry. Definitions of strings whose name occurs in the entry are part of
+            # the hash (a name might also be part of a value, then the entry is just formatted more often).
+            words = set(_WORD_PATTERN.findall(block.lower()))
+            for name in sorted(words.intersection(string_hashes)):
+                entry_hash.update(string_hashes[name])
+        entry_hash = entry_hash.hexdigest()
+        cached_entry = cached_entries.get(key)
+        is_cached = cached_entry is not None and cached_entry["hash"] == entry_hash
+
+        if is_cached and chunk[:block_start].strip() == "":
+            entries.append((key, entry_hash, cached_entry["width"], cached_entry["output"], cached_entry.get("sort")))
+            continue
+
+        # Text in front of the entry is stored as comment
+        parser.parse(chunk)
+        parsed_entries = parser.bib_database.entries
+        parser.bib_database.entries = []
+        for bib_entry in parsed_entries:
+            if is_cached:
+                entries.append((key, entry_hash, cached_entry["width"], cached_entry["output"],
+                                cached_entry.get("sort")))
+                continue
+            bib_entry = transform(bib_entry)
+            entries.append((key, entry_hash, bibtex_writer.get_field_width([bib_entry]), bib_entry,
+                            sort_key.values(bib_entry) if sort_key is not None else None))
+            changed += 1
+
+    file_width = max([entry[2] for entry in entries], default=0)
+    if width is not None and file_width != width:
+        return None
+
+    writer = beautify.create_writer([])
+    writer.contents = ["comments", "preambles", "strings"]
+    header = writer.write(parser.bib_database)
+
+    if sort_key is not None:
+        # The values sorted by are stored with the output, cached entries are sorted without parsing them
+        entries.sort(key=lambda entry: sort_key.key(entry[4]))
+
+    outputs = []
+    state_entries = {}
+    for key, entry_hash, entry_width, output, sort_values in entries:
+        if not isinstance(output, str):
+            output = _format_entry(writer, output, file_width)
+        outputs.append(output)
+        state_entries[key] = {"hash": entry_hash, "width": entry_width, "output": output}
+        if sort_values is not None:
+            state_entries[key]["sort"] = sort_values
+
+    logger.info("Formatted {} of {} entries.".format(changed, len(entries)))
+    return header + writer.entry_separator.join(outputs), file_width, state_entries
+
+
+def format_incremental(content, state, curlify, pretty):
+    """
+    Formats the content like beautify.style, but only parses and formats the entries which changed since the run the
+    state belongs to (the formatted entries of the state are reused). Returns the result and the new state.
+    """
+    fingerprint = _fingerprint(curlify, pretty)
+    if state and (state.get("version") != STATE_VERSION or state.get("fingerprint") != fingerprint):
+        logger.info("Configuration changed, formatting all entries.")
+        state = {}
+    chunks = list(bibtex_handler.split_entries(content.splitlines(keepends=True)))
+
+    result = None
+    if state:
+        result = _run(chunks, curlify, pretty, state["entries"], state["width"])
+        if result is None:
+            logger.info("Alignment of the values changed, formatting all entries.")
+    if result is None:
+        result = _run(chunks, curlify, pretty, {})
+
+    bib, width, state_entries = result
+    return bib, {"version": STATE_VERSION,
+                 "fingerprint": fingerprint,
+                 "width": width,
+                 "entries": state_entries}
+
+
+def beautify_incremental(content, state_path, curlify, pretty):
+    """
+    Beautifies the content, but only parses and formats entries which changed since the last run. The formatted
+    entries are stored in the state file. The result is identical to the result of beautify.style.
+    """
+    state = load_state(state_path, _fingerprint(curlify, pretty))
+    bib, state = format_incremental(content, state, curlify, pretty)
+    save_state(state_path, state)
+    return bib
@@ -0,0 +1,407 @@
+import gzip
+import heapq
+import json
+import logging
+import mmap
+import os
+import shutil
+import tempfile
+import xml.etree.ElementTree as ET
+from array import array
+from html.entities import name2codepoint
+from typing import Iterator, Tuple, Union
+
+from bibhelper import beautify
+from bibhelper import ranking
+from bibhelper.find import Publication
+from bibtexparser.bibdatabase import BibDatabase
+from bibtexparser.bwriter import BibTexWriter
+
+logger = logging.getLogger(__name__)
+
+RECORDS_FILE = "records.jsonl"
+RECORD_OFFSETS_FILE = "records.offsets"
+TOKENS_FILE = "tokens.txt"
+TOKEN_OFFSETS_FILE = "tokens.offsets"
+POSTINGS_FILE = "postings.bin"
+POSTING_OFFSETS_FILE = "postings.offsets"
+TITLES_FILE = "titles.txt"
+TITLE_OFFSETS_FILE = "titles.offsets"
+INDEX_FILES = (RECORDS_FILE, RECORD_OFFSETS_FILE, TOKENS_FILE, TOKEN_OFFSETS_FILE, POSTINGS_FILE, POSTING_OFFSETS_FILE,
+               TITLES_FILE, TITLE_OFFSETS_FILE)
+
+DEFAULT_SEARCH_LIMIT = 30
+
+# Elements of the DBLP XML dump which are publications (www elements are person pages)
+DBLP_PUBLICATION_ELEMENTS = {"article", "inproceedings", "proceedings", "book", "incollection", "phdthesis",
+                             "mastersthesis", "data"}
+DBLP_TYPES = {
+    "article": "Journal Articles",
+    "inproceedings": "Conference and Workshop Papers",
+    "proceedings": "Editorship",
+    "book": "Books and Theses",
+    "incollection": "Parts in Books or Collections",
+    "phdthesis": "Books and Theses",
+    "mastersthesis": "Books and Theses",
+    "data": "Data and Artifacts",
+}
+BIBTEX_TYPES = {
+    "Journal Articles": "article",
+    "Conference and Workshop Papers": "inproceedings",
+    "Editorship": "proceedings",
+    "Books and Theses": "book",
+    "Parts in Books or Collections": "incollection",
+}
+
+def tokenize(title: str) -> [str]:
+    """
+    Splits a title into the tokens of its normalized title (see ranking.normalize_title), so LaTeX commands, curly
+    braces, accents, case and punctuation are ignored, e.g. "Sch\u00f6lkopf" and "Sch\\"{o}lkopf" match "Scholkopf".
+    """
+    return ranking.normalize_title(title).split()
+
+
+def _open(path: str, mode: str = "rb"):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode)
+    return open(path, mode)
+
+
+def create_bibtex(info: dict) -> str:
+    """
+    Creates a DBLP-like BibTeX entry from the info of a publication (same structure as a hit of the DBLP API).
+    """
+    authors = info.get("authors", {}).get("author", [])
+    if not isinstance(authors, list):
+        authors = [authors]
+
+    entry = {"ENTRYTYPE": BIBTEX_TYPES.get(info.get("type"), "misc"),
+             "ID": "DBLP:" + info["key"]}
+    if authors:
+        entry["author"] = " and\n".join(author["text"] for author in authors)
+    entry["title"] = info["title"].rstrip(".")
+    venue_attribute = "journal" if entry["ENTRYTYPE"] == "article" else "booktitle"
+    for attribute, name in [(venue_attribute, "venue"), ("volume", "volume"), ("number", "number"),
+                            ("pages", "pages"), ("publisher", "publisher"), ("series", "series"),
+                            ("isbn", "isbn"), ("year", "year"), ("url", "ee"), ("doi", "doi")]:
+        if info.get(name):
+            entry[attribute] = info[name]
+    entry["biburl"] = info["url"] + ".bib"
+    entry["bibsource"] = "dblp computer science bibliography, https://dblp.org"
+
+    writer = BibTexWriter()
+    writer.indent = "  "
+    writer.align_values = True
+    writer.display_order = ["author", "title", "journal", "booktitle", "volume", "number", "pages", "publisher",
+                            "series", "isbn", "year", "url", "doi", "biburl", "bibsource"]
+    bib_database = BibDatabase()
+    bib_database.entries = [entry]
+    return writer.write(bib_database)
+
+
+def read_dblp_xml(path: str) -> Iterator[Tuple[dict, None]]:
+    """
+    Reads the publications of the DBLP XML dump (dblp.xml or dblp.xml.gz) element by element. Processed elements are
+    cleared immediately, so the dump is never held in memory.
+    """
+    parser = ET.XMLParser()
+    # The entities of dblp.dtd (e.g. &ouml;) are the HTML entities
+    parser.entity.update({name: chr(codepoint) for name, codepoint in name2codepoint.items()})
+
+    with _open(path) as f:
+        context = ET.iterparse(f, events=("start", "end"), parser=parser)
+        _, root = next(context)
+        for event, element in context:
+            if event != "end" or element.tag not in DBLP_PUBLICATION_ELEMENTS:
+                continue
+
+            info = {"key": element.get("key"),
+                    "type": DBLP_TYPES[element.tag],
+                    "url": "https://dblp.org/rec/" + element.get("key")}
+            authors = []
+            for child in element:
+                text = "".join(child.itertext()).strip()
+                if child.tag == "author":
+                    authors.append({"@pid": child.get("pid", ""), "text": text})
+                elif child.tag in ("booktitle", "journal"):
+                    info["venue"] = text
+                elif child.tag == "ee":
+                    if "ee" not in info:
+                        info["ee"] = text
+                    if "doi.org/" in text and "doi" not in info:
+                        info["doi"] = text.split("doi.org/", 1)[1]
+                elif child.tag in ("title", "year", "volume", "number", "pages", "publisher", "series", "isbn"):
+                    info[child.tag] = text
+            info["authors"] = {"author": authors}
+
+            if "title" in info:
+                yield info, None
+            root.clear()
+
+
+def read_bibtex(path: str) -> Iterator[Tuple[dict, str]]:
+    """
+    Reads the entries of a BibTeX file (e.g. a DBLP .bib export) entry by entry.
+    """
+    writer = BibTexWriter()
+    writer.indent = "  "
+    writer.align_values = True
+    writer.display_order = ["author", "title"]
+    bib_database = BibDatabase()
+
+    with _open(path, "rt") as f:
+        for bib_entry in beautify.iter_entries(f, beautify.create_parser()):
+            if "title" not in bib_entry:
+                continue
+            key = bib_entry["ID"]
+            if key.startswith("DBLP:"):
+                key = key[len("DBLP:"):]
+            authors = [{"@pid": "", "text": " ".join(name.split())}
+                       for name in bib_entry.get("author", "").split(" and ") if name.strip()]
+            info = {"key": key,
+                    "url": bib_entry.get("biburl", "https://dblp.org/rec/" + key).removesuffix(".bib"),
+                    "title": bib_entry["title"],
+                    "venue": bib_entry.get("booktitle", bib_entry.get("journal")),
+                    "year": bib_entry.get("year"),
+                    "volume": bib_entry.get("volume"),
+                    "number": bib_entry.get("number"),
+                    "pages": bib_entry.get("pages"),
+                    "doi": bib_entry.get("doi"),
+                    "ee": bib_entry.get("url"),
+                    "authors": {"author": authors}}
+
+            bib_database.entries = [bib_entry]
+            yield info, writer.write(bib_database)
+
+
+def read_json_lines(path: str) -> Iterator[Tuple[dict, None]]:
+    """
+    Reads publications stored as JSON lines, each line containing a hit of the DBLP API (or only its info).
+    """
+    with _open(path, "rt") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            hit = json.loads(line)
+            yield hit.get("info", hit), None
+
+
+def read_dump(path: str) -> Iterator[Tuple[dict, Union[str, None]]]:
+    name = path[:-len(".gz")] if path.endswith(".gz") else path
+    if name.endswith(".xml"):
+        return read_dblp_xml(path)
+    if name.endswith(".bib"):
+        return read_bibtex(path)
+    if name.endswith(".jsonl") or name.endswith(".json"):
+        return read_json_lines(path)
+    raise ValueError("Unknown format of dump '{}'. Supported: .xml, .bib, .jsonl (optionally gzipped).".format(path))
+
+
+class IndexWriter:
+    """
+    Writes an index: the records (publication info and BibTeX entry) and their normalized titles are appended to the
+    records and titles files while reading, only the postings (record numbers per title token) are kept in memory as
+    compact arrays.
+
+    The files are written into a temporary directory within the directory and replace the files of an existing index
+    by close. abort removes them, so an interrupted build keeps the existing index.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._temporary_directory = tempfile.mkdtemp(dir=directory, prefix=".build.")
+        self._records = open(self._path(RECORDS_FILE), "wb")
+        self._record_offsets = array("Q", [0])
+        self._titles = open(self._path(TITLES_FILE), "wb")
+        self._title_offsets = array("Q", [0])
+        self._postings = {}
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self._temporary_directory, name)
+
+    @property
+    def count(self) -> int:
+        return len(self._record_offsets) - 1
+
+    def add(self, info: dict, bib: Union[str, None]) -> None:
+        record_number = self.count
+        normalized_title = ranking.normalize_title(info["title"])
+        for token in set(normalized_title.split()):
+            if token not in self._postings:
+                self._postings[token] = array("I")
+            self._postings[token].append(record_number)
+
+        record = {"info": info, "bib": bib}
+        self._records.write(json.dumps(record, ensure_ascii=False).encode("UTF-8") + b"\n")
+        self._record_offsets.append(self._records.tell())
+        self._titles.write(normalized_title.encode("UTF-8"))
+        self._title_offsets.append(self._titles.tell())
+
+    def close(self) -> None:
+        self._records.close()
+        self._titles.close()
+        with open(self._path(RECORD_OFFSETS_FILE), "wb") as f:
+            self._record_offsets.tofile(f)
+        with open(self._path(TITLE_OFFSETS_FILE), "wb") as f:
+            self._title_offsets.tofile(f)
+
+        # Tokens are sorted to allow a binary search within the memory-mapped token file
+        token_offsets = array("Q", [0])
+        posting_offsets = array("Q", [0])
+        with open(self._path(TOKENS_FILE), "wb") as tokens_file, open(self._path(POSTINGS_FILE), "wb") as postings_file:
+            for token in sorted(self._postings):
+                tokens_file.write(token.encode("UTF-8"))
+                token_offsets.append(tokens_file.tell())
+
+                postings = self._postings[token]
+                postings.tofile(postings_file)
+                posting_offsets.append(posting_offsets[-1] + len(postings))
+        with open(self._path(TOKEN_OFFSETS_FILE), "wb") as f:
+            token_offsets.tofile(f)
+        with open(self._path(POSTING_OFFSETS_FILE), "wb") as f:
+            posting_offsets.tofile(f)
+        self._postings = {}
+
+        for name in INDEX_FILES:
+            os.replace(self._path(name), os.path.join(self.directory, name))
+        os.rmdir(self._temporary_directory)
+
+    def abort(self) -> None:
+        self._records.close()
+        self._titles.close()
+        self._postings = {}
+        shutil.rmtree(self._temporary_directory)
+
+
+def build_index(dump_path: str, directory: str) -> int:
+    """
+    Builds the index of the dump in the directory. Returns the number of indexed publications.
+    """
+    writer = IndexWriter(directory)
+    try:
+        for info, bib in read_dump(dump_path):
+            writer.add(info, bib)
+            if writer.count % 100000 == 0:
+                logger.info("Indexed {} publications.".format(writer.count))
+    except BaseException:
+        writer.abort()
+        raise
+    writer.close()
+    logger.info("Indexed {} publications in total.".format(writer.count))
+    return writer.count
+
+
+class PublicationIndex:
+    """
+    Read-only access to an index created by build_index. All files are memory-mapped, nothing is loaded upfront.
+    """
+
+    def __init__(self, directory: str):
+        if not all(os.path.isfile(os.path.join(directory, name)) for name in INDEX_FILES):
+            raise FileNotFoundError("No index found in '{}'. Create one with BuildIndex.".format(directory))
+        self.directory = directory
+        self._files = []
+        self._maps = []
+        self._records = self._map(RECORDS_FILE, "B")
+        self._record_offsets = self._map(RECORD_OFFSETS_FILE, "Q")
+        self._tokens = self._map(TOKENS_FILE, "B")
+        self._token_offsets = self._map(TOKEN_OFFSETS_FILE, "Q")
+        self._postings = self._map(POSTINGS_FILE, "I")
+        self._posting_offsets = self._map(POSTING_OFFSETS_FILE, "Q")
+        self._titles = self._map(TITLES_FILE, "B")
+        self._title_offsets = self._map(TITLE_OFFSETS_FILE, "Q")
+
+    def _map(self, name: str, item_format: str) -> memoryview:
+        f = open(os.path.join(self.directory, name), "rb")
+        self._files.append(f)
+        if os.fstat(f.fileno()).st_size == 0:
+            # Empty files can not be mapped
+            return memoryview(b"").cast(item_format)
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps.append(mapped)
+        return memoryview(mapped).cast(item_format)
+
+    def __len__(self) -> int:
+        return len(self._record_offsets) - 1
+
+    def _token(self, i: int) -> bytes:
+        return bytes(self._tokens[self._token_offsets[i]:self._token_offsets[i + 1]])
+
+    def _find_token(self, token: bytes) -> int:
+        low, high = 0, len(self._token_offsets) - 1
+        while low < high:
+            middle = (low + high) // 2
+            if self._token(middle) < token:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(self._token_offsets) - 1 and self._token(low) == token:
+            return low
+        return -1
+
+    def postings(self, token: str) -> memoryview:
+        """
+        Returns the (sorted) record numbers of all records whose title contains the token.
+        """
+        i = self._find_token(token.encode("UTF-8"))
+        if i < 0:
+            return memoryview(b"").cast("I")
+        return self._postings[self._posting_offsets[i]:self._posting_offsets[i + 1]]
+
+    def record(self, record_number: int) -> dict:
+        start = self._record_offsets[record_number]
+        end = self._record_offsets[record_number + 1]
+        return json.loads(bytes(self._records[start:end]))
+
+    def normalized_title(self, record_number: int) -> str:
+        start = self._title_offsets[record_number]
+        end = self._title_offsets[record_number + 1]
+        return bytes(self._titles[start:end]).decode("UTF-8")
+
+    def search_records(self, query: str, limit: int = DEFAULT_SEARCH_LIMIT) -> [int]:
+        """
+        Returns the numbers of the (at most limit) records whose title contains all tokens of the query, the best
+        matching titles first (see ranking.similarity). All matching records are scored before the limit is applied,
+        so the best match is returned even if a query of common words matches many records. The records are scored by
+        their stored normalized titles, only the returned records are decoded by search.
+        """
+        tokens = set(tokenize(query))
+        if not tokens:
+            return []
+        postings = sorted((self.postings(token) for token in tokens), key=len)
+        if len(postings[0]) == 0:
+            return []
+
+        # Intersect starting with the shortest postings list
+        result = set(postings[0])
+        for other in postings[1:]:
+            result.intersection_update(other)
+            if not result:
+                return []
+
+        query_features = ranking.TitleFeatures(query)
+        # Normalizing a normalized title does not change it
+        scores = {record_number: ranking.similarity(query_features,
+                                                    ranking.TitleFeatures(self.normalized_title(record_number)))
+                  for record_number in result}
+        # Records with the same score are ordered by their number
+        return heapq.nsmallest(limit, result, key=lambda record_number: (-scores[record_number], record_number))
+
+    def search(self, query: str, limit: int = DEFAULT_SEARCH_LIMIT) -> [Publication]:
+        publications = []
+        for record_number in self.search_records(query, limit):
+            record = self.record(record_number)
+            if record["bib"] is None:
+                record["bib"] = create_bibtex(record["info"])
+            publications.append(Publication.from_hit(record))
+        return publications
+
+    def close(self) -> None:
+        for view in [self._records, self._record_offsets, self._tokens, self._token_offsets, self._postings,
+                     self._posting_offsets, self._titles, self._title_offsets]:
+            view.release()
+        for mapped in self._maps:
+            mapped.close()
+        for f in self._files:
+            f.close()
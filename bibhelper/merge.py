@@ -0,0 +1,108 @@
+import logging
+import os
+import sys
+from collections import OrderedDict
+from typing import Dict, List
+
+from bibhelper import beautify
+from bibhelper import config
+from bibhelper import profiling
+from bibhelper.handler.bibtex_handler import add_attribute
+
+logger = logging.getLogger(__name__)
+
+# Conflict policies: which entry is kept if several files contain an entry with the same key
+FIRST, NEWEST, UNION = config.MERGE_POLICIES
+POLICIES = config.MERGE_POLICIES
+
+
+class Merger:
+    """
+    Merges the entries of several bibliographies by key. Only one (merged) entry per key is kept, the bibliographies
+    are added entry by entry, so the memory usage depends on the number of distinct keys and not on the size of the
+    input. The entries stay in the order of their first occurrence.
+
+    The policies are:
+        first: the entry of the first bibliography wins.
+        newest: the entry of the most recently modified bibliography wins (the later bibliography if both were
+            modified at the same time).
+        union: the entry of the first bibliography is kept, the fields of the other entries are added. Values which
+            differ from the kept value are added as hidden fields (see bibtex_handler.add_attribute).
+    """
+
+    def __init__(self, policy: str = config.DEFAULT_MERGE_POLICY, hide_prefix: str = ""):
+        if policy not in POLICIES:
+            raise ValueError("Unknown policy '{}'. Valid policies are {}.".format(policy, ", ".join(POLICIES)))
+        self.policy = policy
+        self.hide_prefix = hide_prefix
+        self.entries: Dict[str, dict] = OrderedDict()
+        # Key -> bibliography and its priority of the kept entry (the first entry for policy union)
+        self._sources = {}
+        self._priorities = {}
+        # Key -> unmodified first entry, kept for policy union once fields are added to the entry
+        self._originals: Dict[str, dict] = {}
+        # Key -> bibliographies with entries differing from the first entry (the kept entry for policy newest)
+        self.conflicts: Dict[str, List[str]] = {}
+        # Number of added entries
+        self.count = 0
+
+    def add(self, bib_entry: dict, source: str, priority=0) -> None:
+        """
+        Adds an entry of the bibliography source. With policy newest, the entry of the bibliography with the highest
+        priority wins.
+        """
+        self.count += 1
+        key = bib_entry["ID"]
+        kept = self.entries.get(key)
+        if kept is None:
+            self.entries[key] = bib_entry
+            self._priorities[key] = priority
+            self._sources[key] = source
+            return
+
+        if self._originals.get(key, kept) != bib_entry:
+            self.conflicts.setdefault(key, [self._sources[key]]).append(source)
+
+        if self.policy == NEWEST and priority >= self._priorities[key]:
+            # Replacing the value keeps the position of the key
+            self.entries[key] = bib_entry
+            self._sources[key] = source
+            self._priorities[key] = priority
+        elif self.policy == UNION:
+            if key not in self._originals:
+                self._originals[key] = dict(kept)
+            for attribute, value in bib_entry.items():
+                if attribute not in ("ENTRYTYPE", "ID"):
+                    add_attribute(kept, attribute, value, self.hide_prefix)
+
+
+def get_priority(path: str, index: int) -> tuple:
+    return os.stat(path).st_mtime_ns, index
+
+
+def merge(paths, output_file, report_file, policy, curlify, pretty):
+    """
+    Merges the bibliographies (paths) by key (see Merger) and writes the result formatted like Beautify. The files
+    are read entry by entry. Comments, preambles and strings of all files are written in front of the entries. Keys
+    with differing entries are reported (one line per key: the key and the files, default: stderr).
+    """
+    merger = Merger(policy, config.get_hide_prefix())
+    parser = beautify.create_parser()
+    with profiling.span("merge.read"):
+        for index, path in enumerate(paths):
+            priority = get_priority(path, index)
+            with open(path, "r", encoding="UTF-8") as f:
+                for bib_entry in beautify.iter_entries(f, parser):
+                    merger.add(bib_entry, path, priority)
+
+    report_file = report_file or sys.stderr
+    for key, sources in merger.conflicts.items():
+        report_file.write("CONFLICT\t{}\t{}\n".format(key, "; ".join(sources)))
+    logger.info("Merged {} entries of {} files into {} entries, {} keys with differing entries.".format(
+        merger.count, len(paths), len(merger.entries), len(merger.conflicts)))
+
+    bib_database = parser.bib_database
+    bib_database.entries = list(merger.entries.values())
+    merger.entries.clear()
+    beautify.style_to_file(bib_database, curlify, pretty, output_file or sys.stdout)
+    return merger
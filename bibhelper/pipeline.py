@@ -0,0 +1,101 @@
+import importlib
+from functools import partial
+from typing import Callable, Dict, Iterable, List, Union
+
+from bibhelper import config
+from bibhelper import handler_util
+from bibhelper import profiling
+from bibhelper.handler import bibtex_handler
+
+# A stage transforms an entry in place, a stage factory creates the stage of a style (or None if the stage does nothing
+# in this style)
+Stage = Callable[[dict], None]
+StageFactory = Callable[[config.Style], Union[Stage, None]]
+
+CURLIFY = "curlify"
+HIDE_ATTRIBUTES = "hideAttributes"
+REWRITE_BOOKTITLE = "rewriteBooktitle"
+
+_stage_factories: Dict[str, StageFactory] = {}
+
+
+def register_stage(name: str, factory: StageFactory) -> None:
+    """
+    Registers a stage, which can then be added to the pipeline by its name (see style -> stages in the configuration).
+    """
+    _stage_factories[name] = factory
+
+
+def _create_curlify_stage(style: config.Style) -> Stage:
+    return handler_util.curlify_title
+
+
+def _create_hide_attributes_stage(style: config.Style) -> Union[Stage, None]:
+    if not style.hidden_attribute_names:
+        return None
+    return partial(bibtex_handler.hide_attributes, attributes_to_hide=style.hidden_attribute_names,
+                   hide_prefix=style.hide_prefix)
+
+
+def _create_rewrite_booktitle_stage(style: config.Style) -> Union[Stage, None]:
+    if not style.rewrite_booktitle:
+        return None
+    return partial(handler_util.rewrite_booktitle, style=style)
+
+
+register_stage(CURLIFY, _create_curlify_stage)
+register_stage(HIDE_ATTRIBUTES, _create_hide_attributes_stage)
+register_stage(REWRITE_BOOKTITLE, _create_rewrite_booktitle_stage)
+
+
+def get_stage_factory(name: str) -> StageFactory:
+    """
+    Returns the factory of a registered stage or, if the name has the form 'module:function', imports the factory.
+    """
+    if name in _stage_factories:
+        return _stage_factories[name]
+    if ":" in name:
+        module_name, factory_name = name.split(":", 1)
+        return getattr(importlib.import_module(module_name), factory_name)
+    raise ValueError("Unknown stage '{}'. Registered stages: {}".format(name, ", ".join(_stage_factories)))
+
+
+def get_stage_names(curlify: bool, pretty: bool, style: config.Style) -> List[str]:
+    names = []
+    if curlify:
+        names.append(CURLIFY)
+    if pretty:
+        names.extend([HIDE_ATTRIBUTES, REWRITE_BOOKTITLE])
+        names.extend(style.stages)
+    return names
+
+
+class Pipeline:
+    """
+    Transforms entries by a fixed sequence of stages. Each entry is copied once and all stages are applied to the copy,
+    the original entry is not modified.
+    """
+    __slots__ = ("stages",)
+
+    def __init__(self, stages: Iterable[Stage]):
+        self.stages = tuple(stages)
+
+    def __call__(self, bib_entry: dict) -> dict:
+        bib_entry = dict(bib_entry)
+        for stage in self.stages:
+            stage(bib_entry)
+        return bib_entry
+
+    def transform(self, entries: Iterable[dict]) -> List[dict]:
+        return [self(bib_entry) for bib_entry in entries]
+
+
+def create_pipeline(curlify: bool, pretty: bool, style: config.Style = None) -> Pipeline:
+    """
+    Creates the pipeline of the flags --curly (curlify) and --pretty. The stages are resolved once from the style (by
+    default the style of the configuration) and stages without effect in this style are left out. If profiling is
+    enabled, each stage is recorded as span 'stage.<name>'.
+    """
+    style = style or config.get_style()
+    stages = [(name, get_stage_factory(name)(style)) for name in get_stage_names(curlify, pretty, style)]
+    return Pipeline(profiling.wrap("stage." + name, stage) for name, stage in stages if stage is not None)
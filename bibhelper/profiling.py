@@ -0,0 +1,203 @@
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import nullcontext
+from typing import Callable, Dict, List, Optional
+
+# Trace events (see Profiler.write_trace) recorded at most, the statistics include all spans
+MAX_TRACE_EVENTS = 200000
+
+_profiler = None
+# Returned by span if profiling is disabled, so spans cost one call
+_NULL_SPAN = nullcontext()
+
+
+class SpanStatistics:
+    __slots__ = ("count", "total", "max", "peak_memory")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        # None if the memory was not recorded (see Profiler)
+        self.peak_memory = None
+
+    def to_dict(self) -> dict:
+        return {"count": self.count,
+                "total": self.total,
+                "mean": self.total / self.count if self.count else 0.0,
+                "max": self.max,
+                "peak_memory": self.peak_memory}
+
+
+class _Frame:
+    __slots__ = ("name", "start", "start_memory", "peak")
+
+    def __init__(self, name, start, start_memory):
+        self.name = name
+        self.start = start
+        self.start_memory = start_memory
+        self.peak = start_memory
+
+
+class Profiler:
+    """
+    Records the wall time, the number of calls and the peak memory (allocated by Python while the span ran, traced by
+    tracemalloc if trace_memory is set) of named spans. The spans of each thread nest.
+
+    tracemalloc has a single peak for the whole process, so the memory is only recorded for the spans of the thread
+    which created the profiler. Its peaks include the memory allocated by other threads in the meantime (e.g. by the
+    workers of FindBatch), the spans of the other threads have no peak.
+    """
+
+    def __init__(self, trace_memory: bool = True):
+        self.trace_memory = trace_memory
+        self.statistics: Dict[str, SpanStatistics] = {}
+        self.events: List[dict] = []
+        self._origin = time.perf_counter()
+        self._memory_thread = threading.get_ident()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def stop(self) -> None:
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def _stack(self) -> list:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _memory(self, stack):
+        if not self.trace_memory or threading.get_ident() != self._memory_thread:
+            return None
+        current, peak = tracemalloc.get_traced_memory()
+        if stack:
+            # The peak since the last reset belongs to the enclosing span
+            stack[-1].peak = max(stack[-1].peak, peak)
+        tracemalloc.reset_peak()
+        return current
+
+    def enter(self, name: str) -> None:
+        stack = self._stack()
+        stack.append(_Frame(name, 0.0, self._memory(stack)))
+        stack[-1].start = time.perf_counter()
+
+    def exit(self) -> None:
+        end = time.perf_counter()
+        stack = self._stack()
+        frame = stack[-1]
+        self._memory(stack)
+        stack.pop()
+        if stack and frame.peak is not None:
+            # The peak of the inner span is a peak of the enclosing span, too
+            stack[-1].peak = max(stack[-1].peak, frame.peak)
+        duration = end - frame.start
+
+        with self._lock:
+            statistics = self.statistics.get(frame.name)
+            if statistics is None:
+                statistics = self.statistics[frame.name] = SpanStatistics()
+            statistics.count += 1
+            statistics.total += duration
+            statistics.max = max(statistics.max, duration)
+            if frame.peak is not None:
+                statistics.peak_memory = max(statistics.peak_memory or 0, frame.peak - frame.start_memory)
+            if len(self.events) < MAX_TRACE_EVENTS:
+                self.events.append({"name": frame.name,
+                                    "ph": "X",
+                                    "ts": (frame.start - self._origin) * 1e6,
+                                    "dur": duration * 1e6,
+                                    "pid": os.getpid(),
+                                    "tid": threading.get_ident()})
+
+    def span(self, name: str):
+        return _Span(self, name)
+
+    def to_dict(self) -> dict:
+        return {name: statistics.to_dict() for name, statistics in self.statistics.items()}
+
+    def write_json(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def write_trace(self, path: str) -> None:
+        """
+        Writes the spans in the Trace Event Format, which is shown by chrome://tracing or https://ui.perfetto.dev.
+        """
+        with open(path, "w") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
+
+    def format_table(self) -> str:
+        lines = ["{:<36} {:>8} {:>11} {:>11} {:>11} {:>11}".format("span", "calls", "total ms", "mean ms", "max ms",
+                                                                 "peak KiB")]
+        for name, statistics in sorted(self.statistics.items(), key=lambda item: -item[1].total):
+            if statistics.peak_memory is None:
+                peak_memory = "-"
+            else:
+                peak_memory = "{:.1f}".format(statistics.peak_memory / 1024)
+            lines.append("{:<36} {:>8} {:>11.2f} {:>11.3f} {:>11.3f} {:>11}".format(
+                name, statistics.count, statistics.total * 1000, statistics.total / statistics.count * 1000,
+                statistics.max * 1000, peak_memory))
+        if self.trace_memory:
+            lines.append("peak KiB: memory of the whole process, recorded for the spans of the main thread only")
+        return "\n".join(lines)
+
+
+class _Span:
+    __slots__ = ("profiler", "name")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.profiler.enter(self.name)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.profiler.exit()
+
+
+def get_profiler() -> Optional[Profiler]:
+    return _profiler
+
+
+def set_profiler(profiler: Optional[Profiler]) -> None:
+    global _profiler
+    _profiler = profiler
+
+
+def span(name: str):
+    """
+    Returns a context manager recording the time spent in the with block as span name, if profiling is enabled.
+    """
+    if _profiler is None:
+        return _NULL_SPAN
+    return _profiler.span(name)
+
+
+def wrap(name: str, function: Callable) -> Callable:
+    """
+    Returns the function recording each call as span name if profiling is enabled, otherwise the function itself. Used
+    for functions called per entry, which then cost nothing if profiling is disabled.
+    """
+    profiler = _profiler
+    if profiler is None:
+        return function
+
+    def wrapper(*args, **kwargs):
+        profiler.enter(name)
+        try:
+            return function(*args, **kwargs)
+        finally:
+            profiler.exit()
+
+    return wrapper
@@ -0,0 +1,188 @@
+import logging
+import mmap
+import os
+import re
+import sys
+from typing import Dict, Iterable, List, Set, Tuple
+
+from bibhelper import beautify
+
+logger = logging.getLogger(__name__)
+
+# Report statuses
+UNDEFINED = "UNDEFINED"
+UNUSED = "UNUSED"
+
+# Commands adding bibliography files (bibtex, biblatex)
+BIBLIOGRAPHY_COMMANDS = (b"bibliography", b"addbibresource", b"addglobalbib", b"addsectionbib")
+
+# Files are scanned by a pool of processes if there are at least this many files
+MIN_FILES_PER_PROCESS = 64
+
+
+def _argument(space: bytes) -> bytes:
+    # Optional arguments ([...] or (...)) followed by a mandatory argument, separated by space
+    return rb"(?:" + space + rb"(?:\[[^\]]*\]|\([^)]*\)))*" + space + rb"\{[^}]*\}"
+
+
+# The arguments of citation commands may continue on the next line, but not after a blank line. The argument of the
+# bibliography commands is on the same line, so a group on the next line (e.g. {\small ...}) is not taken for it.
+_CITE_ARGUMENT = _argument(rb"[ \t]*(?:\r?\n[ \t]*)?")
+_BIBLIOGRAPHY_ARGUMENT = _argument(rb"[ \t]*")
+# One pattern finds comments (which are skipped), citation commands of natbib and biblatex (\cite, \citep, \Textcite,
+# \Cite, \parencites, \nocite, ...) with their optional arguments and the commands adding bibliography files
+_TEX_PATTERN = re.compile(rb"(?<!\\)%[^\n]*"
+                          rb"|\\(?P<command>[A-Za-z]*[Cc]ite[A-Za-z]*)\*?"
+                          rb"(?P<arguments>" + _CITE_ARGUMENT + rb"(?:" + _CITE_ARGUMENT + rb")*)"
+                          rb"|\\(?P<bibliography_command>" + b"|".join(BIBLIOGRAPHY_COMMANDS) + rb")\*?"
+                          rb"(?P<bibliography_argument>" + _BIBLIOGRAPHY_ARGUMENT + rb")")
+_MANDATORY_ARGUMENT_PATTERN = re.compile(rb"\{([^}]*)\}")
+
+
+def find_tex_files(directory: str) -> List[str]:
+    """
+    Returns all .tex files of the directory tree. Hidden directories (e.g. .git) are skipped.
+    """
+    tex_files = []
+    for root, directories, files in os.walk(directory):
+        directories[:] = sorted(d for d in directories if not d.startswith("."))
+        tex_files.extend(os.path.join(root, f) for f in sorted(files) if f.endswith(".tex"))
+    return tex_files
+
+
+def _split_list(argument: bytes) -> List[str]:
+    return [item.strip() for item in argument.decode("UTF-8", errors="replace").split(",") if item.strip()]
+
+
+def scan_content(content) -> Tuple[List[str], List[str]]:
+    """
+    Returns the cited keys and the bibliography files (as written in the command) of LaTeX content (bytes or a
+    memory-mapped file).
+    """
+    keys = []
+    bibliographies = []
+    for match in _TEX_PATTERN.finditer(content):
+        if match.group("bibliography_command") is not None:
+            argument = _MANDATORY_ARGUMENT_PATTERN.search(match.group("bibliography_argument")).group(1)
+            bibliographies.extend(_split_list(argument))
+            continue
+        command = match.group("command")
+        if command is None:
+            # Comment
+            continue
+        arguments = _MANDATORY_ARGUMENT_PATTERN.findall(match.group("arguments"))
+        if not command.lower().endswith(b"cites"):
+            # Only multicite commands (\cites{a}{b}) have several lists of keys
+            arguments = arguments[:1]
+        for argument in arguments:
+            keys.extend(_split_list(argument))
+    return keys, bibliographies
+
+
+def scan_file(path: str) -> Tuple[List[str], List[str]]:
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # Empty files can not be memory-mapped
+            return [], []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+            return scan_content(content)
+
+
+def scan_files(tex_files: List[str], jobs: int = None) -> Tuple[Dict[str, List[str]], List[Tuple[str, str]]]:
+    """
+    Scans all files, by a pool of processes if there are many files. Returns the cited keys (key -> files citing it, in
+    the order of their first citation) and the bibliography files (file, bibliography as written in the command).
+    """
+    jobs = jobs or os.cpu_count() or 1
+    if jobs > 1 and len(tex_files) >= MIN_FILES_PER_PROCESS:
+        chunk_size = max(1, len(tex_files) // (jobs * 4))
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(scan_file, tex_files, chunksize=chunk_size))
+    else:
+        results = [scan_file(tex_file) for tex_file in tex_files]
+
+    citations = {}
+    bibliographies = []
+    for tex_file, (keys, file_bibliographies) in zip(tex_files, results):
+        for key in keys:
+            files = citations.setdefault(key, [])
+            if not files or files[-1] != tex_file:
+                files.append(tex_file)
+        bibliographies.extend((tex_file, bibliography) for bibliography in file_bibliographies)
+    return citations, bibliographies
+
+
+def resolve_bibliographies(bibliographies: Iterable[Tuple[str, str]], directory: str) -> List[str]:
+    """
+    Resolves the bibliography files of the commands: relative to the file containing the command or else relative to
+    the project directory. \\bibliography omits the extension .bib.
+    """
+    paths = []
+    for tex_file, bibliography in bibliographies:
+        if not bibliography.endswith(".bib"):
+            bibliography += ".bib"
+        candidates = [os.path.join(os.path.dirname(tex_file), bibliography), os.path.join(directory, bibliography)]
+        path = next((candidate for candidate in candidates if os.path.isfile(candidate)), None)
+        if path is None:
+            logger.warning("Bibliography {} of {} not found.".format(bibliography, tex_file))
+            continue
+        path = os.path.normpath(path)
+        if path not in paths:
+            paths.append(path)
+    return paths
+
+
+def select_cited(entries: List[dict], cited_keys: Set[str]) -> List[dict]:
+    """
+    Returns the cited entries (all entries if \\nocite{*} is used) and the entries they refer to by crossref, in the
+    order of the bibliography.
+    """
+    if "*" in cited_keys:
+        return list(entries)
+    keys = set(cited_keys)
+    entries_by_key = {bib_entry["ID"]: bib_entry for bib_entry in entries}
+    pending = [key for key in keys if key in entries_by_key]
+    while pending:
+        parent = entries_by_key[pending.pop()].get("crossref")
+        if parent in entries_by_key and parent not in keys:
+            keys.add(parent)
+            pending.append(parent)
+    return [bib_entry for bib_entry in entries if bib_entry["ID"] in keys]
+
+
+def prune(directory, bib_files, output_file, report_file, curlify, pretty, jobs=None):
+    """
+    Writes the entries of the bibliography files which are cited by the .tex files of the directory tree (formatted
+    like Beautify) and reports the undefined keys (cited, but not in the bibliography) and the unused entries. If no
+    bibliography files are given, the files of the \\bibliography and \\addbibresource commands are used.
+    """
+    tex_files = find_tex_files(directory)
+    citations, bibliographies = scan_files(tex_files, jobs)
+    logger.info("Found {} cited keys in {} files.".format(len(citations), len(tex_files)))
+
+    if not bib_files:
+        bib_files = resolve_bibliographies(bibliographies, directory)
+    parser = beautify.create_parser()
+    parser.expect_multiple_parse = True
+    for bib_file in bib_files:
+        with open(bib_file, "r", encoding="UTF-8") as f:
+            parser.parse(f.read())
+    bib_database = parser.bib_database
+
+    entries = bib_database.entries
+    bib_database.entries = select_cited(entries, set(citations))
+    keys = {bib_entry["ID"] for bib_entry in entries}
+    cited = {bib_entry["ID"] for bib_entry in bib_database.entries}
+
+    report_file = report_file or sys.stderr
+    for key, files in citations.items():
+        if key != "*" and key not in keys:
+            report_file.write("{}\t{}\t{}\n".format(UNDEFINED, key, ", ".join(files)))
+    for bib_entry in entries:
+        if bib_entry["ID"] not in cited:
+            report_file.write("{}\t{}\n".format(UNUSED, bib_entry["ID"]))
+    logger.info("Kept {} of {} entries.".format(len(bib_database.entries), len(entries)))
+
+    beautify.output(beautify.style(bib_database, curlify, pretty), False, output_file)
+    return bib_database
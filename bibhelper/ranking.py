@@ -0,0 +1,133 @@
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Tuple, Union
+
+# Weight of the token similarity, the trigram similarity is weighted by 1 - TOKEN_WEIGHT
+TOKEN_WEIGHT = 0.5
+
+# LaTeX commands (e.g. \textbf, \"), which are removed together with all curly braces
+_LATEX_PATTERN = re.compile(r"\\[a-zA-Z]+\s*|\\.|[{}]")
+_NON_WORD_PATTERN = re.compile(r"[\W_]+")
+_AUTHOR_SEPARATOR_PATTERN = re.compile(r"\s+and\s+")
+
+
+def normalize_title(title: str) -> str:
+    """
+    Normalizes a title for comparison: LaTeX commands and curly braces are removed, accents are stripped, the title is
+    case-folded and punctuation is replaced by single spaces.
+
+    Example:
+        normalize_title("The {NoSQL} M\\"{u}ller-St\u00f6res.") returns "the nosql muller stores"
+    """
+    title = _LATEX_PATTERN.sub("", title)
+    if not title.isascii():
+        title = "".join(c for c in unicodedata.normalize("NFKD", title) if not unicodedata.combining(c))
+    return _NON_WORD_PATTERN.sub(" ", title.casefold()).strip()
+
+
+def get_last_names(author: str) -> Tuple[str, ...]:
+    """
+    Returns the normalized last names of all authors, e.g. ("fruth", "muller") for
+    "Michael Fruth and M{\\"u}ller, Anna".
+    """
+    last_names = []
+    for name in _AUTHOR_SEPARATOR_PATTERN.split(author.strip()):
+        if "," in name:
+            last_name = name.split(",", 1)[0]
+        else:
+            last_name = name.rsplit(None, 1)[-1] if name.strip() else ""
+        last_name = normalize_title(last_name)
+        if last_name:
+            last_names.append(last_name)
+    return tuple(last_names)
+
+
+class TitleFeatures:
+    """
+    Precomputed features of a title: the normalized title, its tokens and its character trigrams.
+    """
+    __slots__ = ("normalized", "tokens", "trigrams")
+
+    def __init__(self, title: str):
+        self.normalized = normalize_title(title)
+        self.tokens = frozenset(self.normalized.split())
+        padded = " {} ".format(self.normalized)
+        self.trigrams = frozenset([padded[i:i + 3] for i in range(len(padded) - 2)])
+
+
+@lru_cache(maxsize=65536)
+def get_features(title: str) -> TitleFeatures:
+    """
+    Returns the (memoized) features of the title. Titles of search results repeat across queries, e.g. in FindBatch.
+    """
+    return TitleFeatures(title)
+
+
+def _dice(a: frozenset, b: frozenset) -> float:
+    total = len(a) + len(b)
+    if total == 0:
+        return 0.0
+    return 2.0 * len(a & b) / total
+
+
+def trigram_similarity(a: TitleFeatures, b: TitleFeatures) -> float:
+    """
+    Returns the (symmetric) Dice coefficient of the trigram sets of two titles, which tolerates typos and different
+    word forms, e.g. "Schema" and "Schemas".
+    """
+    return _dice(a.trigrams, b.trigrams)
+
+
+def similarity(query: TitleFeatures, candidate: TitleFeatures) -> float:
+    """
+    Returns the similarity of two titles between 0 (nothing in common) and 1 (same normalized title).
+
+    The token similarity is the mean of the share of query tokens contained in the candidate (queries are often only a
+    part of the title) and the Dice coefficient of both token sets (shorter candidates are preferred). It is combined
+    with the Dice coefficient of the trigram sets, which tolerates typos and differently split words.
+    """
+    if query.normalized == candidate.normalized:
+        return 1.0
+    common_tokens = len(query.tokens & candidate.tokens)
+    if common_tokens == 0:
+        token_similarity = 0.0
+    else:
+        token_similarity = (common_tokens / len(query.tokens)
+                            + 2.0 * common_tokens / (len(query.tokens) + len(candidate.tokens))) / 2
+    return TOKEN_WEIGHT * token_similarity + (1 - TOKEN_WEIGHT) * _dice(query.trigrams, candidate.trigrams)
+
+
+def score_titles(query: str, titles: [str]) -> [float]:
+    query_features = TitleFeatures(query)
+    return [similarity(query_features, get_features(title)) for title in titles]
+
+
+def rank_publications(query: str, publications: list) -> list:
+    """
+    Returns (score, publication) pairs ordered by descending score. Publications with the same score keep their order.
+    """
+    scores = score_titles(query, [publication.title for publication in publications])
+    ranked = sorted(zip(scores, range(len(publications))), key=lambda pair: -pair[0])
+    return [(score, publications[i]) for score, i in ranked]
+
+
+def select_publication(query: str, publications: list, threshold: float) -> Union[object, None]:
+    """
+    Returns the best matching publication if its score reaches the threshold and no other publication has the same
+    score, None otherwise.
+    """
+    return select_ranked(rank_publications(query, publications), threshold)
+
+
+def select_ranked(ranked: list, threshold: float) -> Union[object, None]:
+    """
+    Like select_publication, but selects from the (score, publication) pairs returned by rank_publications, so
+    publications which are ranked anyway are not scored twice.
+    """
+    if not ranked or ranked[0][0] < threshold:
+        return None
+    if len(ranked) > 1 and ranked[1][0] == ranked[0][0]:
+        # Tie, e.g. the same title published twice
+        return None
+    return ranked[0][1]
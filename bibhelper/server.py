@@ -0,0 +1,289 @@
+import inspect
+import json
+import logging
+import os
+import socket
+import socketserver
+import stat
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Callable, Iterable, Optional
+
+from bibhelper import __version__
+from bibhelper import beautify
+from bibhelper import find
+from bibhelper import find_batch
+from bibhelper import incremental
+from bibhelper import profiling
+from bibhelper import ranking
+
+logger = logging.getLogger(__name__)
+
+# Error codes of JSON-RPC 2.0
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+# A method failed, e.g. DBLP could not be reached
+SERVER_ERROR = -32000
+
+DEFAULT_WORKERS = 8
+# Number of documents whose formatted entries are kept (see Service.beautify)
+MAX_DOCUMENTS = 64
+
+
+class RpcError(Exception):
+
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+def _check_type(name, value, expected_type):
+    if not isinstance(value, expected_type):
+        raise RpcError(INVALID_PARAMS, "Parameter {} must be of type {}.".format(name, expected_type.__name__))
+
+
+class Service:
+    """
+    The methods of the server. Everything loaded once (the configuration and the compiled style, the HTTP session, the
+    response cache and the formatted entries of the documents) is kept between requests. The methods are called
+    concurrently.
+    """
+
+    def __init__(self, max_documents: int = MAX_DOCUMENTS):
+        self.max_documents = max_documents
+        self.stopped = threading.Event()
+        self.methods = {"beautify": self.beautify,
+                        "find": self.find,
+                        "version": self.version,
+                        "shutdown": self.shutdown}
+        self._documents = OrderedDict()
+        self._lock = threading.Lock()
+
+    def beautify(self, content, curly=False, pretty=False, document=None) -> dict:
+        """
+        Beautifies the content. If the document (e.g. the path of the file) is given, the formatted entries are kept,
+        so the next request of the document only formats the changed entries (see incremental.format_incremental).
+        """
+        _check_type("content", content, str)
+        if document is None:
+            return {"bib": beautify.style(beautify.create_parser().parse(content), curly, pretty)}
+
+        _check_type("document", document, str)
+        with self._lock:
+            state = self._documents.pop(document, {})
+        bib, state = incremental.format_incremental(content, state, curly, pretty)
+        with self._lock:
+            self._documents[document] = state
+            while len(self._documents) > self.max_documents:
+                self._documents.popitem(last=False)
+        return {"bib": bib}
+
+    def find(self, title, curly=False, pretty=False, key=None) -> dict:
+        """
+        Searches the publication like Find, but never asks the user: if the title matches several publications and
+        none is selected automatically, all of them are returned (status AMBIGUOUS, best match first). The key of
+        one of them selects it in a second request.
+        """
+        _check_type("title", title, str)
+        publications = find.load_publications(find.create_publications_url(title))
+        if not publications:
+            return {"status": find_batch.NOT_FOUND, "publications": []}
+
+        ranked = ranking.rank_publications(title, publications)
+        publications = [publication for _, publication in ranked]
+        if key is not None:
+            publication = next((publication for publication in publications if publication.key == key), None)
+            if publication is None:
+                raise RpcError(INVALID_PARAMS, "Publication {} does not match the title.".format(key))
+        else:
+            publication = find_batch.select_ranked(ranked)
+        if publication is None:
+            return {"status": find_batch.AMBIGUOUS,
+                    "publications": [publication.to_dict() for publication in publications]}
+        return {"status": find_batch.FOUND,
+                "publications": [publication.to_dict()],
+                "bib": find.load_bibitem(publication, curly, pretty)}
+
+    def version(self) -> dict:
+        return {"version": __version__}
+
+    def shutdown(self) -> None:
+        """
+        Stops the server after the response.
+        """
+        self.stopped.set()
+
+
+def _error(request_id, code: int, message: str) -> dict:
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+def handle_request(service: Service, line) -> Optional[str]:
+    """
+    Handles one JSON-RPC request (a JSON object, batches are not supported) and returns the response. Notifications
+    (requests without an id) are not answered.
+    """
+    try:
+        request = json.loads(line)
+    except ValueError as e:
+        return json.dumps(_error(None, PARSE_ERROR, "Parse error: {}".format(e)))
+    if not isinstance(request, dict):
+        return json.dumps(_error(None, INVALID_REQUEST, "The request must be a JSON object."))
+
+    request_id = request.get("id")
+    params = request.get("params", {})
+    try:
+        if request.get("jsonrpc") != "2.0" or not isinstance(request.get("method"), str):
+            raise RpcError(INVALID_REQUEST, "Invalid JSON-RPC 2.0 request.")
+        method = service.methods.get(request["method"])
+        if method is None:
+            raise RpcError(METHOD_NOT_FOUND, "Method not found: {}".format(request["method"]))
+        if not isinstance(params, (dict, list)):
+            raise RpcError(INVALID_REQUEST, "The params must be an object or an array.")
+        args, kwargs = (params, {}) if isinstance(params, list) else ((), params)
+        try:
+            inspect.signature(method).bind(*args, **kwargs)
+        except TypeError as e:
+            raise RpcError(INVALID_PARAMS, str(e))
+        with profiling.span("rpc." + request["method"]):
+            result = method(*args, **kwargs)
+        response = {"jsonrpc": "2.0", "id": request_id, "result": result}
+    except RpcError as e:
+        response = _error(request_id, e.code, e.message)
+    except Exception as e:
+        logger.warning("Request {} ({}) failed: {}".format(request_id, request["method"], e))
+        response = _error(request_id, SERVER_ERROR, str(e))
+
+    if "id" not in request:
+        return None
+    return json.dumps(response)
+
+
+def serve_stream(service: Service, lines: Iterable, write: Callable[[str], None],
+                 executor: ThreadPoolExecutor) -> None:
+    """
+    Reads one request per line until the end of the stream. The requests are handled concurrently by the executor,
+    each response is written (by write, which gets one line) as soon as it is ready, so the responses may be out of
+    order.
+    """
+    lock = threading.Lock()
+    pending = set()
+
+    def respond(line):
+        response = handle_request(service, line)
+        if response is not None:
+            with lock:
+                write(response + "\n")
+
+    for line in lines:
+        if not line.strip():
+            continue
+        future = executor.submit(respond, line)
+        with lock:
+            pending.add(future)
+        future.add_done_callback(lambda f: _discard(pending, f, lock))
+    with lock:
+        futures = list(pending)
+    wait(futures)
+
+
+def _discard(pending, future, lock):
+    with lock:
+        pending.discard(future)
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        def write(response):
+            self.wfile.write(response.encode("UTF-8"))
+
+        try:
+            serve_stream(self.server.service, self.rfile, write, self.server.executor)
+        except (BrokenPipeError, ConnectionResetError):
+            logger.debug("Client disconnected.")
+
+
+class UnixServer(socketserver.ThreadingUnixStreamServer):
+    """
+    Serves the service on a Unix socket, each connection is handled by a thread. The requests of all connections are
+    handled by a shared pool of workers threads.
+    """
+    daemon_threads = True
+
+    def __init__(self, path: str, service: Service, workers: int = DEFAULT_WORKERS):
+        _remove_stale_socket(path)
+        # Only the user may connect: the socket is created without permissions for others, otherwise they could
+        # connect before the permissions are changed
+        umask = os.umask(0o077)
+        try:
+            super().__init__(path, _RequestHandler)
+        finally:
+            os.umask(umask)
+        os.chmod(path, 0o600)
+        self.path = path
+        self.service = service
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+
+    def serve_until_stopped(self) -> None:
+        """
+        Serves until the shutdown method was called.
+        """
+        watcher = threading.Thread(target=self._shutdown_when_stopped, daemon=True)
+        watcher.start()
+        self.serve_forever()
+
+    def _shutdown_when_stopped(self):
+        self.service.stopped.wait()
+        self.shutdown()
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+def _remove_stale_socket(path: str) -> None:
+    try:
+        mode = os.lstat(path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        # E.g. a mistyped --socket, the file must not be removed
+        raise OSError("{} exists and is not a socket.".format(path))
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        try:
+            s.connect(path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            # A server which did not stop cleanly left the socket
+            os.unlink(path)
+            return
+    raise OSError("A server is already listening on {}.".format(path))
+
+
+def serve_socket(path: str, workers: int = DEFAULT_WORKERS) -> None:
+    service = Service()
+    with UnixServer(path, service, workers) as server:
+        logger.info("Listening on {}.".format(path))
+        server.serve_until_stopped()
+
+
+def serve_stdio(workers: int = DEFAULT_WORKERS) -> None:
+    """
+    Serves requests read from stdin, the responses are written to stdout. Stops at the end of the input (the shutdown
+    method has no effect).
+    """
+    service = Service()
+
+    def write(response):
+        sys.stdout.write(response)
+        sys.stdout.flush()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        serve_stream(service, sys.stdin, write, executor)
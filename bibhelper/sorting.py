@@ -0,0 +1,160 @@
+import heapq
+import logging
+import os
+import pickle
+import re
+import tempfile
+from typing import Iterable, Iterator, List, Optional
+
+from bibhelper import ranking
+from bibhelper.handler import bibtex_handler
+
+logger = logging.getLogger(__name__)
+
+# Fields entries can be sorted by (see style -> sortEntries)
+KEY = "key"
+YEAR = "year"
+AUTHOR = "author"
+TYPE = "type"
+SORT_FIELDS = (KEY, YEAR, AUTHOR, TYPE)
+# Prefix of a field sorted in descending order, e.g. "-year"
+DESCENDING_PREFIX = "-"
+
+# Entries sorted in memory at most (one run), see sort_entries
+DEFAULT_RUN_SIZE = 100000
+# Runs merged at once, more runs are merged in several passes
+DEFAULT_FAN_IN = 64
+
+_YEAR_PATTERN = re.compile(r"[0-9]{4}")
+
+
+class _Descending:
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other):
+        return other.value < self.value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+
+def _get_key(bib_entry: dict, hide_prefix: str) -> Optional[str]:
+    return bib_entry.get("ID", "").casefold() or None
+
+
+def _get_year(bib_entry: dict, hide_prefix: str) -> Optional[int]:
+    year = _YEAR_PATTERN.search(bibtex_handler.get_field(bib_entry, "year", hide_prefix) or "")
+    return int(year.group()) if year else None
+
+
+def _get_author(bib_entry: dict, hide_prefix: str) -> Optional[str]:
+    # Proceedings have editors instead of authors
+    names = bibtex_handler.get_field(bib_entry, "author", hide_prefix) or \
+        bibtex_handler.get_field(bib_entry, "editor", hide_prefix) or ""
+    last_names = ranking.get_last_names(names)
+    return last_names[0] if last_names else None
+
+
+def _get_type(bib_entry: dict, hide_prefix: str) -> Optional[str]:
+    return bib_entry.get("ENTRYTYPE", "").casefold() or None
+
+
+_GETTERS = {KEY: _get_key, YEAR: _get_year, AUTHOR: _get_author, TYPE: _get_type}
+
+
+class EntrySortKey:
+    """
+    Sort key of entries by a combination of fields (see SORT_FIELDS), e.g. ("-year", "author") sorts the newest
+    entries first and entries of the same year by the last name of the first author. Keys, authors and types are
+    compared case-insensitively, hidden fields are considered (see bibtex_handler.get_field) and entries lacking a
+    field are sorted last.
+    """
+
+    def __init__(self, fields: Iterable[str], hide_prefix: str):
+        self.fields = tuple(fields)
+        self.hide_prefix = hide_prefix
+        self._getters = []
+        for field in self.fields:
+            name = field[len(DESCENDING_PREFIX):] if field.startswith(DESCENDING_PREFIX) else field
+            if name not in _GETTERS:
+                raise ValueError("Unknown sort field '{}'. Valid fields are {}.".format(field, ", ".join(SORT_FIELDS)))
+            self._getters.append((_GETTERS[name], field.startswith(DESCENDING_PREFIX)))
+
+    def values(self, bib_entry: dict) -> list:
+        """
+        Returns the values the entry is sorted by. The values are JSON serializable, so they can be stored instead of
+        the entry (see incremental).
+        """
+        return [getter(bib_entry, self.hide_prefix) for getter, _ in self._getters]
+
+    def key(self, values: list) -> tuple:
+        parts = []
+        for value, (_, descending) in zip(values, self._getters):
+            if value is None:
+                parts.append((1, 0))
+            else:
+                parts.append((0, _Descending(value) if descending else value))
+        return tuple(parts)
+
+    def __call__(self, bib_entry: dict) -> tuple:
+        return self.key(self.values(bib_entry))
+
+
+def _write_run(entries: Iterable[dict], directory: str) -> str:
+    fd, path = tempfile.mkstemp(dir=directory, suffix=".run")
+    with os.fdopen(fd, "wb") as f:
+        for bib_entry in entries:
+            pickle.dump(bib_entry, f, pickle.HIGHEST_PROTOCOL)
+    return path
+
+
+def _read_run(path: str) -> Iterator[dict]:
+    with open(path, "rb") as f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+
+
+def _merge_runs(paths: List[str], sort_key: EntrySortKey) -> Iterator[dict]:
+    return heapq.merge(*[_read_run(path) for path in paths], key=sort_key)
+
+
+def sort_entries(entries: Iterable[dict], sort_key: EntrySortKey, run_size: int = DEFAULT_RUN_SIZE,
+                 fan_in: int = DEFAULT_FAN_IN) -> Iterator[dict]:
+    """
+    Sorts the entries (stable) by an external merge sort, at most run_size entries are held in memory. If there are
+    more entries, sorted runs of run_size entries are written to temporary files and merged (at most fan_in files at
+    once). The entries are consumed lazily and the sorted entries are yielded one by one.
+    """
+    run = []
+    with tempfile.TemporaryDirectory(prefix="bibhelper-sort-") as directory:
+        paths = []
+        for bib_entry in entries:
+            run.append(bib_entry)
+            if len(run) >= run_size:
+                run.sort(key=sort_key)
+                paths.append(_write_run(run, directory))
+                run = []
+        run.sort(key=sort_key)
+        if not paths:
+            yield from run
+            return
+        paths.append(_write_run(run, directory))
+        run = []
+
+        # Consecutive runs are merged, so entries with the same key keep their order
+        while len(paths) > fan_in:
+            logger.info("Merging {} sorted runs into {}.".format(len(paths), -(-len(paths) // fan_in)))
+            merged_paths = []
+            for i in range(0, len(paths), fan_in):
+                merged_paths.append(_write_run(_merge_runs(paths[i:i + fan_in], sort_key), directory))
+                for path in paths[i:i + fan_in]:
+                    os.remove(path)
+            paths = merged_paths
+        logger.info("Merging {} sorted runs.".format(len(paths)))
+        yield from _merge_runs(paths, sort_key)
@@ -0,0 +1,94 @@
+import copy
+import io
+import json
+import os
+import unittest
+
+from bibhelper import beautify
+from bibhelper import config
+
+TESTS_DIRECTORY = os.path.dirname(os.path.realpath(__file__))
+REFERENCES_FILE = os.path.join(TESTS_DIRECTORY, "resources", "references.bib")
+CONFIG_FILE = os.path.join(TESTS_DIRECTORY, "..", "resources", "latex_bib_helper_config.json")
+
+
+def load_default_config():
+    with open(CONFIG_FILE, "r") as f:
+        config.set_config(json.load(f))
+
+
+def beautify_whole(content, curlify, pretty):
+    bib_database = beautify.create_parser().parse(content)
+    return beautify.style(bib_database, curlify, pretty)
+
+
+class TestBeautifyStream(unittest.TestCase):
+
+    def setUp(self):
+        load_default_config()
+        with open(REFERENCES_FILE, "r", encoding="UTF-8") as f:
+            self.content = f.read()
+
+    def _check(self, content, curlify, pretty):
+        expected = beautify_whole(content, curlify, pretty)
+
+        output_file = io.StringIO()
+        beautify.beautify_stream(io.StringIO(content), output_file, curlify, pretty)
+        self.assertEqual(expected, output_file.getvalue())
+
+    def test_plain(self):
+        self._check(self.content, False, False)
+
+    def test_curlify(self):
+        self._check(self.content, True, False)
+
+    def test_pretty(self):
+        self._check(self.content, False, True)
+
+    def test_curlify_pretty(self):
+        self._check(self.content, True, True)
+
+    def test_unsorted(self):
+        json_config = copy.deepcopy(config.get_config())
+        json_config["style"]["sort"] = False
+        config.set_config(json_config)
+        self._check(self.content, True, True)
+
+    def test_header_only(self):
+        output_file = io.StringIO()
+        beautify.beautify_stream(io.StringIO("% Just a comment\n@string{a = {b}}\n"), output_file, True, True)
+        self.assertEqual("@comment{% Just a comment}\n\n@string{a = {b}}\n\n", output_file.getvalue())
+
+    def test_output_file(self):
+        expected = beautify_whole(self.content, True, True)
+        output_file = io.StringIO()
+        beautify.beautify(self.content, True, False, True, output_file)
+        self.assertEqual(expected, output_file.getvalue())
+
+
+class TestBeautifyJobs(unittest.TestCase):
+
+    def setUp(self):
+        load_default_config()
+        with open(REFERENCES_FILE, "r", encoding="UTF-8") as f:
+            self.content = f.read()
+
+    def tearDown(self):
+        load_default_config()
+
+    def test_same_as_serial(self):
+        expected = beautify_whole(self.content, True, True)
+        self.assertEqual(expected, beautify.style_parallel(self.content, True, True, 3))
+
+    def test_strings_and_sorted(self):
+        content = "@comment{First}\n\n@string{ieee = {IEEE}}\n\n" + self.content + \
+            "\n@preamble{\"Last\"}\n@string{acm = {ACM}}\n@misc{z, title = {Z}, publisher = acm # ieee}\n"
+        json_config = copy.deepcopy(config.get_config())
+        json_config["style"]["sortEntries"] = ["-year", "author"]
+        config.set_config(json_config)
+        expected = beautify_whole(content, True, True)
+        self.assertEqual(expected, beautify.style_parallel(content, True, True, 4))
+
+
+if __name__ == '__main__':
+    unittest.main()
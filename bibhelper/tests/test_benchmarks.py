@@ -0,0 +1,73 @@
+import json
+import random
+import time
+import unittest
+import urllib.request
+from dataclasses import replace
+
+from bibhelper import bibtex_parser
+from bibhelper import config
+from bibhelper.benchmarks import bench_suite
+from bibhelper.benchmarks import generator
+from bibhelper.benchmarks.dblp_server import DBLPServer
+
+
+class TestGenerator(unittest.TestCase):
+
+    def _parse(self, content):
+        return bibtex_parser.create_parser(bibtex_parser.FAST).parse(content).entries
+
+    def test_deterministic(self):
+        self.assertEqual(generator.generate_bibtex(50), generator.generate_bibtex(50))
+        self.assertNotEqual(generator.generate_bibtex(50), generator.generate_bibtex(50, seed=1))
+        self.assertEqual(50, len(self._parse(generator.generate_bibtex(50))))
+
+    def test_options(self):
+        booktitles = ("Proceedings of the Workshop, {WS} 2021",)
+        options = replace(generator.DEFAULT_OPTIONS, entry_types=("article", "inproceedings"),
+                          entry_type_weights=(0, 1), hidden_collisions=1, booktitles=booktitles)
+        entries = self._parse(generator.generate_bibtex(20, hide_prefix="-", options=options))
+        self.assertEqual({"inproceedings"}, {bib_entry["ENTRYTYPE"] for bib_entry in entries})
+        self.assertTrue(all("-doi" in bib_entry for bib_entry in entries))
+        self.assertEqual({"Proceedings of the Workshop, {WS} 2021"}, {bib_entry["booktitle"] for bib_entry in entries})
+
+    def test_booktitle_patterns(self):
+        rng = random.Random(0)
+        for pattern in generator.BOOKTITLE_PATTERNS:
+            options = replace(generator.DEFAULT_OPTIONS, booktitle_patterns=(pattern,))
+            self.assertNotIn("{year", generator._booktitle(rng, 2021, options))
+
+    def test_titles(self):
+        self.assertEqual(generator.generate_titles(5), generator.generate_titles(5))
+        self.assertEqual(5, len(set(generator.generate_titles(5))))
+
+
+class TestDBLPServer(unittest.TestCase):
+
+    def test_latency(self):
+        with DBLPServer(latency=0.1) as server:
+            start = time.perf_counter()
+            with urllib.request.urlopen(server.publication_url.format("Josch")) as response:
+                self.assertEqual(0, int(json.load(response)["result"]["hits"]["@total"]))
+            self.assertGreaterEqual(time.perf_counter() - start, 0.1)
+
+
+class TestSuite(unittest.TestCase):
+
+    def test_run_suite(self):
+        with open(bench_suite.CONFIG_FILE, "r") as f:
+            json_config = json.load(f)
+        try:
+            results = bench_suite.run_suite(entries=20, repeat=2, titles=2, latency=0)
+        finally:
+            config.set_config(json_config)
+        self.assertEqual({"parse", "parse_bibtexparser", "transform", "write", "style", "create_attributes_order",
+                          "extract_booktitle_shortname", "find"}, set(results["results"]))
+        self.assertEqual(2, len(results["results"]["find"]["durations"]))
+        self.assertEqual(20, results["results"]["parse"]["items"])
+        # The results are JSON serializable
+        self.assertEqual(results, json.loads(json.dumps(results)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,5 @@
+import random
+import re
 import unittest
 
 try:
@@ -72,6 +74,86 @@ class TestCreateAttributeOrder(unittest.TestCase):
         result = bibtex_handler.create_attributes_order(current_attributes, plain_attributes_order, "_")
         self._check(expected, result)
 
+    def test_literal_prefix(self):
+        current_attributes = ["..a", "a", ".b", "b", "c"]
+        expected = ["b", ".b", "a", "..a"]
+        for hide_prefix in [".", "*", "+"]:
+            current = [attribute.replace(".", hide_prefix) for attribute in current_attributes]
+            result = bibtex_handler.create_attributes_order(current, ["b", "a"], hide_prefix)
+            self._check([attribute.replace(".", hide_prefix) for attribute in expected], result)
+
+    def test_multi_character_prefix(self):
+        current_attributes = ["a", "--a", "----a", "-a"]
+        expected = ["a", "--a", "----a"]
+        self._check(expected, bibtex_handler.create_attributes_order(current_attributes, ["a"], "--"))
+
+    def test_empty_prefix(self):
+        self._check(["b", "a"], bibtex_handler.create_attributes_order(["a", "_a", "b"], ["b", "a"], ""))
+
+
+def _reference_attributes_order(current_attributes, plain_attributes_order, hide_prefix):
+    """
+    The previous implementation of create_attributes_order, with the hide prefix escaped.
+    """
+    existing_attributes_to_order = {}
+    for current_attribute in current_attributes:
+        plain_attribute = re.sub("^(?:{})*".format(re.escape(hide_prefix)), "", current_attribute)
+        if plain_attribute in plain_attributes_order:
+            existing_attributes_to_order.setdefault(plain_attribute, []).append(current_attribute)
+
+    final_order = []
+    for plain_attribute_order in plain_attributes_order:
+        if plain_attribute_order in existing_attributes_to_order:
+            final_order.extend(reversed(sorted(existing_attributes_to_order[plain_attribute_order])))
+    return final_order
+
+
+class TestAttributesOrderProperties(unittest.TestCase):
+    """
+    Compares the order to the previous implementation for random attributes and hide prefixes.
+    """
+    ALPHABET = "abcAB_-.*0"
+    RUNS = 2000
+
+    def setUp(self):
+        self.random = random.Random(42)
+
+    def _random_name(self, hide_prefix):
+        plain = "".join(self.random.choice(self.ALPHABET) for _ in range(self.random.randint(1, 3)))
+        return hide_prefix * self.random.randint(0, 3) + plain
+
+    def _random_case(self):
+        hide_prefix = "".join(self.random.choice(self.ALPHABET) for _ in range(self.random.randint(1, 2)))
+        plain_attributes_order = list(dict.fromkeys(self._random_name("") for _ in range(self.random.randint(0, 8))))
+        # Attributes derived from the order (with prefixes) and random attributes
+        current_attributes = [hide_prefix * self.random.randint(0, 3) + self.random.choice(plain_attributes_order)
+                              for _ in range(self.random.randint(0, 8)) if plain_attributes_order]
+        current_attributes += [self._random_name(hide_prefix) for _ in range(self.random.randint(0, 8))]
+        return list(dict.fromkeys(current_attributes)), plain_attributes_order, hide_prefix
+
+    def test_same_as_reference(self):
+        for _ in range(self.RUNS):
+            current_attributes, plain_attributes_order, hide_prefix = self._random_case()
+            self.random.shuffle(current_attributes)
+            expected = _reference_attributes_order(current_attributes, plain_attributes_order, hide_prefix)
+            result = bibtex_handler.create_attributes_order(current_attributes, plain_attributes_order, hide_prefix)
+            self.assertEqual(expected, result, (current_attributes, plain_attributes_order, hide_prefix))
+
+    def test_cached_same_as_uncached(self):
+        for _ in range(self.RUNS // 10):
+            current_attributes, plain_attributes_order, hide_prefix = self._random_case()
+            attributes_order = bibtex_handler.AttributesOrder(plain_attributes_order, hide_prefix)
+            expected = attributes_order.create(current_attributes)
+            for _ in range(3):
+                # Cached for any order of the same attributes
+                self.random.shuffle(current_attributes)
+                self.assertEqual(expected, attributes_order(current_attributes))
+
+    def test_cache_returns_copies(self):
+        attributes_order = bibtex_handler.AttributesOrder(["a", "b"], "_")
+        attributes_order(["a", "b"]).append("c")
+        self.assertEqual(["a", "b"], attributes_order(["b", "a"]))
+
 
 class TestHideAttributes(unittest.TestCase):
 
@@ -123,3 +205,50 @@ class TestHideAttributes(unittest.TestCase):
                     "_b": 6}
         bibtex_handler.hide_attributes(bib_entry, attributes_to_hide, "_")
         self._check(expected, bib_entry)
+
+
+class TestAddAttribute(unittest.TestCase):
+
+    def test_add_attribute(self):
+        bib_entry = {"doi": "a", "_doi": "b"}
+        bibtex_handler.add_attribute(bib_entry, "doi", "b", "_")
+        self.assertEqual({"doi": "a", "_doi": "b"}, bib_entry)
+        bibtex_handler.add_attribute(bib_entry, "doi", "c", "_")
+        self.assertEqual({"doi": "a", "_doi": "b", "__doi": "c"}, bib_entry)
+        bibtex_handler.add_attribute(bib_entry, "pages", "1--2", "_")
+        self.assertEqual("1--2", bib_entry["pages"])
+
+
+class TestSplitEntries(unittest.TestCase):
+
+    def _check(self, lines, expected):
+        result = list(bibtex_handler.split_entries(lines))
+        self.assertListEqual(expected, result)
+        self.assertEqual("".join(lines), "".join(result))
+
+    def test_single(self):
+        self._check(["@article{a,\n", "  title = {T}\n", "}\n"],
+                    ["@article{a,\n  title = {T}\n}", "\n"])
+
+    def test_multiple_per_line(self):
+        self._check(["@misc{a} @misc{b}"],
+                    ["@misc{a}", " @misc{b}"])
+
+    def test_nested_braces(self):
+        self._check(["@article{a, title = {{Hello} {W}orld}}\n", "@misc{b}"],
+                    ["@article{a, title = {{Hello} {W}orld}}", "\n@misc{b}"])
+
+    def test_parentheses(self):
+        self._check(["@article(a,\n", "  journal = {The (Very) Long)}\n", ")\n"],
+                    ["@article(a,\n  journal = {The (Very) Long)}\n)", "\n"])
+
+    def test_leading_text(self):
+        self._check(["% comment\n", "@string{x = {y}}\n", "trailing\n"],
+                    ["% comment\n@string{x = {y}}", "\ntrailing\n"])
+
+    def test_multi_line_values(self):
+        self._check(["@article{a,\n", "  title = {{A\n", "    Title}\n", "  } }\n", "@misc(b, x = {\n", "{y}\n", "})"],
+                    ["@article{a,\n  title = {{A\n    Title}\n  } }", "\n@misc(b, x = {\n{y}\n})"])
+
+    def test_empty(self):
+        self._check([], [])
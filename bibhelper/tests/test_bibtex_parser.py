@@ -0,0 +1,126 @@
+import logging
+import os
+import random
+import unittest
+
+from bibhelper import bibtex_parser
+from bibhelper.benchmarks.generator import generate_bibtex
+from bibtexparser.bibdatabase import BibDataString, BibDataStringExpression
+
+TESTS_DIRECTORY = os.path.dirname(os.path.realpath(__file__))
+REFERENCES_FILE = os.path.join(TESTS_DIRECTORY, "resources", "references.bib")
+
+# Fragments of (mostly malformed) BibTeX, randomly concatenated to compare the parsers on unusual input
+FRAGMENTS = ["@misc{", "@article(", "@ misc {", "@STRING{", "@string(", "@preamble{", "@comment", "@Comment{", "@",
+             "k,", "key1,", " a = ", "title=", "Title =", "{x}", "{", "}", "(", ")", '"', '"q"', "#", " # ", "jan",
+             "foo", "2020", "\n", "\r\n", "\n  ", "\t", " ", "% c\n", ",", "=", "{a {b} c}", '"a {"} b"', "ü",
+             "_", "$", "-", ":", "@string{foo = {bar}}\n", "@misc{k, a = foo # {x}, b = 1,}\n"]
+
+
+def normalize(bib_database):
+    def normalize_preamble(preamble):
+        if isinstance(preamble, BibDataStringExpression):
+            return [("name", part.name) if isinstance(part, BibDataString) else ("str", part)
+                    for part in preamble.expr]
+        return preamble
+
+    return ([list(bib_entry.items()) for bib_entry in bib_database.entries],
+            list(bib_database.comments),
+            list(bib_database.strings.items()),
+            [normalize_preamble(preamble) for preamble in bib_database.preambles])
+
+
+def parse(backend, content):
+    try:
+        return normalize(bibtex_parser.create_parser(backend).parse(content))
+    except Exception as e:
+        return type(e).__name__, str(e)
+
+
+class TestBibtexParser(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # bibtexparser logs every malformed entry
+        logging.disable(logging.CRITICAL)
+
+    @classmethod
+    def tearDownClass(cls):
+        logging.disable(logging.NOTSET)
+
+    def assert_same(self, content):
+        expected = parse(bibtex_parser.BIBTEXPARSER, content)
+        self.assertEqual(expected, parse(bibtex_parser.FAST, content), repr(content))
+        return expected
+
+    def test_references(self):
+        with open(REFERENCES_FILE, "r", encoding="UTF-8") as f:
+            content = f.read()
+        entries = self.assert_same(content)[0]
+        self.assertGreater(len(entries), 0)
+
+    def test_generated(self):
+        entries = self.assert_same(generate_bibtex(200))[0]
+        self.assertEqual(200, len(entries))
+
+    def test_entry(self):
+        entries = self.assert_same("@InProceedings{DBLP:conf/x/Y20,\n  Title = {A {Nested} Title},\n"
+                                   "  year = 2020,\n  author = \"A and {B \"C\"}\",\n}\n")[0]
+        self.assertEqual({"title": "A {Nested} Title", "year": "2020", "author": 'A and {B "C"}',
+                          "ENTRYTYPE": "inproceedings", "ID": "DBLP:conf/x/Y20"}, dict(entries[0]))
+
+    def test_parentheses(self):
+        self.assert_same("@misc(key, title = {x})")
+
+    def test_duplicate_fields(self):
+        entries = self.assert_same("@misc{key, title = {first}, TITLE = {second}, note = {n}}")[0]
+        self.assertEqual("first", dict(entries[0])["title"])
+
+    def test_whitespace(self):
+        self.assert_same("﻿@misc{key,\r\n\ttitle = {multi\r\n\t  line},\r\n\tnote\t= {a\tb}}")
+        self.assert_same("@misc{key, title = {multi\n     line}, note = {}, empty = {{}}}")
+
+    def test_strings(self):
+        self.assert_same("@string{foo = {Foo}}\n@STRING(Bar = \"Bar\" # foo)\n"
+                         "@misc{key, title = foo # { and } # bar, month = jan}")
+        self.assert_same("@string{foo = {first}}\n@string{foo = {second}}\n@misc{key, title = foo}")
+
+    def test_undefined_string(self):
+        self.assertEqual("UndefinedString", self.assert_same("@misc{key, title = undefined}")[0])
+
+    def test_preambles(self):
+        preambles = self.assert_same("@preamble{{\\newcommand{\\x}{x}}}\n@string{foo = {Foo}}\n"
+                                     "@preamble(foo # \"bar\")")[3]
+        self.assertEqual(2, len(preambles))
+
+    def test_comments(self):
+        comments = self.assert_same("% comment\nsome text\n@comment{braced {comment}}\n@Comment free text\n"
+                                    "@misc{key, title = {x}}\ntrailing text\n\n")[1]
+        self.assertGreater(len(comments), 0)
+
+    def test_malformed(self):
+        self.assert_same("@misc{key title = {x}}\n@misc{key, title = {x}\n@misc{key, title = {x}}")
+        self.assert_same("@misc{, title = {x}}\n@misc{key,}\n@misc{key, title = }\n@string{foo}\n@preamble{}")
+        self.assert_same("@misc{key, title = {unclosed}\n@article{next, title = {y}}")
+
+    def test_random_fragments(self):
+        rng = random.Random(0)
+        for _ in range(500):
+            self.assert_same("".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(1, 25))))
+
+    def test_multiple_parse(self):
+        parser = bibtex_parser.create_parser(bibtex_parser.FAST)
+        parser.parse("@string{foo = {Foo}}\n@misc{a, title = {x}}")
+        bib_database = parser.parse("@misc{b, title = foo}")
+        self.assertEqual(["a", "b"], [bib_entry["ID"] for bib_entry in bib_database.entries])
+        self.assertEqual("Foo", bib_database.entries[1]["title"])
+
+    def test_create_parser(self):
+        self.assertIsInstance(bibtex_parser.create_parser(bibtex_parser.FAST), bibtex_parser.FastParser)
+        self.assertNotIsInstance(bibtex_parser.create_parser(bibtex_parser.BIBTEXPARSER), bibtex_parser.FastParser)
+        with self.assertRaises(ValueError):
+            bibtex_parser.create_parser("unknown")
+
+
+if __name__ == '__main__':
+    unittest.main()
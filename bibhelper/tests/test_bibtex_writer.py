@@ -0,0 +1,117 @@
+import json
+import os
+import tempfile
+import unittest
+
+from bibhelper import beautify
+from bibhelper import bibtex_parser
+from bibhelper import bibtex_writer
+from bibhelper import config
+from bibhelper.benchmarks.generator import generate_bibtex
+from bibhelper.handler import bibtex_handler
+from bibtexparser.bparser import BibTexParser
+from bibtexparser.bwriter import BibTexWriter
+
+TESTS_DIRECTORY = os.path.dirname(os.path.realpath(__file__))
+CONFIG_FILE = os.path.join(TESTS_DIRECTORY, "..", "resources", "latex_bib_helper_config.json")
+REFERENCES_FILE = os.path.join(TESTS_DIRECTORY, "resources", "references.bib")
+
+
+def write_reference(bib_database, display_order=(), align_values=True):
+    writer = BibTexWriter()
+    bibtex_handler.apply_bibtex_writer_style(writer)
+    writer.display_order = list(display_order)
+    writer.align_values = align_values
+    return writer.write(bib_database)
+
+
+class TestFastWriter(unittest.TestCase):
+
+    def setUp(self):
+        with open(CONFIG_FILE, "r") as f:
+            config.set_config(json.load(f))
+        with open(REFERENCES_FILE, "r", encoding="UTF-8") as f:
+            self.content = f.read()
+
+    def assert_identical(self, bib_database, display_order=(), align_values=True):
+        expected = write_reference(bib_database, display_order, align_values)
+        writer = bibtex_writer.FastWriter(display_order, align_values)
+        self.assertEqual(expected, writer.write(bib_database))
+
+    def test_references(self):
+        bib_database = bibtex_parser.create_parser().parse(self.content)
+        self.assert_identical(bib_database)
+
+    def test_styled(self):
+        for curlify, pretty in [(False, False), (True, False), (False, True), (True, True)]:
+            bib_database = bibtex_parser.create_parser().parse(self.content)
+            bib_database.entries = beautify.transform_entries(bib_database.entries, curlify, pretty)
+            all_attributes = {attribute for bib_entry in bib_database.entries for attribute in bib_entry}
+            self.assert_identical(bib_database, config.get_style().attributes_order(all_attributes))
+
+    def test_generated(self):
+        bib_database = bibtex_parser.create_parser().parse(generate_bibtex(300))
+        self.assert_identical(bib_database, ["author", "title", "_doi", "year"])
+        self.assert_identical(bib_database, ["title"], align_values=20)
+        self.assert_identical(bib_database, ["title"], align_values=0)
+
+    def test_strings_preambles_comments(self):
+        content = ("% comment\n@comment{explicit}\n@preamble{\"\\newcommand{\\x}{x}\"}\n@string{foo = {Foo}}\n"
+                   "@string{jan = {Januar}}\n@preamble(foo # {bar})\n@misc{key, title = foo, month = jan}")
+        self.assert_identical(bibtex_parser.create_parser().parse(content))
+
+    def test_string_expressions(self):
+        # Without interpolation, values are strings and expressions of strings
+        parser = BibTexParser(interpolate_strings=False, common_strings=True)
+        bib_database = parser.parse("@string{foo = {Foo} # jan}\n"
+                                    "@misc{key, title = foo # { and } # {Bar}, month = jan}")
+        self.assert_identical(bib_database)
+
+    def test_no_entries(self):
+        bib_database = bibtex_parser.create_parser().parse("% only a comment")
+        self.assertEqual("@comment{% only a comment}\n\n", bibtex_writer.FastWriter().write(bib_database))
+
+    def test_file_descriptor(self):
+        bib_database = bibtex_parser.create_parser().parse(self.content)
+        with tempfile.TemporaryFile("w+", encoding="UTF-8") as f:
+            bibtex_writer.FastWriter().dump(bib_database, f.fileno())
+            f.seek(0)
+            self.assertEqual(write_reference(bib_database), f.read())
+
+    def test_contents(self):
+        bib_database = bibtex_parser.create_parser().parse(self.content)
+        writer = bibtex_writer.FastWriter()
+        writer.contents = ["entries"]
+        self.assertTrue(writer.write(bib_database).startswith("@"))
+        writer.contents = ["unknown"]
+        with self.assertRaises(ValueError):
+            writer.write(bib_database)
+
+    def test_display_order_changes(self):
+        bib_database = bibtex_parser.create_parser().parse(self.content)
+        writer = bibtex_writer.FastWriter()
+        for display_order in (["title", "author"], ["author"], ["title", "author"]):
+            writer.display_order = display_order
+            expected = write_reference(bib_database, display_order)
+            self.assertEqual(expected, writer.write(bib_database))
+        # The layouts of all orders are kept
+        self.assertEqual({("title", "author"), ("author",)}, {key[0] for key in writer._layouts})
+
+    def test_align(self):
+        bib_database = bibtex_parser.create_parser().parse(self.content)
+        writer = bibtex_writer.FastWriter(["title"])
+        field_width = bibtex_writer.get_field_width(bib_database.entries)
+        expected = "\n".join(writer.entry_to_bibtex(bib_entry, field_width) for bib_entry in bib_database.entries)
+        unaligned = "\n".join(writer.entry_to_bibtex(bib_entry, None) for bib_entry in bib_database.entries)
+        self.assertIn(bibtex_writer.ALIGN_MARKER, unaligned)
+        self.assertEqual(expected, bibtex_writer.align(unaligned, field_width))
+
+    def test_not_a_string(self):
+        bib_database = bibtex_parser.create_parser().parse("@misc{key, year = 2020}")
+        bib_database.entries[0]["year"] = 2020
+        with self.assertRaises(TypeError):
+            bibtex_writer.FastWriter().write(bib_database)
+
+
+if __name__ == '__main__':
+    unittest.main()
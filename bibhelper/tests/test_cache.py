@@ -0,0 +1,115 @@
+import json
+import os
+import tempfile
+import unittest
+
+from bibhelper import cache
+from bibhelper import config
+from bibhelper import find
+from bibhelper.benchmarks.dblp_server import DBLPServer
+
+CONFIG_FILE = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "resources",
+                           "latex_bib_helper_config.json")
+
+
+class TestNormalizeUrl(unittest.TestCase):
+
+    def test_query_order_and_whitespace(self):
+        self.assertEqual(cache.normalize_url("http://dblp.org/search/publ/api?q=Tail  Latencies&format=json"),
+                         cache.normalize_url("HTTP://DBLP.org/search/publ/api?format=json&q=Tail%20Latencies"))
+
+    def test_different_queries(self):
+        self.assertNotEqual(cache.normalize_url("http://dblp.org/search/publ/api?q=Tail"),
+                            cache.normalize_url("http://dblp.org/search/publ/api?q=Latencies"))
+
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "bibhelper", cache.CACHE_FILE_NAME)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_hit_miss(self):
+        response_cache = cache.ResponseCache(self.path, 60, 1024)
+        self.assertIsNone(response_cache.get("http://a.org/x.bib"))
+        response_cache.put("http://a.org/x.bib", b"content")
+        self.assertEqual(b"content", response_cache.get("http://A.org/x.bib"))
+        self.assertEqual((1, 1), (response_cache.hits, response_cache.misses))
+        response_cache.close()
+
+    def test_persistent(self):
+        response_cache = cache.ResponseCache(self.path, 60, 1024)
+        response_cache.put("http://a.org/x.bib", b"content")
+        response_cache.close()
+
+        response_cache = cache.ResponseCache(self.path, 60, 1024)
+        self.assertEqual(b"content", response_cache.get("http://a.org/x.bib"))
+        response_cache.close()
+
+    def test_ttl(self):
+        response_cache = cache.ResponseCache(self.path, 0, 1024)
+        response_cache.put("http://a.org/x.bib", b"content")
+        self.assertIsNone(response_cache.get("http://a.org/x.bib"))
+        response_cache.close()
+
+    def test_lru_eviction(self):
+        response_cache = cache.ResponseCache(self.path, 60, 10, access_resolution=0)
+        response_cache.put("http://a.org/1", b"1234")
+        response_cache.put("http://a.org/2", b"1234")
+        # Access 1, so 2 is the least recently used entry
+        response_cache.get("http://a.org/1")
+        response_cache.put("http://a.org/3", b"1234")
+
+        self.assertIsNotNone(response_cache.get("http://a.org/1"))
+        self.assertIsNone(response_cache.get("http://a.org/2"))
+        self.assertIsNotNone(response_cache.get("http://a.org/3"))
+        response_cache.close()
+
+    def test_access_resolution(self):
+        response_cache = cache.ResponseCache(self.path, 60, 1024)
+        response_cache.put("http://a.org/1", b"1234")
+        changes = response_cache._connection.total_changes
+        # Hits of a recently accessed entry do not write
+        for _ in range(3):
+            self.assertEqual(b"1234", response_cache.get("http://a.org/1"))
+        self.assertEqual(changes, response_cache._connection.total_changes)
+        self.assertIsNone(response_cache.get("http://a.org/2"))
+        self.assertEqual(changes, response_cache._connection.total_changes)
+
+        response_cache.access_resolution = 0
+        response_cache.get("http://a.org/1")
+        self.assertEqual(changes + 1, response_cache._connection.total_changes)
+        response_cache.close()
+
+
+class TestFetch(unittest.TestCase):
+
+    def setUp(self):
+        with open(CONFIG_FILE, "r") as f:
+            config.set_config(json.load(f))
+
+    def tearDown(self):
+        cache.get_cache().close()
+        cache.set_cache(None)
+
+    def test_cached_fetch(self):
+        with DBLPServer() as server:
+            server.add_publication("conf/icde/FruthDS21", "Josch: Managing Schemas for NoSQL Document Stores.")
+            url = server.publication_url.format("Josch")
+
+            cache.set_cache(cache.ResponseCache(":memory:", 60, 1024 * 1024))
+            first = find.load_publications(url)
+            second = find.load_publications(url)
+            self.assertEqual(first[0].key, second[0].key)
+            self.assertEqual(1, len(server.requests))
+
+            cache.set_cache(cache.get_cache(), refresh=True)
+            find.load_publications(url)
+            self.assertEqual(2, len(server.requests))
+
+
+if __name__ == '__main__':
+    unittest.main()
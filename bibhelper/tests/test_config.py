@@ -0,0 +1,52 @@
+import copy
+import dataclasses
+import json
+import os
+import unittest
+
+from bibhelper import config
+
+TESTS_DIRECTORY = os.path.dirname(os.path.realpath(__file__))
+CONFIG_FILE = os.path.join(TESTS_DIRECTORY, "..", "resources", "latex_bib_helper_config.json")
+
+
+class TestStyle(unittest.TestCase):
+
+    def setUp(self):
+        with open(CONFIG_FILE, "r") as f:
+            self.json_config = json.load(f)
+        config.set_config(self.json_config)
+
+    def test_compiled(self):
+        style = config.get_style()
+        self.assertEqual("_", style.hide_prefix)
+        self.assertTrue(style.sort)
+        self.assertTrue(style.rewrite_booktitle)
+        self.assertEqual("Proc.\\ {}", style.booktitle_template)
+        self.assertEqual(("editor", "series", "publisher", "month", "url", "doi", "eprint"),
+                         style.hidden_attribute_names)
+        self.assertEqual(("author", "editor", "title"), style.attribute_names[:3])
+        self.assertEqual(len(self.json_config["style"]["attributes"]), len(style.attribute_names))
+
+    def test_getters(self):
+        self.assertEqual(list(config.get_style().attribute_names), config.get_attribute_names())
+        self.assertEqual(list(config.get_style().hidden_attribute_names), config.get_attribute_names(hidden_only=True))
+        self.assertEqual("_", config.get_hide_prefix())
+        self.assertTrue(config.is_sort_attributes())
+        self.assertTrue(config.is_rewrite_booktitle())
+
+    def test_immutable(self):
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            config.get_style().hide_prefix = "-"
+
+    def test_set_config_compiles_style(self):
+        json_config = copy.deepcopy(self.json_config)
+        json_config["style"]["hidePrefix"] = "-"
+        json_config["style"]["rewriteBooktitle"]["rewrite"] = False
+        config.set_config(json_config)
+        self.assertEqual("-", config.get_style().hide_prefix)
+        self.assertFalse(config.get_style().rewrite_booktitle)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import io
+import json
+import os
+import random
+import unittest
+
+from bibhelper import config
+from bibhelper import dedupe
+from bibhelper.benchmarks.generator import WORDS
+
+TESTS_DIRECTORY = os.path.dirname(os.path.realpath(__file__))
+CONFIG_FILE = os.path.join(TESTS_DIRECTORY, "..", "resources", "latex_bib_helper_config.json")
+
+
+def create_entry(key, title, author="Michael Fruth and Stefanie Scherzinger", year="2021", **fields):
+    bib_entry = {"ENTRYTYPE": "inproceedings", "ID": key, "title": title, "author": author, "year": year}
+    bib_entry.update(fields)
+    return bib_entry
+
+
+class TestDedupe(unittest.TestCase):
+
+    def setUp(self):
+        with open(CONFIG_FILE, "r") as f:
+            config.set_config(json.load(f))
+        self.josch = create_entry("DBLP:conf/icde/FruthDS21", "Josch: Managing Schemas for NoSQL Document Stores",
+                                  doi="10.1109/ICDE51399.2021.00306")
+        self.other = create_entry("other", "Tail Latencies in Cloud Databases", author="Max Mustermann")
+
+    def _find(self, entries):
+        return [(cluster.indices, cluster.reasons) for cluster in dedupe.find_duplicates(entries, "_")]
+
+    def test_normalize_doi(self):
+        doi = "10.1109/icde51399.2021.00306"
+        self.assertEqual(doi, dedupe.normalize_doi("https://doi.org/10.1109/ICDE51399.2021.00306"))
+        self.assertEqual(doi, dedupe.normalize_doi("doi: 10.1109/ICDE51399.2021.00306"))
+
+    def test_no_duplicates(self):
+        self.assertEqual([], self._find([self.josch, self.other]))
+
+    def test_doi(self):
+        duplicate = create_entry("josch", "Schema Management", author="Someone Else", year="2000",
+                                 _doi="https://doi.org/10.1109/icde51399.2021.00306")
+        self.assertEqual([([0, 2], ["doi"])], self._find([self.josch, self.other, duplicate]))
+
+    def test_title(self):
+        duplicate = create_entry("josch", "{Josch}: Managing Schemas for {NoSQL} Document Stores.")
+        self.assertEqual([([0, 2], ["title"])], self._find([self.josch, self.other, duplicate]))
+
+    def test_same_title_distinct(self):
+        first = create_entry("ed2019", "Editorial", author="Max Mustermann", year="2019", journal="SIGMOD Record")
+        second = create_entry("ed2022", "Editorial", author="Erika Musterfrau", year="2022", journal="PVLDB")
+        self.assertEqual([], self._find([first, second]))
+        same_year = create_entry("ed2022", "Editorial", author="Erika Musterfrau", year="2019")
+        self.assertEqual([], self._find([first, same_year]))
+
+    def test_key(self):
+        duplicate = create_entry(self.josch["ID"], "Another Title")
+        self.assertEqual([([0, 1], ["key"])], self._find([self.josch, duplicate]))
+
+    def test_similar(self):
+        duplicate = create_entry("josch", "Josch: Managing Schema for NoSQL Document Store", author="Fruth, M.",
+                                 year="2022")
+        self.assertEqual([([0, 2], ["similar"])], self._find([self.josch, self.other, duplicate]))
+
+    def test_not_similar(self):
+        title = "Josch: Managing Schema for NoSQL Document Store"
+        other_author = create_entry("josch", title, author="Max Mustermann")
+        other_year = create_entry("josch", title, year="2015")
+        self.assertEqual([], self._find([self.josch, other_author]))
+        self.assertEqual([], self._find([self.josch, other_year]))
+
+    def test_transitive(self):
+        by_title = create_entry("a", self.josch["title"])
+        by_doi = create_entry("b", "Schema Management", doi=self.josch["doi"].lower())
+        self.assertEqual([([0, 1, 2], ["doi", "title"])], self._find([by_title, self.josch, by_doi]))
+
+    def test_blocking(self):
+        rng = random.Random(1)
+        entries = [create_entry("gen{}".format(i), " ".join(rng.sample(WORDS, 6))) for i in range(2000)]
+        for i in range(0, 2000, 100):
+            # Typo in the title and another key
+            entries.append(dict(entries[i], ID="copy{}".format(i), title=entries[i]["title"] + "s"))
+        clusters = self._find(entries)
+        for copy_index, i in enumerate(range(0, 2000, 100), 2000):
+            # Random titles might be duplicates by chance, but each copy must be found
+            self.assertTrue(any(i in indices and copy_index in indices for indices, _ in clusters))
+
+    def test_merge(self):
+        duplicate = create_entry("josch", self.josch["title"], year="2022", pages="1--4")
+        entries = dedupe.merge_clusters([self.josch, self.other, duplicate],
+                                        dedupe.find_duplicates([self.josch, self.other, duplicate], "_"), "_")
+        self.assertEqual([self.josch["ID"], "other"], [bib_entry["ID"] for bib_entry in entries])
+        self.assertEqual("2021", entries[0]["year"])
+        self.assertEqual("2022", entries[0]["_year"])
+        self.assertEqual("1--4", entries[0]["pages"])
+        self.assertNotIn("pages", self.josch)
+
+    def test_dedupe(self):
+        content = ("@inproceedings{a, title = {Josch: Managing Schemas for NoSQL Document Stores}, year = 2021}\n"
+                   "@inproceedings{b, title = {{Josch}: Managing Schemas for {NoSQL} Document Stores}, year = 2021}\n"
+                   "@misc{c, title = {Other}}\n")
+        report_file = io.StringIO()
+        output_file = io.StringIO()
+        dedupe.dedupe(content, output_file, report_file, True, False, False)
+        self.assertEqual("title\ta; b\tJosch: Managing Schemas for NoSQL Document Stores\n", report_file.getvalue())
+        self.assertIn("@inproceedings{a,", output_file.getvalue())
+        self.assertNotIn("@inproceedings{b,", output_file.getvalue())
+        self.assertIn("_title", output_file.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
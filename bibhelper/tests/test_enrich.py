@@ -0,0 +1,120 @@
+import io
+import json
+import os
+import unittest
+
+from bibhelper import beautify
+from bibhelper import config
+from bibhelper import enrich
+from bibhelper.benchmarks.dblp_server import DBLPServer
+
+CONFIG_FILE = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "resources",
+                           "latex_bib_helper_config.json")
+
+CONTENT = """@inproceedings{josch,
+    title = {Josch: Managing Schemas for {NoSQL} Document Stores},
+    year = {2021}
+}
+
+@inproceedings{hidden,
+    title = {Tell-Tale Tail Latencies: Pitfalls and Perils},
+    _doi = {10.1234/own},
+    year = {2019}
+}
+
+@inproceedings{preprint,
+    title = {Tail Latencies},
+    year = {2018}
+}
+
+@inproceedings{complete,
+    title = {Does not exist},
+    doi = {10.1234/complete},
+    pages = {1--2},
+    biburl = {https://example.org/complete.bib}
+}
+
+@misc{untitled,
+    note = {No title}
+}
+"""
+
+
+class TestEnrich(unittest.TestCase):
+
+    def setUp(self):
+        self.server = DBLPServer()
+        self.server.add_publication("conf/icde/FruthDS21", "Josch: Managing Schemas for NoSQL Document Stores.",
+                                    pages="2287-2290")
+        self.server.add_publication("conf/tpctc/A19", "Tell-Tale Tail Latencies: Pitfalls and Perils.", year="2019")
+        self.server.add_publication("conf/tpctc/C19", "Tail Latencies.", year="2019")
+        self.server.__enter__()
+
+        with open(CONFIG_FILE, "r") as f:
+            self.json_config = json.load(f)
+        self.json_config["settings"]["search"]["publicationUrl"] = self.server.publication_url
+        config.set_config(self.json_config)
+
+    def tearDown(self):
+        self.server.__exit__(None, None, None)
+
+    def _run(self, fields=None, workers=4):
+        output_file = io.StringIO()
+        report_file = io.StringIO()
+        results = enrich.enrich(CONTENT, output_file, report_file, fields, False, False, workers)
+        entries = beautify.create_parser().parse(output_file.getvalue()).entries
+        return results, {bib_entry["ID"]: bib_entry for bib_entry in entries}, report_file.getvalue()
+
+    def test_enrich(self):
+        results, entries, report = self._run()
+        self.assertEqual([("josch", enrich.ENRICHED), ("hidden", enrich.ENRICHED), ("preprint", enrich.NOT_FOUND)],
+                         [(result.key, result.status) for result in results])
+
+        self.assertEqual("10.0000/conf/icde/FruthDS21", entries["josch"]["doi"])
+        self.assertEqual("2287--2290", entries["josch"]["pages"])
+        self.assertEqual(self.server.url + "/rec/conf/icde/FruthDS21.bib", entries["josch"]["biburl"])
+        # The hidden DOI counts, only the missing fields are added
+        self.assertEqual("10.1234/own", entries["hidden"]["_doi"])
+        self.assertNotIn("doi", entries["hidden"])
+        self.assertNotIn("pages", entries["hidden"])
+        self.assertIn("biburl", entries["hidden"])
+        # Same title, but another year
+        self.assertNotIn("doi", entries["preprint"])
+        self.assertEqual({"ID", "ENTRYTYPE", "note"}, set(entries["untitled"]))
+
+        lines = report.splitlines()
+        self.assertEqual(3, len(lines))
+        self.assertEqual(["[1/3]", "[2/3]", "[3/3]"], [line.split("\t")[0] for line in lines])
+        self.assertIn("ENRICHED\tjosch\tdoi, pages, biburl (conf/icde/FruthDS21)", report)
+        # Three searches and two BibTeX entries, entries which lack no field are not searched
+        self.assertEqual(5, len(self.server.requests))
+
+    def test_fields(self):
+        self.json_config["settings"]["enrich"] = {"fields": ["pages"]}
+        config.set_config(self.json_config)
+        results, entries, _ = self._run()
+        self.assertEqual([("josch", enrich.ENRICHED), ("hidden", enrich.UNCHANGED), ("preprint", enrich.NOT_FOUND)],
+                         [(result.key, result.status) for result in results])
+        self.assertNotIn("doi", entries["josch"])
+
+        results, entries, _ = self._run(["doi"], workers=1)
+        self.assertEqual(["josch", "preprint"], [result.key for result in results])
+        self.assertIn("doi", entries["josch"])
+
+    def test_failures(self):
+        self.server.add_failures(404, count=20)
+        results, entries, report = self._run()
+        self.assertEqual([enrich.FAILED] * 3, [result.status for result in results])
+        self.assertNotIn("doi", entries["josch"])
+        self.assertIn("FAILED\tjosch\t", report)
+
+    def test_match_publication(self):
+        publications = [enrich.find.Publication("a", "", "Tail Latencies in the Cloud.", year="2019"),
+                        enrich.find.Publication("b", "", "Tail {L}atencies.", year="2019")]
+        self.assertEqual("b", enrich.match_publication("{Tail} Latencies", "2019", publications).key)
+        self.assertEqual("b", enrich.match_publication("Tail Latencies", None, publications).key)
+        self.assertIsNone(enrich.match_publication("Tail Latencies", "2020", publications))
+
+
+if __name__ == '__main__':
+    unittest.main()
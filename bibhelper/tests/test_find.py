@@ -0,0 +1,64 @@
+import dataclasses
+import json
+import unittest
+
+from bibhelper.find import Author, Publication
+
+HIT = {"info": {"authors": {"author": [{"@pid": "281/0000", "text": "Michael Fruth"},
+                                       {"@pid": "123/4567", "text": "Stefanie Scherzinger"}]},
+                "title": "Josch: Managing Schemas for NoSQL Document Stores.",
+                "venue": "ICDE",
+                "pages": "2693-2696",
+                "year": "2021",
+                "type": "Conference and Workshop Papers",
+                "key": "conf/icde/FruthDS21",
+                "doi": "10.1109/ICDE51399.2021.00306",
+                "ee": ["https://doi.org/10.1109/ICDE51399.2021.00306", "https://example.org"],
+                "url": "https://dblp.org/rec/conf/icde/FruthDS21"}}
+
+
+class TestPublication(unittest.TestCase):
+
+    def test_from_hit(self):
+        publication = Publication.from_hit(HIT)
+        self.assertEqual("conf/icde/FruthDS21", publication.key)
+        self.assertEqual("ICDE", publication.venue)
+        self.assertEqual((Author("281/0000", "Michael Fruth"), Author("123/4567", "Stefanie Scherzinger")),
+                         publication.authors)
+        self.assertEqual(("https://doi.org/10.1109/ICDE51399.2021.00306", "https://example.org"), publication.ee)
+        self.assertIsNone(publication.bib)
+
+    def test_single_author(self):
+        hit = {"info": dict(HIT["info"], authors={"author": {"@pid": "1", "text": "Max Mustermann"}})}
+        self.assertEqual((Author("1", "Max Mustermann"),), Publication.from_hit(hit).authors)
+
+    def test_no_authors(self):
+        hit = {"info": {key: value for key, value in HIT["info"].items() if key != "authors"}}
+        self.assertEqual((), Publication.from_hit(hit).authors)
+
+    def test_immutable(self):
+        publication = Publication.from_hit(HIT)
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            publication.title = "Other"
+        self.assertFalse(hasattr(publication, "__dict__"))
+        self.assertEqual(hash(publication), hash(Publication.from_hit(HIT)))
+
+    def test_interned(self):
+        venue = "".join(["IC", "DE"])
+        hit = {"info": dict(HIT["info"], venue=venue)}
+        self.assertIs(Publication.from_hit(HIT).venue, Publication.from_hit(hit).venue)
+
+    def test_serialization(self):
+        publication = Publication.from_hit(dict(HIT, bib="@inproceedings{...}"))
+        data = json.loads(json.dumps(publication.to_dict()))
+        self.assertNotIn("chapter", data)
+        self.assertEqual(publication, Publication.from_dict(data))
+
+    def test_str(self):
+        self.assertEqual("Title: Josch: Managing Schemas for NoSQL Document Stores.\n"
+                         "Authors: Michael Fruth, Stefanie Scherzinger\n"
+                         "ICDE (2021)", str(Publication.from_hit(HIT)))
+
+
+if __name__ == '__main__':
+    unittest.main()
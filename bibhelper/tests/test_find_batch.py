@@ -0,0 +1,88 @@
+import io
+import json
+import os
+import unittest
+from unittest import mock
+
+from bibhelper import config
+from bibhelper import find_batch
+from bibhelper import ranking
+from bibhelper.benchmarks.dblp_server import DBLPServer
+
+CONFIG_FILE = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "resources",
+                           "latex_bib_helper_config.json")
+
+
+class TestFindBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.server = DBLPServer()
+        self.server.add_publication("conf/icde/FruthDS21", "Josch: Managing Schemas for NoSQL Document Stores.")
+        self.server.add_publication("conf/tpctc/A19", "Tell-Tale Tail Latencies: Pitfalls and Perils.")
+        self.server.add_publication("conf/tpctc/B19", "Tail Latencies in the Cloud.")
+        self.server.add_publication("conf/tpctc/C19", "Tail Latencies.")
+        self.server.__enter__()
+
+        with open(CONFIG_FILE, "r") as f:
+            json_config = json.load(f)
+        json_config["settings"]["search"]["publicationUrl"] = self.server.publication_url
+        config.set_config(json_config)
+
+    def tearDown(self):
+        self.server.__exit__(None, None, None)
+
+    def _run(self, titles, curlify=False, pretty=False, workers=4, per_host=2):
+        output_file = io.StringIO()
+        report_file = io.StringIO()
+        results = find_batch.find_batch(titles, output_file, report_file, curlify, pretty, workers, per_host)
+        return results, output_file.getvalue(), report_file.getvalue()
+
+    def test_found(self):
+        results, output, report = self._run(["Josch Managing Schemas", "Pitfalls and Perils"])
+        self.assertListEqual([find_batch.FOUND, find_batch.FOUND], [r.status for r in results])
+        self.assertLess(output.index("DBLP:conf/icde/FruthDS21"), output.index("DBLP:conf/tpctc/A19"))
+        self.assertEqual("", report)
+
+    def test_exact_title_among_many(self):
+        results, output, _ = self._run(["Tail Latencies"])
+        self.assertEqual(find_batch.FOUND, results[0].status)
+        self.assertIn("DBLP:conf/tpctc/C19", output)
+
+    def test_scored_once(self):
+        with mock.patch.object(ranking, "score_titles", wraps=ranking.score_titles) as score_titles:
+            results, _, _ = self._run(["Tail Latencies", "Latencies"], workers=1)
+        self.assertListEqual([find_batch.FOUND, find_batch.AMBIGUOUS], [r.status for r in results])
+        self.assertEqual(2, score_titles.call_count)
+
+    def test_report(self):
+        results, output, report = self._run(["Tail Latencies Pitfalls", "Latencies", "Does not exist"])
+        self.assertListEqual([find_batch.FOUND, find_batch.AMBIGUOUS, find_batch.NOT_FOUND],
+                             [r.status for r in results])
+        lines = report.splitlines()
+        self.assertEqual(2, len(lines))
+        self.assertTrue(lines[0].startswith("AMBIGUOUS\tLatencies\t"))
+        self.assertTrue(lines[1].startswith("NOT_FOUND\tDoes not exist"))
+
+    def test_duplicates(self):
+        _, output, _ = self._run(["Josch", "Managing Schemas for NoSQL"])
+        self.assertEqual(1, output.count("@inproceedings"))
+
+    def test_pretty(self):
+        _, output, _ = self._run(["Josch", "Pitfalls"], curlify=True, pretty=True)
+        self.assertIn("{{Josch: Managing Schemas for NoSQL Document Stores}}", output)
+        self.assertIn("booktitle  = {Proc.\\ ICDE}", output)
+        self.assertIn("_doi", output)
+
+    def test_per_host_limit(self):
+        titles = ["Josch", "Pitfalls", "Tail Latencies", "Cloud"] * 5
+        self._run(titles, workers=8, per_host=2)
+        self.assertLessEqual(self.server.max_concurrent_requests, 2)
+        self.assertEqual(2 * len(titles), len(self.server.requests))
+
+    def test_read_titles(self):
+        titles = find_batch.read_titles(io.StringIO("Josch\n\n# comment\n  Tail Latencies  \n"))
+        self.assertListEqual(["Josch", "Tail Latencies"], titles)
+
+
+if __name__ == '__main__':
+    unittest.main()
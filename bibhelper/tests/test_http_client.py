@@ -0,0 +1,76 @@
+import time
+import unittest
+from email.utils import formatdate
+
+from bibhelper import http_client
+from bibhelper.benchmarks.dblp_server import DBLPServer
+
+
+class TestParseRetryAfter(unittest.TestCase):
+
+    def test_seconds(self):
+        self.assertEqual(120.0, http_client.parse_retry_after("120"))
+
+    def test_date(self):
+        delay = http_client.parse_retry_after(formatdate(time.time() + 100, usegmt=True))
+        self.assertTrue(95 <= delay <= 100)
+
+    def test_invalid(self):
+        self.assertIsNone(http_client.parse_retry_after("soon"))
+        self.assertIsNone(http_client.parse_retry_after(None))
+
+
+class TestClient(unittest.TestCase):
+
+    def setUp(self):
+        self.server = DBLPServer().__enter__()
+        self.server.add_publication("conf/icde/FruthDS21", "Josch: Managing Schemas for NoSQL Document Stores.")
+        self.url = self.server.url + "/rec/conf/icde/FruthDS21.bib"
+
+        self.delays = []
+        self.client = http_client.Client(retries=3, backoff_factor=0.5, max_backoff=10)
+        self.client.sleep = self.delays.append
+
+    def tearDown(self):
+        self.client.close()
+        self.server.__exit__(None, None, None)
+
+    def test_no_retry(self):
+        response = self.client.get(self.url)
+        self.assertEqual(200, response.status_code)
+        self.assertListEqual([], self.delays)
+
+    def test_exponential_backoff(self):
+        self.server.add_failures(503, count=3)
+        response = self.client.get(self.url)
+        self.assertEqual(200, response.status_code)
+        self.assertListEqual([0.5, 1.0, 2.0], self.delays)
+        self.assertEqual(4, len(self.server.requests))
+
+    def test_retry_after(self):
+        self.server.add_failures(429, retry_after=7)
+        self.server.add_failures(429, retry_after=3600)
+        response = self.client.get(self.url)
+        self.assertEqual(200, response.status_code)
+        self.assertListEqual([7.0, 10], self.delays)
+
+    def test_give_up(self):
+        self.server.add_failures(500, count=5)
+        response = self.client.get(self.url)
+        self.assertEqual(500, response.status_code)
+        self.assertEqual(4, len(self.server.requests))
+
+    def test_not_retried(self):
+        response = self.client.get(self.server.url + "/rec/unknown.bib")
+        self.assertEqual(404, response.status_code)
+        self.assertListEqual([], self.delays)
+
+    def test_connection_error(self):
+        self.server.__exit__(None, None, None)
+        with self.assertRaises(Exception):
+            self.client.get(self.url)
+        self.assertEqual(3, len(self.delays))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import copy
+import json
+import os
+import tempfile
+import unittest
+
+from bibhelper import beautify
+from bibhelper import config
+from bibhelper import incremental
+
+TESTS_DIRECTORY = os.path.dirname(os.path.realpath(__file__))
+REFERENCES_FILE = os.path.join(TESTS_DIRECTORY, "resources", "references.bib")
+CONFIG_FILE = os.path.join(TESTS_DIRECTORY, "..", "resources", "latex_bib_helper_config.json")
+
+
+class TestBeautifyIncremental(unittest.TestCase):
+
+    def setUp(self):
+        with open(CONFIG_FILE, "r") as f:
+            config.set_config(json.load(f))
+        with open(REFERENCES_FILE, "r", encoding="UTF-8") as f:
+            self.content = f.read()
+        self.directory = tempfile.TemporaryDirectory()
+        self.state_path = os.path.join(self.directory.name, "state.json")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _check(self, content, curlify=True, pretty=True):
+        bib_database = beautify.create_parser().parse(content)
+        expected = beautify.style(bib_database, curlify, pretty)
+        with self.assertLogs(incremental.logger, level="INFO") as logs:
+            result = incremental.beautify_incremental(content, self.state_path, curlify, pretty)
+        self.assertEqual(expected, result)
+        return [line for line in logs.output if "Formatted" in line][-1]
+
+    def test_first_run(self):
+        self.assertIn("Formatted 6 of 6 entries", self._check(self.content))
+
+    def test_unchanged(self):
+        self._check(self.content)
+        self.assertIn("Formatted 0 of 6 entries", self._check(self.content))
+
+    def test_changed_entry(self):
+        self._check(self.content)
+        content = self.content.replace("A Book about Mustermann", "A Book about Erika")
+        self.assertIn("Formatted 1 of 6 entries", self._check(content))
+
+    def test_added_and_removed_entry(self):
+        self._check(self.content)
+        content = self.content.replace("@misc{Example:misc", "@misc{Example:other")
+        content += "\n@misc{Example:new,\n  title = {New}\n}\n"
+        self.assertIn("Formatted 2 of 7 entries", self._check(content))
+
+    def test_changed_string(self):
+        self._check(self.content)
+        content = self.content.replace("Dallas, TX", "Houston, TX")
+        # Example:icde20 uses the string, the key DBLP:conf/icde/FruthDS21 only contains its name
+        self.assertIn("Formatted 2 of 6 entries", self._check(content))
+
+    def test_changed_comment(self):
+        self._check(self.content)
+        content = self.content.replace("written by hand", "written by a human")
+        self.assertIn("Formatted 0 of 6 entries", self._check(content))
+
+    def test_changed_width(self):
+        self._check(self.content)
+        content = self.content.replace("customfieldwithaverylongname", "short")
+        self.assertIn("Formatted 6 of 6 entries", self._check(content))
+
+    def test_changed_config(self):
+        self._check(self.content)
+        json_config = copy.deepcopy(config.get_config())
+        json_config["style"]["hidePrefix"] = "-"
+        config.set_config(json_config)
+        self.assertIn("Formatted 6 of 6 entries", self._check(self.content))
+
+    def test_changed_arguments(self):
+        self._check(self.content)
+        self.assertIn("Formatted 6 of 6 entries", self._check(self.content, curlify=False))
+
+    def test_corrupt_state(self):
+        with open(self.state_path, "w") as f:
+            f.write("{")
+        self.assertIn("Formatted 6 of 6 entries", self._check(self.content))
+
+    def test_default_state_path(self):
+        self.assertEqual(os.path.join("/tmp", ".references.bib.bibhelper-state.json"),
+                         incremental.get_default_state_path("/tmp/references.bib"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,170 @@
+import gzip
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from bibhelper import config
+from bibhelper import find
+from bibhelper import index
+
+TESTS_DIRECTORY = os.path.dirname(os.path.realpath(__file__))
+REFERENCES_FILE = os.path.join(TESTS_DIRECTORY, "resources", "references.bib")
+CONFIG_FILE = os.path.join(TESTS_DIRECTORY, "..", "resources", "latex_bib_helper_config.json")
+
+DBLP_XML = """<?xml version="1.0" encoding="ISO-8859-1"?>
+<!DOCTYPE dblp SYSTEM "dblp.dtd">
+<dblp>
+<inproceedings key="conf/icde/FruthDS21" mdate="2021-06-01">
+<author orcid="0000-0001-0000-0000">Michael Fruth</author>
+<author>Kai Dauberschmidt</author>
+<author>Stefanie Scherzinger</author>
+<title>Josch: Managing Schemas for NoSQL Document Stores.</title>
+<pages>2693-2696</pages>
+<year>2021</year>
+<booktitle>ICDE</booktitle>
+<ee>https://doi.org/10.1109/ICDE51399.2021.00306</ee>
+<crossref>conf/icde/2021</crossref>
+</inproceedings>
+<www key="homepages/f/MichaelFruth"><author>Michael Fruth</author><title>Home Page</title></www>
+<article key="journals/x/Muller20">
+<author>J&ouml;rg M&uuml;ller</author>
+<title>Schema Evolution in <i>NoSQL</i> Stores.</title>
+<journal>Datenbank-Spektrum</journal>
+<volume>20</volume>
+<year>2020</year>
+</article>
+</dblp>
+"""
+
+
+class TestIndex(unittest.TestCase):
+
+    def setUp(self):
+        # Reading BibTeX dumps uses the configured parser
+        with open(CONFIG_FILE, "r") as f:
+            config.set_config(json.load(f))
+        self.directory = tempfile.TemporaryDirectory()
+        self.index_directory = os.path.join(self.directory.name, "index")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _build(self, name, content, compress=False):
+        path = os.path.join(self.directory.name, name)
+        open_file = gzip.open if compress else open
+        with open_file(path, "wt", encoding="ISO-8859-1") as f:
+            f.write(content)
+        return index.build_index(path, self.index_directory)
+
+    def test_xml(self):
+        self.assertEqual(2, self._build("dblp.xml.gz", DBLP_XML, compress=True))
+        publication_index = index.PublicationIndex(self.index_directory)
+
+        # The shorter title matches better
+        publications = publication_index.search("nosql")
+        self.assertListEqual(["journals/x/Muller20", "conf/icde/FruthDS21"], [p.key for p in publications])
+
+        publication = publication_index.search("Managing NoSQL")[0]
+        self.assertEqual("Josch: Managing Schemas for NoSQL Document Stores.", publication.title)
+        self.assertEqual("ICDE", publication.venue)
+        self.assertEqual("10.1109/ICDE51399.2021.00306", publication.doi)
+        self.assertListEqual(["Michael Fruth", "Kai Dauberschmidt", "Stefanie Scherzinger"],
+                             [a.name for a in publication.authors])
+        self.assertIn("@inproceedings{DBLP:conf/icde/FruthDS21", publication.bib)
+
+        self.assertEqual("Schema Evolution in NoSQL Stores.", publication_index.search("evolution")[0].title)
+        self.assertListEqual([], publication_index.search("Home Page"))
+        self.assertListEqual([], publication_index.search("Managing Evolution"))
+        self.assertListEqual([], publication_index.search("unknown"))
+        publication_index.close()
+
+    def test_bibtex(self):
+        with open(REFERENCES_FILE, "r", encoding="UTF-8") as f:
+            content = f.read()
+        self.assertEqual(6, self._build("references.bib", content))
+
+        publication_index = index.PublicationIndex(self.index_directory)
+        publications = publication_index.search("josch")
+        self.assertEqual(1, len(publications))
+        self.assertEqual("icde/FruthDS21", publications[0].key.split("conf/")[1])
+        self.assertIn("Josch: Managing Schemas", publications[0].bib)
+        publication_index.close()
+
+    def test_json_lines(self):
+        hits = [{"info": {"key": "conf/a/A20", "title": "Tail Latencies.", "url": "https://dblp.org/rec/conf/a/A20",
+                          "authors": {"author": {"@pid": "1", "text": "Max Mustermann"}}, "year": "2020",
+                          "type": "Conference and Workshop Papers", "venue": "TPCTC"}},
+                {"info": {"key": "conf/b/B20", "title": "Other.", "url": "https://dblp.org/rec/conf/b/B20"}}]
+        self.assertEqual(2, self._build("hits.jsonl", "\n".join(json.dumps(h) for h in hits)))
+
+        publication_index = index.PublicationIndex(self.index_directory)
+        publication = publication_index.search("latencies")[0]
+        self.assertEqual("conf/a/A20", publication.key)
+        self.assertIn("booktitle = {TPCTC}", publication.bib)
+        publication_index.close()
+
+    def test_limit(self):
+        # The exact title is the last of many records containing the query
+        hits = [{"info": {"key": "conf/a/A{}".format(i), "title": "Tail Latencies of System {}.".format(i),
+                          "url": "https://dblp.org/rec/conf/a/A{}".format(i)}}
+                for i in range(100)]
+        hits.append({"info": {"key": "conf/b/B20", "title": "Tail Latencies.",
+                              "url": "https://dblp.org/rec/conf/b/B20"}})
+        self.assertEqual(101, self._build("hits.jsonl", "\n".join(json.dumps(h) for h in hits)))
+
+        publication_index = index.PublicationIndex(self.index_directory)
+        with mock.patch.object(publication_index, "record", wraps=publication_index.record) as record:
+            publications = publication_index.search("Tail Latencies", limit=5)
+        # Only the returned records are decoded
+        self.assertEqual(5, record.call_count)
+        self.assertEqual(5, len(publications))
+        self.assertEqual("conf/b/B20", publications[0].key)
+        self.assertEqual(["conf/a/A0", "conf/a/A1"], [p.key for p in publications[1:3]])
+        publication_index.close()
+
+    def test_accents(self):
+        hits = [{"info": {"key": "conf/a/A20", "title": "Kernel Methods of Sch\u00f6lkopf.",
+                          "url": "https://dblp.org/rec/conf/a/A20"}},
+                {"info": {"key": "conf/b/B20", "title": "The {Scholkopf} Kernel.",
+                          "url": "https://dblp.org/rec/conf/b/B20"}}]
+        self._build("hits.jsonl", "\n".join(json.dumps(h) for h in hits))
+
+        publication_index = index.PublicationIndex(self.index_directory)
+        for query in ("Scholkopf", "Sch\u00f6lkopf", "Sch\\\"{o}lkopf", "SCH\u00d6LKOPF"):
+            self.assertListEqual(["conf/b/B20", "conf/a/A20"], [p.key for p in publication_index.search(query)])
+        self.assertEqual("conf/a/A20", publication_index.search("sch\u00f6lkopf methods")[0].key)
+        publication_index.close()
+
+    def test_interrupted_build(self):
+        self._build("dblp.xml", DBLP_XML)
+        path = os.path.join(self.directory.name, "hits.jsonl")
+        with open(path, "w", encoding="UTF-8") as f:
+            f.write('{"info": {"key": "conf/a/A20", "title": "Tail Latencies."}}\nnot JSON\n')
+        with self.assertRaises(ValueError):
+            index.build_index(path, self.index_directory)
+
+        # The existing index is kept and no temporary files are left
+        self.assertListEqual(sorted(index.INDEX_FILES), sorted(os.listdir(self.index_directory)))
+        publication_index = index.PublicationIndex(self.index_directory)
+        self.assertEqual(2, len(publication_index))
+        self.assertListEqual([], publication_index.search("latencies"))
+        publication_index.close()
+
+    def test_missing_index(self):
+        with self.assertRaises(FileNotFoundError):
+            index.PublicationIndex(self.index_directory)
+
+    def test_offline_bibitem(self):
+        self._build("dblp.xml", DBLP_XML)
+        publication_index = index.PublicationIndex(self.index_directory)
+        publication = publication_index.search("Josch")[0]
+        bib = find.load_bibitem(publication, True, True)
+        self.assertIn("{{Josch: Managing Schemas for NoSQL Document Stores}}", bib)
+        self.assertIn("_doi", bib)
+        publication_index.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -92,6 +92,38 @@ class TestBooktitle(unittest.TestCase):
         self.assertEqual(None, shortname)
 
 
+class TestShortnameExtractor(unittest.TestCase):
+
+    def setUp(self):
+        self.extractor = latex_handler.ShortnameExtractor({
+            "Data Management on New Hardware": "DaMoN",
+            "Encyclopedia of Big Data": "EBDT",
+            "International Conference on Data Engineering": "Unused"
+        })
+
+    def test_heuristics_first(self):
+        self.assertEqual("ICDE", self.extractor(
+            "36th {IEEE} International Conference on Data Engineering, {ICDE} 2020, Dallas, TX, USA, April 20-24, 2020"))
+
+    def test_venue(self):
+        self.assertEqual("DaMoN", self.extractor(
+            "Proceedings of the 12th International Workshop on Data Management on New Hardware"))
+        self.assertEqual("EBDT", self.extractor("encyclopedia of big data Technologies"))
+
+    def test_unknown_venue(self):
+        self.assertIsNone(self.extractor("9th Workshop on Systems for Multi-core and Heterogenous Architectures"))
+
+    def test_no_venues(self):
+        self.assertIsNone(latex_handler.ShortnameExtractor()("Encyclopedia of Big Data Technologies"))
+
+    def test_memoized(self):
+        booktitle = "2016 {ISCA}, Seoul, South Korea, June 18-22, 2016"
+        self.assertEqual("ISCA", self.extractor(booktitle))
+        hits = latex_handler.extract_booktitle_shortname.cache_info().hits
+        self.assertEqual("ISCA", self.extractor(booktitle))
+        self.assertEqual(hits + 1, latex_handler.extract_booktitle_shortname.cache_info().hits)
+
+
 class TestCurlify(unittest.TestCase):
 
     def test_do_nothing(self):
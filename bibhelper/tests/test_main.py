@@ -0,0 +1,179 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from bibhelper import __main__ as main
+from bibhelper import config
+
+TESTS_DIRECTORY = os.path.dirname(os.path.realpath(__file__))
+REFERENCES_FILE = os.path.join(TESTS_DIRECTORY, "resources", "references.bib")
+CONFIG_FILE = os.path.join(TESTS_DIRECTORY, "..", "resources", "latex_bib_helper_config.json")
+
+# Modules which must only be imported by the commands using them
+LAZY_MODULES = ("requests", "jsonschema", "pyperclip", "bibtexparser", "concurrent.futures", "cProfile")
+
+
+def import_time(*args, env=None):
+    """
+    Runs python -X importtime with the arguments. Returns the imported modules and their cumulative import time (in
+    microseconds) as reported by the interpreter.
+    """
+    process = subprocess.run([sys.executable, "-X", "importtime"] + list(args), capture_output=True, text=True,
+                             env=env, check=True)
+    modules = {}
+    for line in process.stderr.splitlines():
+        if line.startswith("import time:") and not line.endswith("| imported package"):
+            _, cumulative, name = line[len("import time:"):].split("|")
+            modules[name.strip()] = int(cumulative)
+    return modules
+
+
+class TestStartup(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.env = dict(os.environ, XDG_CACHE_HOME=self.directory.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _assert_not_imported(self, modules, names):
+        for name in names:
+            self.assertNotIn(name, modules, "{} is imported at startup.".format(name))
+
+    def test_import_time(self):
+        modules = import_time("-c", "import bibhelper.__main__", env=self.env)
+        self._assert_not_imported(modules, LAZY_MODULES)
+        self.assertIn("bibhelper.__main__", modules)
+
+    def test_beautify(self):
+        args = ("-m", "bibhelper", "--config", CONFIG_FILE, "Beautify", "-f", REFERENCES_FILE)
+        modules = import_time(*args, env=self.env)
+        # The first run validates the configuration file
+        self.assertIn("jsonschema", modules)
+        self._assert_not_imported(modules, ("requests", "pyperclip", "concurrent.futures"))
+
+        modules = import_time(*args, env=self.env)
+        self._assert_not_imported(modules, ("jsonschema", "requests", "pyperclip", "concurrent.futures"))
+
+
+class TestBeautifyOutput(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.env = dict(os.environ, XDG_CACHE_HOME=self.directory.name)
+        self.path = os.path.join(self.directory.name, "references.bib")
+        with open(REFERENCES_FILE, "r", encoding="UTF-8") as f:
+            self.content = f.read()
+        with open(self.path, "w", encoding="UTF-8") as f:
+            f.write(self.content)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _run(self, *args, stdin=None):
+        return subprocess.run([sys.executable, "-m", "bibhelper", "--config", CONFIG_FILE, "--pretty", "Beautify"]
+                              + list(args), input=stdin, capture_output=True, text=True, env=self.env, timeout=60)
+
+    def _read(self):
+        with open(self.path, "r", encoding="UTF-8") as f:
+            return f.read()
+
+    def test_output_is_input(self):
+        expected = self._run("-f", self.path).stdout
+        process = self._run("-f", self.path, "-o", self.path)
+        self.assertEqual(0, process.returncode, process.stderr)
+        self.assertEqual(expected.rstrip("\n"), self._read().rstrip("\n"))
+        self.assertNotIn(".tmp", " ".join(os.listdir(self.directory.name)))
+
+    def test_rejected_before_writing(self):
+        for args in (("--stream", "-f", self.path, "-o", self.path),
+                     ("--watch", "-f", self.path, "-o", self.path)):
+            process = self._run(*args)
+            self.assertEqual(2, process.returncode)
+            self.assertEqual(self.content, self._read())
+
+    def test_rejected_options(self):
+        output_path = os.path.join(self.directory.name, "output.bib")
+        for args in (("--incremental", "-j", "2"), ("--watch", "-j", "2"), ("-j", "0"),
+                     ("--stream", "-o", output_path, "-j", "2"), ("--sort-run-size", "10"),
+                     ("--stream", "-o", output_path, "--sort-run-size", "0")):
+            process = self._run("-f", self.path, *args)
+            self.assertEqual(2, process.returncode, args)
+            self.assertIn("Beautify --", process.stderr)
+        self.assertFalse(os.path.exists(output_path))
+
+    def test_jobs(self):
+        expected = self._run("-f", self.path).stdout
+        process = self._run("-f", self.path, "-j", "2")
+        self.assertEqual(0, process.returncode, process.stderr)
+        self.assertEqual(expected, process.stdout)
+
+    def test_stream_stdin(self):
+        output_path = os.path.join(self.directory.name, "output.bib")
+        process = self._run("--stream", "-f", "-", "-o", output_path, stdin=self.content)
+        self.assertEqual(2, process.returncode)
+        self.assertIn("stdin", process.stderr)
+        self.assertFalse(os.path.exists(output_path))
+
+
+class TestValidatedConfigs(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.environ = mock.patch.dict(os.environ, XDG_CACHE_HOME=self.directory.name)
+        self.environ.start()
+        self.config_file = os.path.join(self.directory.name, "config.json")
+        with open(CONFIG_FILE, "r") as f:
+            self.json_config = json.load(f)
+        self._write(self.json_config)
+
+    def tearDown(self):
+        self.environ.stop()
+        self.directory.cleanup()
+        config.set_config(self.json_config)
+
+    def _write(self, json_config):
+        with open(self.config_file, "w") as f:
+            json.dump(json_config, f)
+
+    def _is_validated(self):
+        with open(self.config_file, "rb") as f:
+            config_content = f.read()
+        with open(main.SCHEMA_FILE, "rb") as f:
+            schema_content = f.read()
+        return main.is_config_validated(self.config_file, config_content, schema_content)
+
+    def test_validated(self):
+        self.assertFalse(self._is_validated())
+        self.assertTrue(main.try_load_and_set_config(self.config_file))
+        self.assertTrue(self._is_validated())
+        self.assertTrue(main.try_load_and_set_config(self.config_file))
+
+    def test_changed(self):
+        self.assertTrue(main.try_load_and_set_config(self.config_file))
+        self.json_config["style"]["hidePrefix"] = "-"
+        self._write(self.json_config)
+        self.assertFalse(self._is_validated())
+        self.assertTrue(main.try_load_and_set_config(self.config_file))
+        self.assertEqual("-", config.get_hide_prefix())
+
+    def test_invalid(self):
+        self._write({"style": 1})
+        with self.assertLogs(main.logger, level="WARNING"):
+            self.assertFalse(main.try_load_and_set_config(self.config_file))
+        self.assertFalse(self._is_validated())
+
+    def test_unwritable_cache_directory(self):
+        with open(os.path.join(self.directory.name, "bibhelper"), "w") as f:
+            f.write("not a directory")
+        self.assertTrue(main.try_load_and_set_config(self.config_file))
+        self.assertFalse(self._is_validated())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from bibhelper import beautify
+from bibhelper import config
+from bibhelper import merge
+
+CONFIG_FILE = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "resources",
+                           "latex_bib_helper_config.json")
+
+FIRST_FILE = """@string{icde = {ICDE}}
+
+@inproceedings{josch,
+    title = {Josch},
+    booktitle = icde,
+    doi = {10.1109/ICDE51399.2021.00306},
+    year = {2021}
+}
+
+@misc{only_first,
+    title = {Only in the first file}
+}
+"""
+
+SECOND_FILE = """@comment{Second file}
+
+@inproceedings{josch,
+    title = {Josch: Managing Schemas for NoSQL Document Stores},
+    pages = {2693--2696},
+    year = {2021}
+}
+
+@misc{only_second,
+    title = {Only in the second file}
+}
+
+@misc{only_first,
+    title = {Only in the first file}
+}
+"""
+
+
+class TestMerge(unittest.TestCase):
+
+    def setUp(self):
+        with open(CONFIG_FILE, "r") as f:
+            config.set_config(json.load(f))
+        self.directory = tempfile.TemporaryDirectory()
+        self.paths = []
+        for i, content in enumerate((FIRST_FILE, SECOND_FILE)):
+            path = os.path.join(self.directory.name, "{}.bib".format(i))
+            with open(path, "w", encoding="UTF-8") as f:
+                f.write(content)
+            # The second file is the older one
+            os.utime(path, ns=(1000 - i, 1000 - i))
+            self.paths.append(path)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _merge(self, policy, paths=None):
+        output_file = io.StringIO()
+        report_file = io.StringIO()
+        merge.merge(paths or self.paths, output_file, report_file, policy, False, False)
+        return output_file.getvalue(), report_file.getvalue()
+
+    def _entries(self, output):
+        return {bib_entry["ID"]: bib_entry for bib_entry in beautify.create_parser().parse(output).entries}
+
+    def test_first(self):
+        output, report = self._merge(merge.FIRST)
+        entries = self._entries(output)
+        self.assertEqual(["josch", "only_first", "only_second"], list(entries))
+        self.assertEqual("Josch", entries["josch"]["title"])
+        self.assertNotIn("pages", entries["josch"])
+        self.assertEqual("CONFLICT\tjosch\t{}; {}\n".format(*self.paths), report)
+        # Comments and strings of all files are kept
+        self.assertTrue(output.startswith("@comment{Second file}\n\n@string{icde = {ICDE}}\n"))
+        self.assertEqual("ICDE", entries["josch"]["booktitle"])
+
+    def test_newest(self):
+        entries = self._entries(self._merge(merge.NEWEST)[0])
+        self.assertEqual("Josch", entries["josch"]["title"])
+
+        os.utime(self.paths[1], ns=(2000, 2000))
+        entries = self._entries(self._merge(merge.NEWEST)[0])
+        self.assertEqual(["josch", "only_first", "only_second"], list(entries))
+        self.assertEqual("Josch: Managing Schemas for NoSQL Document Stores", entries["josch"]["title"])
+        self.assertNotIn("doi", entries["josch"])
+
+    def test_union(self):
+        entries = self._entries(self._merge(merge.UNION)[0])
+        josch = entries["josch"]
+        self.assertEqual("Josch", josch["title"])
+        self.assertEqual("Josch: Managing Schemas for NoSQL Document Stores", josch["_title"])
+        self.assertEqual("2693--2696", josch["pages"])
+        self.assertEqual("10.1109/ICDE51399.2021.00306", josch["doi"])
+        self.assertNotIn("_year", josch)
+
+    def test_union_conflicts(self):
+        # The third file equals the first one, it does not conflict with the entry merged from the first two files
+        paths = [self.paths[0], self.paths[1], self.paths[0]]
+        output, report = self._merge(merge.UNION, paths)
+        self.assertEqual("CONFLICT\tjosch\t{}; {}\n".format(*self.paths), report)
+        self.assertEqual(self._merge(merge.UNION)[0], output)
+
+    def test_same_file(self):
+        output, report = self._merge(merge.UNION, [self.paths[0], self.paths[0]])
+        self.assertEqual("", report)
+        self.assertEqual(2, len(self._entries(output)))
+
+    def test_unknown_policy(self):
+        with self.assertRaises(ValueError):
+            merge.Merger("last")
+
+
+if __name__ == '__main__':
+    unittest.main()
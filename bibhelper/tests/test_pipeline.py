@@ -0,0 +1,89 @@
+import copy
+import json
+import os
+import unittest
+
+from bibhelper import config
+from bibhelper import pipeline
+
+TESTS_DIRECTORY = os.path.dirname(os.path.realpath(__file__))
+CONFIG_FILE = os.path.join(TESTS_DIRECTORY, "..", "resources", "latex_bib_helper_config.json")
+
+
+def create_upper_title_stage(style):
+    def upper_title(bib_entry):
+        bib_entry["title"] = bib_entry["title"].upper()
+
+    return upper_title
+
+
+class TestPipeline(unittest.TestCase):
+
+    def setUp(self):
+        with open(CONFIG_FILE, "r") as f:
+            self.json_config = json.load(f)
+        config.set_config(self.json_config)
+        self.entry = {
+            "ENTRYTYPE": "inproceedings",
+            "ID": "DBLP:conf/icde/FruthDS21",
+            "title": "Josch: Managing Schemas for NoSQL Document Stores",
+            "booktitle": "37th {IEEE} International Conference on Data Engineering, {ICDE} 2021",
+            "doi": "10.1109/ICDE51399.2021.00306"
+        }
+
+    def _set_style(self, **style):
+        json_config = copy.deepcopy(self.json_config)
+        json_config["style"].update(style)
+        config.set_config(json_config)
+
+    def test_stage_names(self):
+        style = config.get_style()
+        self.assertEqual([], pipeline.get_stage_names(False, False, style))
+        self.assertEqual(["curlify"], pipeline.get_stage_names(True, False, style))
+        self.assertEqual(["curlify", "hideAttributes", "rewriteBooktitle"], pipeline.get_stage_names(True, True, style))
+
+    def test_curlify_pretty(self):
+        result = pipeline.create_pipeline(True, True)(self.entry)
+        self.assertEqual("{Josch: Managing Schemas for NoSQL Document Stores}", result["title"])
+        self.assertEqual("Proc.\\ ICDE", result["booktitle"])
+        self.assertEqual(self.entry["booktitle"], result["_booktitle"])
+        self.assertEqual(self.entry["doi"], result["_doi"])
+        self.assertNotIn("doi", result)
+
+    def test_entry_not_modified(self):
+        original = dict(self.entry)
+        pipeline.create_pipeline(True, True).transform([self.entry])
+        self.assertEqual(original, self.entry)
+
+    def test_no_stages(self):
+        transform = pipeline.create_pipeline(False, False)
+        self.assertEqual((), transform.stages)
+        self.assertEqual(self.entry, transform(self.entry))
+
+    def test_disabled_stage_left_out(self):
+        self._set_style(rewriteBooktitle={"rewrite": False, "nameWithPlaceholder": "{}"})
+        transform = pipeline.create_pipeline(False, True)
+        self.assertEqual(1, len(transform.stages))
+        self.assertEqual(self.entry["booktitle"], transform(self.entry)["booktitle"])
+
+    def test_registered_stage(self):
+        pipeline.register_stage("upperTitle", create_upper_title_stage)
+        self.addCleanup(pipeline._stage_factories.pop, "upperTitle")
+        self._set_style(stages=["upperTitle"])
+        result = pipeline.create_pipeline(False, True)(self.entry)
+        self.assertEqual("JOSCH: MANAGING SCHEMAS FOR NOSQL DOCUMENT STORES", result["title"])
+
+    def test_imported_stage(self):
+        self._set_style(stages=["bibhelper.tests.test_pipeline:create_upper_title_stage"])
+        result = pipeline.create_pipeline(True, True)(self.entry)
+        # Custom stages run after the built-in stages
+        self.assertEqual("{JOSCH: MANAGING SCHEMAS FOR NOSQL DOCUMENT STORES}", result["title"])
+
+    def test_unknown_stage(self):
+        self._set_style(stages=["unknown"])
+        with self.assertRaises(ValueError):
+            pipeline.create_pipeline(False, True)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+import io
+import json
+import os
+import pstats
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+
+from bibhelper import beautify
+from bibhelper import config
+from bibhelper import pipeline
+from bibhelper import profiling
+
+TESTS_DIRECTORY = os.path.dirname(os.path.realpath(__file__))
+REFERENCES_FILE = os.path.join(TESTS_DIRECTORY, "resources", "references.bib")
+CONFIG_FILE = os.path.join(TESTS_DIRECTORY, "..", "resources", "latex_bib_helper_config.json")
+
+
+class TestDisabled(unittest.TestCase):
+
+    def test_no_overhead(self):
+        self.assertIsNone(profiling.get_profiler())
+        self.assertIs(profiling.span("a"), profiling.span("b"))
+        self.assertIs(len, profiling.wrap("len", len))
+
+        with open(CONFIG_FILE, "r") as f:
+            config.set_config(json.load(f))
+        self.assertIn(pipeline.bibtex_handler.hide_attributes.__name__,
+                      [stage.func.__name__ for stage in pipeline.create_pipeline(False, True).stages])
+
+
+class TestProfiler(unittest.TestCase):
+
+    def setUp(self):
+        self.profiler = profiling.Profiler()
+        profiling.set_profiler(self.profiler)
+        self.profiler.start()
+
+    def tearDown(self):
+        self.profiler.stop()
+        profiling.set_profiler(None)
+
+    def test_nested_spans(self):
+        with profiling.span("outer"):
+            for _ in range(3):
+                with profiling.span("inner"):
+                    data = bytearray(1024 * 1024)
+                    del data
+            count = profiling.wrap("count", len)
+            self.assertEqual(2, count("ab"))
+
+        statistics = self.profiler.to_dict()
+        self.assertEqual({"outer", "inner", "count"}, set(statistics))
+        self.assertEqual(1, statistics["outer"]["count"])
+        self.assertEqual(3, statistics["inner"]["count"])
+        self.assertGreaterEqual(statistics["outer"]["total"], statistics["inner"]["total"])
+        # The peak of the inner span is a peak of the outer span
+        self.assertGreaterEqual(statistics["inner"]["peak_memory"], 1024 * 1024)
+        self.assertGreaterEqual(statistics["outer"]["peak_memory"], statistics["inner"]["peak_memory"])
+
+    def test_threads(self):
+        def run():
+            with profiling.span("thread"):
+                data = bytearray(1024 * 1024)
+                del data
+
+        with profiling.span("main"):
+            threads = [threading.Thread(target=run) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(4, self.profiler.statistics["thread"].count)
+        self.assertEqual(1, self.profiler.statistics["main"].count)
+        # The threads do not reset the peak of the main thread, which includes their allocations
+        self.assertIsNone(self.profiler.statistics["thread"].peak_memory)
+        self.assertGreaterEqual(self.profiler.statistics["main"].peak_memory, 1024 * 1024)
+
+    def test_beautify(self):
+        with open(CONFIG_FILE, "r") as f:
+            config.set_config(json.load(f))
+        with open(REFERENCES_FILE, "r", encoding="UTF-8") as f:
+            content = f.read()
+        beautify.beautify(content, True, False, True, io.StringIO())
+
+        statistics = self.profiler.to_dict()
+        for name in ("parse", "transform", "write", "stage.curlify", "stage.hideAttributes"):
+            self.assertIn(name, statistics)
+        self.assertEqual(6, statistics["stage.curlify"]["count"])
+
+    def test_output(self):
+        with profiling.span("a"):
+            pass
+        with tempfile.TemporaryDirectory() as directory:
+            json_file = os.path.join(directory, "profile.json")
+            self.profiler.write_json(json_file)
+            with open(json_file, "r") as f:
+                self.assertEqual(1, json.load(f)["a"]["count"])
+
+            trace_file = os.path.join(directory, "trace.json")
+            self.profiler.write_trace(trace_file)
+            with open(trace_file, "r") as f:
+                events = json.load(f)["traceEvents"]
+            self.assertEqual(["a"], [event["name"] for event in events])
+            self.assertEqual("X", events[0]["ph"])
+        self.assertIn("a", self.profiler.format_table().splitlines()[1])
+
+
+class TestCommandLine(unittest.TestCase):
+
+    def test_profile(self):
+        with tempfile.TemporaryDirectory() as directory:
+            json_file = os.path.join(directory, "profile.json")
+            cprofile_file = os.path.join(directory, "cprofile.prof")
+            process = subprocess.run([sys.executable, "-m", "bibhelper", "--config", CONFIG_FILE, "--pretty",
+                                      "--profile", "--profile-json", json_file, "--cprofile", cprofile_file,
+                                      "Beautify", "-f", REFERENCES_FILE],
+                                     capture_output=True, text=True, check=True,
+                                     env=dict(os.environ, XDG_CACHE_HOME=directory))
+            self.assertIn("command.Beautify", process.stderr)
+            self.assertNotIn("command.Beautify", process.stdout)
+            with open(json_file, "r") as f:
+                statistics = json.load(f)
+            for name in ("config.load", "config.validate", "command.Beautify", "parse", "stage.hideAttributes"):
+                self.assertIn(name, statistics)
+            self.assertGreater(len(pstats.Stats(cprofile_file).stats), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from bibhelper import config
+from bibhelper import prune
+
+TESTS_DIRECTORY = os.path.dirname(os.path.realpath(__file__))
+CONFIG_FILE = os.path.join(TESTS_DIRECTORY, "..", "resources", "latex_bib_helper_config.json")
+
+BIB = """@string{icde = {ICDE}}
+@inproceedings{josch, title = {Josch}, booktitle = icde, crossref = {icde21}}
+@proceedings{icde21, title = {Proceedings of ICDE 2021}}
+@article{natbib, title = {Natbib}}
+@article{biblatex, title = {Biblatex}}
+@article{multi, title = {Multi}}
+@article{unused, title = {Unused}}
+@article{commented, title = {Commented}}
+"""
+
+MAIN = r"""\documentclass{article}
+\begin{document}
+\input{chapters/intro}
+% \cite{commented}
+Costs 100\% \citep[p.~3]{natbib}.
+\bibliographystyle{plain}
+\bibliography{refs}
+\end{document}
+"""
+
+INTRO = r"""As shown by \cite{josch, undefined} and \Textcite*[see][]{biblatex},
+\parencites(pre)(post)[1]{multi}[2]{natbib} is a multicite.
+"""
+
+
+class TestScan(unittest.TestCase):
+
+    def test_scan_content(self):
+        keys, bibliographies = prune.scan_content((MAIN + INTRO).encode("UTF-8"))
+        self.assertEqual(["natbib", "josch", "undefined", "biblatex", "multi", "natbib"], keys)
+        self.assertEqual(["refs"], bibliographies)
+
+    def test_biblatex_resources(self):
+        keys, bibliographies = prune.scan_content(b"\\addbibresource[location=local]{a.bib}\\addbibresource{b.bib}"
+                                                  b"\\nocite{*}\\bibliography{c,d}")
+        self.assertEqual(["*"], keys)
+        self.assertEqual(["a.bib", "b.bib", "c", "d"], bibliographies)
+
+    def test_capitalized(self):
+        keys, _ = prune.scan_content(b"\\Cite{a} \\Parencite[p.~1]{b} \\Autocite{c} \\Textcites{d}{e}")
+        self.assertEqual(["a", "b", "c", "d", "e"], keys)
+
+    def test_arguments_on_next_line(self):
+        keys, bibliographies = prune.scan_content(b"\\bibliography{refs}\n{\\small Thanks}\n"
+                                                  b"\\addbibresource[location=local]{a.bib}\n\n"
+                                                  b"\\cite{x}\n{y}\\cites{p}\n{q}\n\n{r}")
+        self.assertEqual(["refs", "a.bib"], bibliographies)
+        self.assertEqual(["x", "p", "q"], keys)
+
+    def test_select_cited(self):
+        entries = [{"ID": "a", "crossref": "b"}, {"ID": "b"}, {"ID": "c"}]
+        self.assertEqual(["a", "b"], [e["ID"] for e in prune.select_cited(entries, {"a"})])
+        self.assertEqual(["c"], [e["ID"] for e in prune.select_cited(entries, {"c", "undefined"})])
+        self.assertEqual(entries, prune.select_cited(entries, {"*"}))
+
+
+class TestPrune(unittest.TestCase):
+
+    def setUp(self):
+        with open(CONFIG_FILE, "r") as f:
+            config.set_config(json.load(f))
+        self.directory = tempfile.TemporaryDirectory()
+        self._write("main.tex", MAIN)
+        self._write(os.path.join("chapters", "intro.tex"), INTRO)
+        self._write("refs.bib", BIB)
+        self._write(os.path.join(".git", "ignored.tex"), "\\cite{unused}")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _write(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="UTF-8") as f:
+            f.write(content)
+
+    def test_prune(self):
+        output_file = io.StringIO()
+        report_file = io.StringIO()
+        bib_database = prune.prune(self.directory.name, None, output_file, report_file, False, False)
+        self.assertEqual(["josch", "icde21", "natbib", "biblatex", "multi"],
+                         [bib_entry["ID"] for bib_entry in bib_database.entries])
+        intro = os.path.join(self.directory.name, "chapters", "intro.tex")
+        self.assertEqual("UNDEFINED\tundefined\t{}\nUNUSED\tunused\nUNUSED\tcommented\n".format(intro),
+                         report_file.getvalue())
+        self.assertIn("@string{icde = {ICDE}}", output_file.getvalue())
+        self.assertNotIn("{unused,", output_file.getvalue())
+
+    def test_parallel(self):
+        for i in range(prune.MIN_FILES_PER_PROCESS):
+            self._write(os.path.join("parallel", "{}.tex".format(i)), "\\cite{{key{}}}".format(i))
+        tex_files = prune.find_tex_files(self.directory.name)
+        self.assertEqual(prune.scan_files(tex_files, 1), prune.scan_files(tex_files, 2))
+
+    def test_empty_file(self):
+        self._write("empty.tex", "")
+        output_file = io.StringIO()
+        bib_database = prune.prune(self.directory.name, [os.path.join(self.directory.name, "refs.bib")], output_file,
+                                   io.StringIO(), False, False)
+        self.assertEqual(5, len(bib_database.entries))
+
+
+if __name__ == '__main__':
+    unittest.main()
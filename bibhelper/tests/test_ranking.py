@@ -0,0 +1,87 @@
+import unittest
+
+from bibhelper import ranking
+
+
+class Candidate:
+
+    def __init__(self, title):
+        self.title = title
+
+
+class TestNormalizeTitle(unittest.TestCase):
+
+    def test_latex(self):
+        self.assertEqual("the nosql muller stores", ranking.normalize_title('The {NoSQL} M\\"{u}ller-Stores.'))
+
+    def test_accents(self):
+        self.assertEqual("muller cafe", ranking.normalize_title("Müller Café"))
+
+    def test_commands(self):
+        self.assertEqual("big data", ranking.normalize_title("\\textbf{Big} {D}ata"))
+
+    def test_whitespace(self):
+        self.assertEqual("tail latencies", ranking.normalize_title("  Tail\n  Latencies. "))
+
+    def test_last_names(self):
+        self.assertEqual(("fruth", "muller"), ranking.get_last_names("Michael Fruth and M{\\\"u}ller, Anna"))
+        self.assertEqual((), ranking.get_last_names(""))
+
+
+class TestSimilarity(unittest.TestCase):
+
+    def _similarity(self, a, b):
+        return ranking.similarity(ranking.TitleFeatures(a), ranking.TitleFeatures(b))
+
+    def test_same(self):
+        self.assertEqual(1.0, self._similarity("Tail Latencies", "{T}ail latencies."))
+
+    def test_disjoint(self):
+        self.assertEqual(0.0, self._similarity("abc", "xyz"))
+
+    def test_order(self):
+        query = "Josch Managing Schemas for NoSQL"
+        close = self._similarity(query, "Josch: Managing Schemas for NoSQL Document Stores.")
+        far = self._similarity(query, "Managing Document Stores.")
+        self.assertGreater(close, far)
+
+    def test_typo(self):
+        self.assertGreater(self._similarity("Tail Latencys", "Tail Latencies."),
+                           self._similarity("Tail Latencys", "Tail Recursion."))
+
+    def test_partial_query(self):
+        self.assertGreater(self._similarity("Tail Latencies Cloud", "Tail Latencies in the Cloud."),
+                           self._similarity("Tail Latencies Cloud", "Tail Latencies."))
+
+
+class TestSelectPublication(unittest.TestCase):
+
+    def setUp(self):
+        self.candidates = [Candidate("Tell-Tale Tail Latencies: Pitfalls and Perils."),
+                           Candidate("Tail Latencies in the Cloud."),
+                           Candidate("Tail Latencies.")]
+
+    def test_rank(self):
+        ranked = ranking.rank_publications("tail latencies cloud", self.candidates)
+        self.assertIs(self.candidates[1], ranked[0][1])
+        self.assertListEqual(sorted([score for score, _ in ranked], reverse=True), [score for score, _ in ranked])
+
+    def test_select(self):
+        self.assertIs(self.candidates[2], ranking.select_publication("Tail Latencies", self.candidates, 0.9))
+
+    def test_below_threshold(self):
+        self.assertIsNone(ranking.select_publication("Latencies", self.candidates, 0.9))
+
+    def test_tie(self):
+        candidates = [Candidate("Tail Latencies."), Candidate("Tail latencies")]
+        self.assertIsNone(ranking.select_publication("Tail Latencies", candidates, 0.9))
+
+    def test_select_ranked(self):
+        ranked = ranking.rank_publications("Tail Latencies", self.candidates)
+        self.assertIs(self.candidates[2], ranking.select_ranked(ranked, 0.9))
+        self.assertIsNone(ranking.select_ranked(ranked, 1.1))
+        self.assertIsNone(ranking.select_ranked([], 0.9))
+
+
+if __name__ == '__main__':
+    unittest.main()
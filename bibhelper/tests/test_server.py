@@ -0,0 +1,189 @@
+import io
+import json
+import os
+import stat
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from bibhelper import beautify
+from bibhelper import client
+from bibhelper import config
+from bibhelper import server
+from bibhelper.benchmarks.dblp_server import DBLPServer
+
+TESTS_DIRECTORY = os.path.dirname(os.path.realpath(__file__))
+REFERENCES_FILE = os.path.join(TESTS_DIRECTORY, "resources", "references.bib")
+CONFIG_FILE = os.path.join(TESTS_DIRECTORY, "..", "resources", "latex_bib_helper_config.json")
+
+
+class TestServer(unittest.TestCase):
+
+    def setUp(self):
+        self.dblp_server = DBLPServer()
+        self.dblp_server.add_publication("conf/icde/FruthDS21", "Josch: Managing Schemas for NoSQL Document Stores.")
+        self.dblp_server.add_publication("conf/tpctc/A19", "Tell-Tale Tail Latencies: Pitfalls and Perils.")
+        self.dblp_server.add_publication("conf/tpctc/B19", "Tail Latencies in the Cloud.")
+        self.dblp_server.__enter__()
+        with open(CONFIG_FILE, "r") as f:
+            json_config = json.load(f)
+        json_config["settings"]["search"]["publicationUrl"] = self.dblp_server.publication_url
+        config.set_config(json_config)
+        with open(REFERENCES_FILE, "r", encoding="UTF-8") as f:
+            self.content = f.read()
+
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "bibhelper.sock")
+        self.server = server.UnixServer(self.path, server.Service(), workers=4)
+        self.thread = threading.Thread(target=self.server.serve_until_stopped)
+        self.thread.start()
+        self.client = client.Client(self.path, timeout=10)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.service.shutdown()
+        self.thread.join()
+        self.server.server_close()
+        self.directory.cleanup()
+        self.dblp_server.__exit__(None, None, None)
+
+    def test_beautify(self):
+        expected = beautify.style(beautify.create_parser().parse(self.content), True, True)
+        self.assertEqual(expected, self.client.call("beautify", content=self.content, curly=True, pretty=True)["bib"])
+
+    def test_beautify_document(self):
+        first = self.client.call("beautify", content=self.content, pretty=True, document="references.bib")["bib"]
+        changed = self.content.replace("Josch: Managing Schemas", "Josch: Managing Many Schemas")
+        with self.assertLogs("bibhelper.incremental", level="INFO") as logs:
+            second = self.client.call("beautify", content=changed, pretty=True, document="references.bib")["bib"]
+        self.assertIn("Formatted 1 of 6 entries.", logs.output[0])
+        self.assertEqual(first.replace("Josch: Managing Schemas", "Josch: Managing Many Schemas"), second)
+
+    def test_find(self):
+        result = self.client.call("find", title="Josch Managing Schemas", pretty=True)
+        self.assertEqual("FOUND", result["status"])
+        self.assertEqual("conf/icde/FruthDS21", result["publications"][0]["key"])
+        self.assertIn("DBLP:conf/icde/FruthDS21", result["bib"])
+
+        self.assertEqual({"status": "NOT_FOUND", "publications": []},
+                         self.client.call("find", title="Does not exist"))
+
+    def test_find_ambiguous(self):
+        result = self.client.call("find", title="Latencies")
+        self.assertEqual("AMBIGUOUS", result["status"])
+        self.assertEqual(["conf/tpctc/B19", "conf/tpctc/A19"], [p["key"] for p in result["publications"]])
+
+        result = self.client.call("find", title="Latencies", key="conf/tpctc/A19")
+        self.assertEqual("FOUND", result["status"])
+        self.assertIn("DBLP:conf/tpctc/A19", result["bib"])
+
+    def test_errors(self):
+        with self.assertRaises(client.ServerError) as context:
+            self.client.call("unknown")
+        self.assertEqual(server.METHOD_NOT_FOUND, context.exception.code)
+        with self.assertRaises(client.ServerError) as context:
+            self.client.call("beautify", text="")
+        self.assertEqual(server.INVALID_PARAMS, context.exception.code)
+        with self.assertRaises(client.ServerError) as context:
+            self.client.call("beautify", content=1)
+        self.assertEqual(server.INVALID_PARAMS, context.exception.code)
+
+        self.dblp_server.add_failures(404)
+        with self.assertLogs(server.logger, level="WARNING"):
+            with self.assertRaises(client.ServerError) as context:
+                self.client.call("find", title="Josch")
+        self.assertEqual(server.SERVER_ERROR, context.exception.code)
+        # The connection is still usable
+        self.assertEqual({"version": server.__version__}, self.client.call("version"))
+
+    def test_concurrent_clients(self):
+        def call(i):
+            with client.Client(self.path, timeout=10) as c:
+                return c.call("beautify", content=self.content, document=str(i % 2))["bib"]
+
+        expected = beautify.style(beautify.create_parser().parse(self.content), False, False)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            self.assertEqual([expected] * 16, list(executor.map(call, range(16))))
+
+    def test_permissions(self):
+        self.assertEqual(0o600, stat.S_IMODE(os.stat(self.path).st_mode))
+
+        # The umask of the process is restored
+        umask = os.umask(0o022)
+        try:
+            other_server = server.UnixServer(os.path.join(self.directory.name, "other.sock"), server.Service())
+            other_server.server_close()
+            self.assertEqual(0o022, os.umask(umask))
+        finally:
+            os.umask(umask)
+
+    def test_stale_socket(self):
+        with self.assertRaises(OSError):
+            server.UnixServer(self.path, server.Service())
+
+    def test_not_a_socket(self):
+        path = os.path.join(self.directory.name, "paper.tex")
+        with open(path, "w") as f:
+            f.write("\\cite{josch}")
+        with self.assertRaises(OSError):
+            server.UnixServer(path, server.Service())
+        self.assertTrue(os.path.isfile(path))
+
+    def test_other_owner(self):
+        with mock.patch.object(client.os, "getuid", return_value=os.getuid() + 1):
+            with self.assertRaises(PermissionError):
+                client.Client(self.path)
+            with self.assertRaises(OSError):
+                client.forward(["Find", "Josch"], self.path, io.StringIO())
+
+    def test_forward(self):
+        output = io.StringIO()
+        output_file = os.path.join(self.directory.name, "output.bib")
+        self.assertEqual(0, client.forward(["--pretty", "Beautify", "-f", REFERENCES_FILE, "-o", output_file],
+                                           self.path, output))
+        with open(output_file, "r", encoding="UTF-8") as f:
+            self.assertEqual(beautify.style(beautify.create_parser().parse(self.content), False, True), f.read())
+
+        self.assertEqual(0, client.forward(["Find", "Josch", "Managing", "Schemas"], self.path, output))
+        self.assertIn("DBLP:conf/icde/FruthDS21", output.getvalue())
+
+        for argv in (["Find", "Latencies"], ["Beautify", "-f", REFERENCES_FILE, "--stream"], ["Dedupe", "-f", "x"],
+                     ["--config", "x", "Find", "Josch"]):
+            with self.assertRaises(client._Unsupported):
+                client.forward(argv, self.path, output)
+
+
+class TestStream(unittest.TestCase):
+
+    def setUp(self):
+        with open(CONFIG_FILE, "r") as f:
+            config.set_config(json.load(f))
+
+    def _serve(self, lines):
+        responses = []
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            server.serve_stream(server.Service(), lines, responses.append, executor)
+        return [json.loads(response) for response in responses]
+
+    def test_requests(self):
+        responses = self._serve(['{"jsonrpc": "2.0", "id": 1, "method": "version"}\n',
+                                 '\n',
+                                 '{"jsonrpc": "2.0", "method": "version"}\n',
+                                 '{"jsonrpc": "2.0", "id": 2, "method": "beautify", '
+                                 '"params": ["@misc{a, year=2021}"]}\n',
+                                 '{"id": 3, "method": "version"}\n'])
+        self.assertEqual([1, 2, 3], sorted(response["id"] for response in responses))
+        responses = {response["id"]: response for response in responses}
+        self.assertEqual(server.__version__, responses[1]["result"]["version"])
+        self.assertEqual("@misc{a,\n    year = {2021}\n}\n", responses[2]["result"]["bib"])
+        self.assertEqual(server.INVALID_REQUEST, responses[3]["error"]["code"])
+
+    def test_errors(self):
+        responses = self._serve(['no json\n', '[1, 2]\n'])
+        self.assertEqual([server.PARSE_ERROR, server.INVALID_REQUEST], sorted(r["error"]["code"] for r in responses))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+import copy
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from bibhelper import beautify
+from bibhelper import config
+from bibhelper import incremental
+from bibhelper import sorting
+from bibhelper.benchmarks.generator import generate_bibtex
+
+CONFIG_FILE = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "resources",
+                           "latex_bib_helper_config.json")
+
+
+def create_entry(key, entry_type="article", **fields):
+    return dict(fields, ID=key, ENTRYTYPE=entry_type)
+
+
+class TestEntrySortKey(unittest.TestCase):
+
+    def setUp(self):
+        self.entries = [create_entry("b", year="2019", author="Max Mustermann"),
+                        create_entry("A", "book", _year="2021", author="Fruth, Michael and Anna M{\\\"u}ller"),
+                        create_entry("c", year="In press"),
+                        create_entry("d", "proceedings", year="2021", editor="Anna Zeller")]
+
+    def _sort(self, *fields):
+        sort_key = sorting.EntrySortKey(fields, "_")
+        return [bib_entry["ID"] for bib_entry in sorted(self.entries, key=sort_key)]
+
+    def test_fields(self):
+        self.assertEqual(["A", "b", "c", "d"], self._sort("key"))
+        self.assertEqual(["b", "A", "d", "c"], self._sort("year"))
+        self.assertEqual(["A", "b", "d", "c"], self._sort("author"))
+        self.assertEqual(["b", "c", "A", "d"], self._sort("type"))
+
+    def test_combination(self):
+        # Descending year, the entry without year is last
+        self.assertEqual(["A", "d", "b", "c"], self._sort("-year", "author"))
+        self.assertEqual(["d", "A", "b", "c"], self._sort("-year", "-author"))
+
+    def test_values(self):
+        sort_key = sorting.EntrySortKey(("-year", "author"), "_")
+        values = json.loads(json.dumps(sort_key.values(self.entries[1])))
+        self.assertEqual([2021, "fruth"], values)
+        self.assertEqual(sort_key(self.entries[1]), sort_key.key(values))
+
+    def test_unknown_field(self):
+        with self.assertRaises(ValueError):
+            sorting.EntrySortKey(("title",), "_")
+
+
+class TestSortEntries(unittest.TestCase):
+
+    def setUp(self):
+        # Many entries share the year, the sort is stable
+        self.entries = [create_entry(str(i), year=str(2000 + i % 7)) for i in range(100)]
+        self.sort_key = sorting.EntrySortKey(("-year",), "_")
+        self.expected = sorted(self.entries, key=self.sort_key)
+
+    def test_in_memory(self):
+        with mock.patch.object(sorting, "_write_run") as write_run:
+            self.assertEqual(self.expected, list(sorting.sort_entries(iter(self.entries), self.sort_key)))
+        write_run.assert_not_called()
+
+    def test_runs(self):
+        for run_size, fan_in in ((10, 64), (7, 3), (1, 2), (100, 2)):
+            self.assertEqual(self.expected, list(sorting.sort_entries(iter(self.entries), self.sort_key, run_size,
+                                                                      fan_in)))
+
+    def test_temporary_files_removed(self):
+        with tempfile.TemporaryDirectory() as directory, mock.patch.object(sorting.tempfile, "tempdir", directory):
+            self.assertEqual(100, len(list(sorting.sort_entries(iter(self.entries), self.sort_key, 10, 3))))
+            self.assertEqual([], os.listdir(directory))
+
+
+class TestBeautifySorted(unittest.TestCase):
+
+    def setUp(self):
+        with open(CONFIG_FILE, "r") as f:
+            json_config = json.load(f)
+        json_config["style"]["sortEntries"] = ["-year", "author", "key"]
+        config.set_config(json_config)
+        self.content = generate_bibtex(50)
+
+    def tearDown(self):
+        with open(CONFIG_FILE, "r") as f:
+            config.set_config(json.load(f))
+
+    def test_style(self):
+        bib = beautify.style(beautify.create_parser().parse(self.content), True, True)
+        entries = beautify.create_parser().parse(bib).entries
+        years = [int(bib_entry["year"]) for bib_entry in entries]
+        self.assertEqual(sorted(years, reverse=True), years)
+        self.assertEqual(50, len(entries))
+
+        json_config = copy.deepcopy(config.get_config())
+        del json_config["style"]["sortEntries"]
+        config.set_config(json_config)
+        unsorted = beautify.style(beautify.create_parser().parse(self.content), True, True)
+        self.assertNotEqual(bib, unsorted)
+        self.assertEqual(sorted(bib.strip().split("\n\n")), sorted(unsorted.strip().split("\n\n")))
+
+    def test_stream(self):
+        expected = beautify.style(beautify.create_parser().parse(self.content), True, True)
+        output_file = io.StringIO()
+        beautify.beautify_stream(io.StringIO(self.content), output_file, True, True, run_size=8)
+        self.assertEqual(expected, output_file.getvalue())
+
+    def test_incremental(self):
+        expected = beautify.style(beautify.create_parser().parse(self.content), True, True)
+        bib, state = incremental.format_incremental(self.content, {}, True, True)
+        self.assertEqual(expected, bib)
+
+        # Cached entries are sorted by the stored values
+        state = json.loads(json.dumps(state))
+        changed = self.content.replace("year = {2015}", "year = {2030}", 1)
+        expected = beautify.style(beautify.create_parser().parse(changed), True, True)
+        self.assertEqual(expected, incremental.format_incremental(changed, state, True, True)[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
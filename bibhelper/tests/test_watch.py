@@ -0,0 +1,109 @@
+import json
+import os
+import stat
+import tempfile
+import threading
+import time
+import unittest
+
+from bibhelper import beautify
+from bibhelper import config
+from bibhelper import incremental
+from bibhelper import watch
+
+TESTS_DIRECTORY = os.path.dirname(os.path.realpath(__file__))
+REFERENCES_FILE = os.path.join(TESTS_DIRECTORY, "resources", "references.bib")
+CONFIG_FILE = os.path.join(TESTS_DIRECTORY, "..", "resources", "latex_bib_helper_config.json")
+
+
+class TestWatch(unittest.TestCase):
+
+    def setUp(self):
+        with open(CONFIG_FILE, "r") as f:
+            config.set_config(json.load(f))
+        with open(REFERENCES_FILE, "r", encoding="UTF-8") as f:
+            self.content = f.read()
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "references.bib")
+        self._write(self.content)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _write(self, content):
+        with open(self.path, "w", encoding="UTF-8") as f:
+            f.write(content)
+
+    def _read(self):
+        with open(self.path, "r", encoding="UTF-8") as f:
+            return f.read()
+
+    def _expected(self, content):
+        return beautify.style(beautify.create_parser().parse(content), True, True)
+
+    def test_write_atomically(self):
+        os.chmod(self.path, 0o640)
+        watch.write_atomically(self.path, "content")
+        self.assertEqual("content", self._read())
+        self.assertEqual(0o640, stat.S_IMODE(os.stat(self.path).st_mode))
+        self.assertEqual(["references.bib"], os.listdir(self.directory.name))
+
+    def test_reformatter(self):
+        reformat = watch.Reformatter(self.path, True, True)
+        self.assertTrue(reformat())
+        formatted = self._read()
+        self.assertEqual(self._expected(self.content), formatted)
+        # The rewrite itself is not formatted again
+        self.assertFalse(reformat())
+
+        changed = formatted.replace("Josch: Managing Schemas", "Josch: Managing Many Schemas")
+        self._write(changed)
+        with self.assertLogs(incremental.logger, level="INFO") as logs:
+            self.assertTrue(reformat())
+        self.assertIn("Formatted 1 of 6 entries.", logs.output[0])
+        self.assertEqual(self._expected(changed), self._read())
+
+    def _check_watcher(self, watcher):
+        try:
+            self.assertFalse(watcher.wait(0.05))
+            self._write("changed")
+            self.assertTrue(watcher.wait(2))
+            with open(os.path.join(self.directory.name, "other.bib"), "w") as f:
+                f.write("other")
+            self.assertFalse(watcher.wait(0.2))
+        finally:
+            watcher.close()
+
+    def test_polling_watcher(self):
+        # The modification time might not change within a short time, the size does
+        self._check_watcher(watch.PollingWatcher(self.path, 0.01))
+
+    def test_inotify_watcher(self):
+        try:
+            watcher = watch.InotifyWatcher(self.path)
+        except OSError:
+            self.skipTest("inotify is not available.")
+        self._check_watcher(watcher)
+
+    def test_watch(self):
+        stop = threading.Event()
+        thread = threading.Thread(target=watch.watch, args=(self.path, True, True, 0.05, 0.01, stop))
+        thread.start()
+        try:
+            self._wait_for(self._expected(self.content))
+            changed = self._read().replace("Josch: Managing Schemas", "Josch: Managing Many Schemas")
+            self._write(changed)
+            self._wait_for(self._expected(changed))
+        finally:
+            stop.set()
+            thread.join()
+
+    def _wait_for(self, expected, timeout=5):
+        deadline = time.monotonic() + timeout
+        while self._read() != expected:
+            self.assertLess(time.monotonic(), deadline, "File was not formatted.")
+            time.sleep(0.02)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,34 @@
-import pyperclip
+import os
+import stat
+import tempfile
+from contextlib import contextmanager
 
 
 def copy_to_clipboard(content) -> None:
+    import pyperclip
     pyperclip.copy(content)
 
 
 def read_from_clipboard() -> str:
+    import pyperclip
     return pyperclip.paste()
+
+
+@contextmanager
+def open_atomically(path: str):
+    """
+    Opens a temporary file next to the file for writing, which replaces the file when the with block is left without
+    an error (otherwise the file is not touched). Readers (e.g. an editor) never see a partially written file and the
+    file may be the input, too.
+    """
+    directory, name = os.path.split(os.path.abspath(path))
+    fd, temporary_path = tempfile.mkstemp(dir=directory, prefix=".{}.".format(name), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="UTF-8") as f:
+            yield f
+        if os.path.exists(path):
+            os.chmod(temporary_path, stat.S_IMODE(os.stat(path).st_mode))
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.unlink(temporary_path)
+        raise
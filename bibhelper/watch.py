@@ -0,0 +1,204 @@
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import threading
+import time
+from typing import Optional
+
+from bibhelper import config
+from bibhelper import incremental
+from bibhelper.util import open_atomically
+
+logger = logging.getLogger(__name__)
+
+# Changes within this time (in seconds) are handled together, e.g. an editor writing a file in several steps
+DEFAULT_DEBOUNCE = config.DEFAULT_WATCH_DEBOUNCE
+# Interval (in seconds) of checking the file if inotify is not available
+DEFAULT_POLL_INTERVAL = 0.5
+# Interval (in seconds) of checking whether the watch was stopped
+_STOP_INTERVAL = 0.5
+
+# inotify events (see inotify(7)). The directory is watched, as editors often replace the file when saving it.
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_Q_OVERFLOW = 0x00004000
+_IN_EVENT_HEADER = struct.Struct("iIII")
+
+
+class PollingWatcher:
+    """
+    Detects changes of a file by comparing its modification time, size and inode.
+    """
+
+    def __init__(self, path: str, interval: float = DEFAULT_POLL_INTERVAL):
+        self.path = path
+        self.interval = interval
+        self._signature = self._get_signature()
+
+    def _get_signature(self):
+        try:
+            file_stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return file_stat.st_mtime_ns, file_stat.st_size, file_stat.st_ino
+
+    def wait(self, timeout: float) -> bool:
+        """
+        Waits at most timeout seconds for a change of the file. Returns True if the file changed.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            signature = self._get_signature()
+            if signature != self._signature:
+                self._signature = signature
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(self.interval, remaining))
+
+    def close(self) -> None:
+        pass
+
+
+class InotifyWatcher:
+    """
+    Detects changes of a file by inotify (Linux), which is called by ctypes. Raises OSError if inotify is not
+    available.
+    """
+
+    def __init__(self, path: str):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify is not available.")
+        self._name = os.fsencode(os.path.basename(path))
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed.")
+        directory = os.path.dirname(os.path.abspath(path))
+        mask = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+        if libc.inotify_add_watch(self._fd, os.fsencode(directory), mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(errno, "inotify_add_watch failed for {}.".format(directory))
+
+    def _read_events(self) -> bool:
+        try:
+            data = os.read(self._fd, 65536)
+        except BlockingIOError:
+            return False
+        offset = 0
+        changed = False
+        while offset < len(data):
+            _, mask, _, length = _IN_EVENT_HEADER.unpack_from(data, offset)
+            offset += _IN_EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            changed = changed or name == self._name or bool(mask & _IN_Q_OVERFLOW)
+        return changed
+
+    def wait(self, timeout: float) -> bool:
+        """
+        Waits at most timeout seconds for a change of the file. Returns True if the file changed.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = max(0.0, deadline - time.monotonic())
+            readable, _, _ = select.select([self._fd], [], [], remaining)
+            if readable and self._read_events():
+                return True
+            if not readable and remaining <= 0:
+                return False
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+def create_watcher(path: str, poll_interval: float = DEFAULT_POLL_INTERVAL):
+    try:
+        return InotifyWatcher(path)
+    except OSError as e:
+        logger.info("Polling {} every {}s, inotify is not available: {}".format(path, poll_interval, e))
+        return PollingWatcher(path, poll_interval)
+
+
+def write_atomically(path: str, content: str) -> None:
+    """
+    Writes the content into a temporary file next to the file, which then replaces the file. Readers (e.g. an editor)
+    never see a partially written file.
+    """
+    with open_atomically(path) as f:
+        f.write(content)
+
+
+class Reformatter:
+    """
+    Beautifies a file in place. The formatted entries of the last run are kept in memory, so only changed entries are
+    parsed and formatted again (see incremental.format_incremental).
+    """
+
+    def __init__(self, path: str, curlify: bool, pretty: bool):
+        self.path = path
+        self.curlify = curlify
+        self.pretty = pretty
+        self._state = {}
+        self._written = None
+
+    def __call__(self) -> bool:
+        """
+        Beautifies the file unless it is unchanged since the last run (e.g. the change was the rewrite of the last
+        run). Returns True if the file was formatted.
+        """
+        start = time.perf_counter()
+        try:
+            with open(self.path, "r", encoding="UTF-8") as f:
+                content = f.read()
+        except FileNotFoundError:
+            logger.warning("{} does not exist.".format(self.path))
+            return False
+        if content == self._written:
+            return False
+
+        bib, self._state = incremental.format_incremental(content, self._state, self.curlify, self.pretty)
+        if bib != content:
+            write_atomically(self.path, bib)
+        self._written = bib
+        logger.info("Formatted {} in {:.1f} ms.".format(self.path, (time.perf_counter() - start) * 1000))
+
+        if bib != content:
+            # The state refers to the entries as they were read. Formatting is idempotent, so formatting the written
+            # file refers the state to the formatted entries, which the next change is compared to.
+            _, self._state = incremental.format_incremental(bib, self._state, self.curlify, self.pretty)
+        return True
+
+
+def watch(path: str, curlify: bool, pretty: bool, debounce: float = DEFAULT_DEBOUNCE,
+          poll_interval: float = DEFAULT_POLL_INTERVAL, stop: Optional[threading.Event] = None) -> None:
+    """
+    Beautifies the file in place, then watches it and beautifies it again after each change until stop is set (or
+    the process is interrupted). A change is handled once no further change happened for debounce seconds.
+    """
+    reformat = Reformatter(path, curlify, pretty)
+    watcher = create_watcher(path, poll_interval)
+    stop = stop or threading.Event()
+    try:
+        reformat()
+        logger.info("Watching {}.".format(path))
+        while not stop.is_set():
+            if not watcher.wait(_STOP_INTERVAL):
+                continue
+            while watcher.wait(debounce) and not stop.is_set():
+                pass
+            if not stop.is_set():
+                try:
+                    reformat()
+                except Exception as e:
+                    # Keep watching, e.g. if the file is saved while it contains an undefined string
+                    logger.error("Formatting {} failed: {}".format(path, e))
+    finally:
+        watcher.close()